@@ -0,0 +1,203 @@
+"""
+The benchmark cases. Every case is a function that receives a size and
+returns a callable doing one validation, registered with the ``case``
+decorator along with the sizes it should run for.
+"""
+import sys
+
+from notario import generate, validate
+from notario.decorators import delay, optional
+from notario.exceptions import Invalid
+from notario.regex import chain
+from notario.validators import cherry_pick, types
+from notario.validators.iterables import AllItems, AnyItem, MultiIterable
+
+
+cases = []
+
+
+def case(name, sizes):
+    def register(func):
+        cases.append((name, sizes, func))
+        return func
+    return register
+
+
+def expect_invalid(data, schema):
+    def run():
+        try:
+            validate(data, schema)
+        except Invalid:
+            return
+        raise AssertionError('expected validation to fail')
+    return run
+
+
+def wide_data(size):
+    return dict(('key%05d' % number, number) for number in range(size))
+
+
+def wide_schema(data):
+    return tuple((key, types.integer) for key in sorted(data))
+
+
+@case('wide_flat_dict', [10, 100, 1000, 10000])
+def wide_flat_dict(size):
+    data = wide_data(size)
+    schema = wide_schema(data)
+    return lambda: validate(data, schema)
+
+
+@case('deep_nesting', [10, 100, 1000])
+def deep_nesting(size):
+    # every level costs a few frames of the engine and the normalization
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), size * 10))
+    data, schema = 1, types.integer
+    for _ in range(size):
+        data, schema = {'a': data}, ('a', schema)
+    return lambda: validate(data, schema)
+
+
+@delay
+def tree_node():
+    return (
+        ('children', AllItems(tree_node)),
+        ('id', types.integer),
+        ('name', types.string),
+    )
+
+
+def tree(depth):
+    children = [tree(depth - 1), tree(depth - 1)] if depth else []
+    return {'children': children, 'id': depth, 'name': 'node'}
+
+
+@case('recursive_tree', [4, 8, 12])
+def recursive_tree(size):
+    # a binary tree ``size`` levels deep validated by a delayed schema
+    data = {'root': [tree(size)]}
+    schema = ('root', AllItems(tree_node))
+    return lambda: validate(data, schema)
+
+
+@case('all_items_scalars', [10, 1000, 100000])
+def all_items_scalars(size):
+    data = {'items': list(range(size))}
+    schema = ('items', AllItems(types.integer))
+    return lambda: validate(data, schema)
+
+
+@case('all_items_objects', [10, 1000, 10000])
+def all_items_objects(size):
+    data = {'items': [{'id': number, 'name': 'item'} for number in range(size)]}
+    schema = ('items', AllItems((('id', types.integer), ('name', types.string))))
+    return lambda: validate(data, schema)
+
+
+@case('any_item_last_matches', [10, 100, 1000])
+def any_item_last_matches(size):
+    data = {'items': list(range(size))}
+    schema = ('items', AnyItem(size - 1))
+    return lambda: validate(data, schema)
+
+
+@case('multi_iterable_backtracking', [10, 100, 1000])
+def multi_iterable_backtracking(size):
+    # every item only matches the last of the schemas
+    schemas = [('kind', 'kind%02d' % number) for number in range(15)]
+    data = {'events': [{'kind': 'kind14'} for _ in range(size)]}
+    schema = ('events', MultiIterable(*schemas))
+    return lambda: validate(data, schema)
+
+
+@case('multi_iterable_mixed_events', [10, 100, 1000])
+def multi_iterable_mixed_events(size):
+    # every item matches a different one of the schemas
+    schemas = [
+        (('id', types.integer), ('kind', 'kind%02d' % number)) for number in range(15)
+    ]
+    data = {'events': [{'id': i, 'kind': 'kind%02d' % (i % 15)} for i in range(size)]}
+    schema = ('events', MultiIterable(*schemas))
+    return lambda: validate(data, schema)
+
+
+@case('literal_subtrees', [10, 100, 1000])
+def literal_subtrees(size):
+    # fixed headers and feature flags, only literal keys and values
+    headers = tuple(('header%04d' % number, 'value') for number in range(size))
+    flags = tuple(('flag%04d' % number, True) for number in range(size))
+    data = {'flags': dict(flags), 'headers': dict(headers), 'id': 1}
+    schema = (('flags', flags), ('headers', headers), ('id', types.integer))
+    return lambda: validate(data, schema)
+
+
+@case('regex_chain', [10, 50, 200])
+def regex_chain(size):
+    regexes = [(r'a', 'have an a at position %s' % number) for number in range(size)]
+    data = {'values': ['a' * size for _ in range(100)]}
+    schema = ('values', AllItems(chain(*regexes)))
+    return lambda: validate(data, schema)
+
+
+@case('cherry_pick_large_document', [100, 1000, 10000])
+def cherry_pick_large_document(size):
+    data = wide_data(size)
+    picked = sorted(data)[:5]
+    schema = cherry_pick(tuple((key, types.integer) for key in picked))
+    return lambda: validate(data, schema)
+
+
+@case('defined_keys_large_document', [100, 1000, 10000])
+def defined_keys_large_document(size):
+    data = wide_data(size)
+    schema = tuple((key, types.integer) for key in sorted(data)[:5])
+    return lambda: validate(data, schema, defined_keys=True)
+
+
+@case('failing_last_key', [10, 1000, 10000])
+def failing_last_key(size):
+    data = wide_data(size)
+    schema = wide_schema(data)[:-1] + (('key%05d' % (size - 1), types.string),)
+    return expect_invalid(data, schema)
+
+
+@case('failing_array_item', [10, 1000, 10000])
+def failing_array_item(size):
+    data = {'items': [{'id': number} for number in range(size)]}
+    data['items'][-1] = {'id': 'not a number'}
+    schema = ('items', AllItems(('id', types.integer)))
+    return expect_invalid(data, schema)
+
+
+@case('failing_any_item', [10, 100, 1000])
+def failing_any_item(size):
+    data = {'items': [{'id': number} for number in range(size)]}
+    schema = ('items', AnyItem(('id', -1)))
+    return expect_invalid(data, schema)
+
+
+@delay
+def generated_node():
+    return (
+        ('children', AllItems(generated_node)),
+        ('id', types.integer),
+        ('name', types.string),
+    )
+
+
+generated_schema = (
+    ('active', types.boolean),
+    (optional('description'), types.string),
+    ('nodes', AllItems(generated_node)),
+    ('tags', AllItems(types.string)),
+)
+
+
+@case('generated_documents', [10, 100, 1000])
+def generated_documents(size):
+    documents = list(generate(generated_schema, size, seed=size, max_depth=3))
+
+    def run():
+        for document in documents:
+            validate(document, generated_schema)
+    return run
@@ -0,0 +1,143 @@
+"""
+Run the notario benchmarks and print the results as JSON::
+
+    python benchmarks/run.py > before.json
+    # ... change the engine ...
+    python benchmarks/run.py --compare before.json
+
+Every case is timed ``--repeat`` times and the median time of a single
+validation is reported, which is stable enough to compare runs done on the
+same machine.
+
+With ``--memory`` the cases are not timed, instead the peak memory of a single
+validation is reported, along with the memory blocks every notario module
+still holds after it (this requires ``tracemalloc``, Python 3.4 and newer).
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import notario  # noqa
+from notario.profile import measure_memory  # noqa
+from cases import cases  # noqa
+
+
+def median(values):
+    values = sorted(values)
+    middle = len(values) // 2
+    if len(values) % 2:
+        return values[middle]
+    return (values[middle - 1] + values[middle]) / 2.0
+
+
+def calibrate(timer, min_time):
+    """
+    Find how many validations are needed for a single timing to last at least
+    ``min_time`` seconds, so that the timer resolution does not matter.
+    """
+    number = 1
+    while True:
+        if timer.timeit(number) >= min_time:
+            return number
+        number *= 2
+
+
+def measure(func, repeat, min_time):
+    timer = timeit.Timer(func)
+    number = calibrate(timer, min_time)
+    timings = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {
+        'median': median(timings),
+        'min': min(timings),
+        'max': max(timings),
+        'number': number,
+        'repeat': repeat,
+    }
+
+
+def measure_memory_usage(func):
+    # the first call may pay for things that are done only once
+    func()
+    return measure_memory(func).as_dict()
+
+
+def run(names=None, repeat=7, min_time=0.05, max_size=None, memory=False):
+    results = []
+    for name, sizes, setup in cases:
+        if names and name not in names:
+            continue
+        for size in sizes:
+            if max_size is not None and size > max_size:
+                continue
+            result = {'name': name, 'size': size}
+            if memory:
+                result.update(measure_memory_usage(setup(size)))
+                sys.stderr.write('%-30s %8d %14d bytes\n' % (name, size, result['peak']))
+            else:
+                result.update(measure(setup(size), repeat, min_time))
+                sys.stderr.write('%-30s %8d %14.9f\n' % (name, size, result['median']))
+            results.append(result)
+    return {
+        'notario': notario.__version__,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'results': results,
+    }
+
+
+def compare(previous, current, metric='median'):
+    """
+    Print how the ``metric`` of every case changed from the ``previous`` run,
+    a ratio above 1 means it got slower (or used more memory).
+    """
+    before = dict(
+        ((r['name'], r['size']), r.get(metric)) for r in previous['results']
+    )
+    for result in current['results']:
+        key = (result['name'], result['size'])
+        if not before.get(key):
+            continue
+        ratio = float(result[metric]) / before[key]
+        sys.stderr.write('%-30s %8d %8.2fx\n' % (key[0], key[1], ratio))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('names', nargs='*', help='only run these cases')
+    parser.add_argument('--repeat', type=int, default=7)
+    parser.add_argument('--min-time', type=float, default=0.05,
+                        help='minimum seconds for every timing')
+    parser.add_argument('--max-size', type=int,
+                        help='skip sizes bigger than this one')
+    parser.add_argument('--output', help='write the results to this file')
+    parser.add_argument('--compare', help='results of a previous run')
+    parser.add_argument('--memory', action='store_true',
+                        help='measure memory instead of time')
+    parser.add_argument('--list', action='store_true', help='list the cases')
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, sizes, _ in cases:
+            print('%s %s' % (name, sizes))
+        return
+
+    results = run(args.names, args.repeat, args.min_time, args.max_size, args.memory)
+    output = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), results, 'peak' if args.memory else 'median')
+
+
+if __name__ == '__main__':
+    main()
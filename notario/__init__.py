@@ -1,4 +1,5 @@
-from notario.engine import validate
+from notario.engine import validate, compile, is_valid, explain
+from notario.generator import generate
 from notario.utils import ensure
 
 __version__ = '0.0.16'
@@ -180,3 +180,24 @@ def delay(func):
     """
     func.__delayed__ = True
     return func
+
+
+def cost(hint):
+    """
+    Attach a cost hint to a validator so that chainable validators like
+    :class:`notario.validators.chainable.AllIn` can run the cheap ones first.
+    The hint is relative to a simple check like ``types.string``, which has
+    a cost of ``1``::
+
+        @cost(50)
+        def known_user(value):
+            ensure(value in all_user_names)
+
+    It can also be applied to validators that are not functions::
+
+        schema = ('name', AllIn(types.string, cost(10)(chain(*regexes))))
+    """
+    def decorator(validator):
+        validator.__cost__ = hint
+        return validator
+    return decorator
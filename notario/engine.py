@@ -1,40 +1,64 @@
 import sys
-from notario.exceptions import Invalid, SchemaError
-from notario.utils import (is_callable, sift, is_empty, re_sort, is_not_empty,
-                           data_item, safe_repr, ensure)
-from notario.normal import Data, Schema
+import threading
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+from timeit import default_timer
+from notario._compat import basestring
+from notario import sampling
+from notario.exceptions import Invalid, SchemaError, ValidationBudgetExceeded
+from notario.utils import (is_callable, sift, is_empty, is_not_empty, nlist,
+                           data_item, safe_repr, ensure, expand_schema,
+                           picked_keys)
+from notario.normal import Data, DataView, Schema
 from notario.validators import cherry_pick
 
 
 class Validator(object):
 
-    def __init__(self, data, schema, defined_keys=None):
-        if defined_keys:
-            schema = cherry_pick(schema)
+    #: Compare data with schemas of literal keys and values (see
+    #: :func:`literal_subtree`) in one go, before walking them
+    compare_literals = True
+
+    def __init__(self, data, schema, defined_keys=None, prepared=None):
+        if prepared is None:
+            if defined_keys:
+                schema = cherry_pick(expand_schema(schema))
+            prepared = prepare(Schema(data, schema).normalized())
         self.data = Data(data, schema).normalized()
-        self.schema = Schema(data, schema).normalized()
+        self.schema = prepared
 
     def validate(self):
-        if self.data == {} and self.schema:
+        if not self.data and self.schema:
             msg = 'has no data to validate against schema'
             reason = 'an empty dictionary object was provided'
             raise Invalid(None, {}, msg=msg, reason=reason, pair='value')
         self.traverser(self.data, self.schema, [])
 
-    def traverser(self, data, schema, tree):
+    def traverser(self, data, schema, tree, kind=None):
         """
         Traverses the dictionary, recursing onto itself if
         it sees appropriate key/value pairs that indicate that
         there is a need for more validation in a branch below us.
+
+        ``kind`` is the kind of ``schema`` (see :func:`classify`) when it is
+        already known.
         """
-        if hasattr(schema, '__validator_leaf__'):
+        if kind is None:
+            kind = classify(schema)
+        if kind == LEAF:
             return schema(data, tree)
 
-        if hasattr(schema, 'must_validate'):  # cherry picking?
+        if kind == NESTED and self.compare_literals:
+            literal = getattr(schema, 'literal', None)
+            if literal is not None and getattr(data, '_raw', None) == literal:
+                return
+
+        if kind == CHERRY_PICK:
             if not len(schema.must_validate):
                 reason = "must_validate attribute must not be empty"
                 raise SchemaError(data, tree, reason=reason)
-            data = sift(data, schema.must_validate)
+            data = project(data, schema)
 
         schema = self.sanitize_optionals(data, schema, tree)
         self.is_alpha_ordered(data, schema, tree)
@@ -81,21 +105,11 @@ class Validator(object):
                     msg = "required key in data is missing: %s" % str(failed_schema_key)
                     raise Invalid(None, tree, reason=msg, pair='key')
 
+        kinds = schema.kinds
         for index in range(len(data)):
             self.length_equality(data, schema, index, tree)
-            key, value = data[index]
-            skey, svalue = schema[index]
-            tree.append(key)
-
-            # Validate the key before anything, to prevent recursing
-            self.key_leaf(data[index], schema[index], tree)
-
-            # If a dict is a value we need to recurse.
-            # XXX Should we check isinstance(value, ndict) ?
-            if isinstance(value, dict) and len(value):
-                self.traverser(value, svalue, tree)
-            else:
-                self.value_leaf(data[index], schema[index], tree)
+            tree.append(data[index][0])
+            self.pair_traverser(data[index], schema[index], tree, kinds[index])
             if tree:
                 tree.pop()
 
@@ -118,6 +132,31 @@ class Validator(object):
                     raise Invalid(required_key, tree, reason=msg, pair='key')
 
 
+    def pair_traverser(self, data, schema, tree, kinds=None):
+        """
+        Validates a single key/value pair from the data against its schema
+        pair, recursing onto :meth:`traverser` when the value is a dictionary.
+        ``kinds`` are the kinds of the schema key and value, as classified by
+        :func:`prepare`.
+        """
+        key, value = data
+        skey, svalue = schema
+        if kinds is None:
+            kinds = classify_pair(schema)
+        key_kind, value_kind = kinds
+
+        # Validate the key before anything, to prevent recursing
+        enforce_kind(key, skey, key_kind, tree, 'key')
+
+        # If a dict is a value we need to recurse.
+        # XXX Should we check isinstance(value, ndict) ?
+        if isinstance(value, dict) and len(value):
+            self.traverser(value, svalue, tree, value_kind)
+        elif value_kind == LEAF:
+            svalue(value, tree)
+        else:
+            enforce_kind(value, svalue, value_kind, tree, 'value')
+
     def key_leaf(self, data, schema, tree):
         """
         The deepest validation we can make in any given circumstance for a key.
@@ -142,16 +181,9 @@ class Validator(object):
         enforce(value, schema_value, tree, 'value')
 
     def is_alpha_ordered(self, data, normalized_schema, tree):
-        keys = []
-        indexes = normalized_schema.keys()
-        for index in indexes:
-            key = normalized_schema[index][0]
-            if isinstance(key, str):
-                keys.append(key)
-            elif hasattr(key, '_object') :
-                if isinstance(key._object, str):
-                    keys.append(key._object)
-
+        if getattr(normalized_schema, 'ordered', False):
+            return
+        keys = alpha_keys(normalized_schema)
         sorted_keys = sorted(keys)
         if keys != sorted_keys:
             for index, key in enumerate(keys):
@@ -166,11 +198,11 @@ class Validator(object):
             data = data[index]
             try:
                 schema = schema[index]
-            except KeyError:
+            except (KeyError, IndexError):
                 if not hasattr(schema, 'must_validate'):
                     reason = 'has unexpected item in data: %s' % data_item(data)
                     raise Invalid(None, tree, msg=reason, reason=reason, pair='value')
-        except (KeyError, TypeError):
+        except (KeyError, IndexError, TypeError):
             if not hasattr(schema, 'must_validate'):
                 reason = "has less items in schema than in data"
                 raise SchemaError(data, tree, reason=reason)
@@ -181,6 +213,31 @@ class Validator(object):
             raise SchemaError(data, tree, reason='length did not match schema')
 
     def sanitize_optionals(self, data, schema, tree):
+        """
+        Return a copy of ``schema`` without the optional keys missing from
+        ``data``, along with the kinds of what is left.
+        """
+        if isinstance(schema, nlist):
+            # prepared, the optional keys are known
+            missing = ()
+            if schema.optionals:
+                data_keys = [v[0] for v in data.values()]
+                missing = [n for n, key in schema.optionals if key not in data_keys]
+            if missing:
+                indexes = [n for n in range(len(schema)) if n not in missing]
+                sanitized = nlist(schema[n] for n in indexes)
+                sanitized.kinds = tuple(schema.kinds[n] for n in indexes)
+            else:
+                # a copy, the flags of the prepared schema do not apply past here
+                sanitized = nlist(schema)
+                sanitized.kinds = schema.kinds
+            sanitized.optionals = ()
+            sanitized.ordered = schema.ordered
+            if not sanitized and is_not_empty(data):
+                msg = "unexpected extra items"
+                raise Invalid(sanitized, tree, reason=msg)
+            return sanitized
+
         schema_key_map = {}
         try:
             for number, value in schema.items():
@@ -199,23 +256,428 @@ class Validator(object):
 
         data_keys = [v[0] for k, v in data.items()]
 
-        for number, value in optional_keys.items():
-            if value not in data_keys:
-                del schema[number]
+        # prepared schemas are reused, so never remove items from them
+        missing = [n for n, value in optional_keys.items() if value not in data_keys]
+        schema = nlist(v for k, v in schema.items() if k not in missing)
+        schema.kinds = tuple(classify_pair(item) for item in schema)
+        schema.optionals = ()
+        schema.ordered = False
         if not schema and is_not_empty(data):
             msg = "unexpected extra items"
             raise Invalid(schema, tree, reason=msg)
-        return re_sort(schema)
+        return schema
+
+
+class Hooks(object):
+    """
+    The interface for following validation as it happens, for example to
+    feed tracing or metrics systems. Sub-class it and override the methods
+    needed, then install it for a single call with ``validate(data, schema,
+    hooks=my_hooks)``, for every validation of a compiled schema with
+    ``compile(schema, hooks=my_hooks)``, or for everything validated in the
+    current thread with :func:`tracing`.
+
+    A node is either the top level of the data (with an empty ``path``),
+    a key/value pair (its key and value validation, recursing into nested
+    dictionaries), or an item of an array validated by an iterable
+    validator. The ``path`` is a tuple of the data keys leading to the node,
+    using ``list[index]`` for array items, like the paths in error messages.
+
+    Validation without hooks uses a different code path, so it does not pay
+    for any of this.
+    """
+
+    def on_node_enter(self, path, schema_node):
+        """
+        Called before validating the node at ``path`` against
+        ``schema_node``.
+        """
+
+    def on_node_exit(self, path, ok, elapsed):
+        """
+        Called after validating the node at ``path``, ``ok`` is ``False`` if
+        it raised an exception. ``elapsed`` is the time it took in seconds.
+        """
+
+    def on_invalid(self, exc):
+        """
+        Called with every :class:`notario.exceptions.Invalid` exception
+        raised by a node, before the exception leaves it. Exceptions that are
+        caught later (like the misses of an ``AnyItem``) are included.
+        """
+
+
+class ChainedHooks(Hooks):
+    """
+    Calls every one of the ``hooks`` in order, to install more than one at
+    the same time.
+    """
+
+    def __init__(self, *hooks):
+        self.hooks = hooks
+
+    def on_node_enter(self, path, schema_node):
+        for hooks in self.hooks:
+            hooks.on_node_enter(path, schema_node)
+
+    def on_node_exit(self, path, ok, elapsed):
+        for hooks in self.hooks:
+            hooks.on_node_exit(path, ok, elapsed)
+
+    def on_invalid(self, exc):
+        for hooks in self.hooks:
+            hooks.on_invalid(exc)
+
+
+def chain_hooks(*hooks):
+    """
+    Return a single object out of ``hooks``, skipping the ones that are
+    ``None``. If none are left, ``None`` is returned.
+    """
+    hooks = [h for h in hooks if h is not None]
+    if not hooks:
+        return None
+    if len(hooks) == 1:
+        return hooks[0]
+    return ChainedHooks(*hooks)
+
+
+class TracedValidator(Validator):
+    """
+    A :class:`Validator` that reports every key/value pair it validates as
+    a node to the active :class:`Tracer`. It is only used when validation is
+    being traced so that the plain :class:`Validator` does not pay for it.
+    """
+
+    # every pair is reported, even when the data is compared in one go
+    compare_literals = False
+
+    def __init__(self, data, schema, defined_keys=None, prepared=None, tracer=None):
+        Validator.__init__(self, data, schema, defined_keys=defined_keys, prepared=prepared)
+        self.tracer = tracer or _local.tracer
+
+    def pair_traverser(self, data, schema, tree, kinds=None):
+        return self.tracer.node(
+            data[0], schema, Validator.pair_traverser, self, data, schema, tree, kinds
+        )
+
+
+class Checker(Validator):
+    """
+    A :class:`Validator` that only tells if the data is valid: it does not
+    keep track of where it is (the ``tree``) nor create exceptions for what
+    fails, it returns ``False`` instead. Used by :func:`is_valid`.
+
+    Levels of the schema it does not walk itself (cherry picked, or not in
+    alphabetical order) and the validators that get the tree (like
+    ``AllItems``) go through :class:`Validator` as usual.
+    """
+
+    def __init__(self, data, schema, defined_keys=None, prepared=None):
+        if prepared is None:
+            if defined_keys:
+                schema = cherry_pick(expand_schema(schema))
+            prepared = prepare(Schema(data, schema).normalized())
+        self.data = data
+        self.schema = prepared
+
+    def is_valid(self):
+        if not self.data and self.schema:
+            return False
+        return self.check(self.data, self.schema, classify(self.schema))
+
+    def check(self, data, schema, kind):
+        """
+        Tell if the dictionary ``data`` is valid for ``schema``, which is of
+        ``kind``.
+        """
+        if kind == NESTED:
+            literal = getattr(schema, 'literal', None)
+            if literal is not None:
+                return data == literal
+            if schema.ordered:
+                return self.check_level(data, schema)
+        try:
+            if kind == LEAF:
+                schema(DataView(data), [])
+            else:
+                Validator.traverser(self, DataView(data), schema, [], kind)
+        except (Invalid, SchemaError):
+            return False
+        return True
+
+    def check_level(self, data, schema):
+        kinds = schema.kinds
+        indexes = range(len(schema))
+        if schema.optionals:
+            missing = [n for n, key in schema.optionals if key not in data]
+            if missing:
+                indexes = [n for n in indexes if n not in missing]
+        if len(indexes) != len(data):
+            return False
+
+        for index, key in zip(indexes, sorted(data)):
+            schema_key, schema_value = schema[index]
+            key_kind, value_kind = kinds[index]
+            if not self.matches(key, schema_key, key_kind):
+                return False
+            value = data[key]
+            if isinstance(value, dict) and len(value):
+                if not self.check(value, schema_value, value_kind):
+                    return False
+            elif not self.matches(value, schema_value, value_kind):
+                return False
+        return True
+
+    def matches(self, data_item, schema_item, kind):
+        """
+        Tell if ``data_item`` passes ``schema_item`` (a key or a value that
+        is not a dictionary to walk), classified as ``kind``.
+        """
+        if kind == LITERAL:
+            return data_item == schema_item
+        if kind == TYPE_CHECK:
+            if not isinstance(data_item, schema_item.valid_types):
+                return False
+            if schema_item.wrapped is None:
+                return True
+            schema_item = schema_item.wrapped
+            kind = CALLABLE
+        if kind == CALLABLE:
+            try:
+                schema_item(data_item)
+            except AssertionError:
+                return False
+            return True
+
+        if isinstance(data_item, dict):
+            data_item = DataView(data_item)
+        try:
+            if kind == LEAF:
+                schema_item(data_item, [])
+            else:
+                enforce(data_item, schema_item, [], 'value')
+        except (Invalid, SchemaError):
+            return False
+        return True
+
+
+class Budget(object):
+    """
+    The limits of a validation (see :func:`validate`) and how much of them
+    it used so far.
+    """
+
+    def __init__(self, deadline=None, max_nodes=None, max_depth=None, max_items=None):
+        self.timeout = deadline
+        self.deadline = None
+        if deadline is not None:
+            self.deadline = default_timer() + deadline
+        self.max_nodes = max_nodes
+        self.max_depth = max_depth
+        self.max_items = max_items
+        self.nodes = 0
+        self.depth = 0
+
+    def node(self, tree, count=1):
+        """
+        Account for validating ``count`` more nodes (key/value pairs or
+        array items), checking the number of nodes and the deadline.
+        """
+        self.nodes += count
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            raise ValidationBudgetExceeded('max_nodes', self.max_nodes, list(tree))
+        if self.deadline is not None and default_timer() > self.deadline:
+            raise ValidationBudgetExceeded('deadline', self.timeout, list(tree))
+
+    def enter(self, tree):
+        self.depth += 1
+        if self.max_depth is not None and self.depth > self.max_depth:
+            self.depth -= 1
+            raise ValidationBudgetExceeded('max_depth', self.max_depth, list(tree))
+
+    def items(self, count, tree):
+        if self.max_items is not None and count > self.max_items:
+            raise ValidationBudgetExceeded('max_items', self.max_items, list(tree))
+
+
+class BudgetedValidator(Validator):
+    """
+    A :class:`Validator` that checks the :class:`Budget` of the validation
+    for every level and key/value pair. It is only used when validation has
+    limits so that the plain :class:`Validator` does not pay for them.
+    """
+
+    def __init__(self, data, schema, defined_keys=None, prepared=None, budget=None):
+        Validator.__init__(self, data, schema, defined_keys=defined_keys, prepared=prepared)
+        self.budget = budget or _local.budget
+
+    def traverser(self, data, schema, tree, kind=None):
+        budget = self.budget
+        budget.enter(tree)
+        try:
+            return super(BudgetedValidator, self).traverser(data, schema, tree, kind)
+        finally:
+            budget.depth -= 1
+
+    def pair_traverser(self, data, schema, tree, kinds=None):
+        self.budget.node(tree)
+        return super(BudgetedValidator, self).pair_traverser(data, schema, tree, kinds)
+
+
+class TracedBudgetedValidator(BudgetedValidator, TracedValidator):
+    """
+    Both a :class:`BudgetedValidator` and a :class:`TracedValidator`.
+    """
+
+    def __init__(self, data, schema, defined_keys=None, prepared=None, tracer=None,
+                 budget=None):
+        TracedValidator.__init__(
+            self, data, schema, defined_keys=defined_keys, prepared=prepared, tracer=tracer
+        )
+        self.budget = budget or _local.budget
+
+
+class Tracer(object):
+    """
+    Keeps track of the nodes being validated in the current thread and
+    reports them to the :class:`Hooks` installed.
+    """
+
+    def __init__(self, hooks):
+        self.hooks = hooks
+        self.paths = []
+        self.reported = None
+
+    def node(self, key, schema_node, func, *args):
+        if self.paths:
+            path = self.paths[-1] + (key,)
+        else:
+            path = ()
+        hooks = self.hooks
+        self.paths.append(path)
+        hooks.on_node_enter(path, schema_node)
+        start = default_timer()
+        try:
+            result = func(*args)
+        except Exception:
+            exc = sys.exc_info()[1]
+            # report once, where it was raised, not on every node it leaves
+            if isinstance(exc, Invalid) and exc is not self.reported:
+                self.reported = exc
+                hooks.on_invalid(exc)
+            hooks.on_node_exit(path, False, default_timer() - start)
+            raise
+        else:
+            hooks.on_node_exit(path, True, default_timer() - start)
+            return result
+        finally:
+            self.paths.pop()
+
+
+_local = threading.local()
+
+
+def active_tracer():
+    """
+    The :class:`Tracer` of the validation running in this thread, if any.
+    """
+    return getattr(_local, 'tracer', None)
+
+
+def active_budget():
+    """
+    The :class:`Budget` of the validation running in this thread, if any.
+    """
+    return getattr(_local, 'budget', None)
+
+
+@contextmanager
+def tracing(hooks):
+    """
+    Install ``hooks`` for every validation done in the current thread while
+    the context manager is active.
+    """
+    previous = getattr(_local, 'hooks', None)
+    _local.hooks = chain_hooks(previous, hooks)
+    try:
+        yield hooks
+    finally:
+        _local.hooks = previous
+
+
+#: Schemas given to validators (like ``AllItems``) mapped by ``id`` to the
+#: schema itself (so the ``id`` can't be reused) and its prepared form
+prepared_schemas = OrderedDict()
+prepared_schemas_lock = threading.Lock()
+prepared_schemas_size = 1024
+
+#: Schemas prepared only once for every schema that uses them, like the
+#: ones in :mod:`notario.registry`, mapped by ``id`` to the schema and an
+#: object with a ``prepared()`` method returning its prepared form
+shared_schemas = {}
+
+
+def prepared_schema(schema):
+    """
+    The prepared form of a schema used by a validator for the items it
+    contains. It is prepared once and shared by every item and every level
+    of recursion: a ``delay``-ed schema is only expanded once (see
+    :func:`notario.utils.expand_schema`) so the validators in it, which refer
+    back to it, are the same objects and get the same prepared schema.
+
+    The most recent ``prepared_schemas_size`` schemas are kept, and the ones
+    in ``shared_schemas`` are never dropped.
+    """
+    entry = prepared_schemas.get(id(schema))
+    if entry is not None and entry[0] is schema:
+        return entry[1]
+    shared = shared_schemas.get(id(schema))
+    if shared is not None and shared[0] is schema:
+        return shared[1].prepared()
+    prepared = prepare(Schema({}, schema).normalized())
+    with prepared_schemas_lock:
+        prepared_schemas[id(schema)] = (schema, prepared)
+        while len(prepared_schemas) > prepared_schemas_size:
+            prepared_schemas.popitem(last=False)
+    return prepared
+
+
+def nested_validator(data, schema):
+    """
+    Validators that need to run the engine for items they contain use this
+    to get a :class:`Validator`, traced only when validation is and checking
+    a budget only when validation has one.
+    """
+    prepared = prepared_schema(schema)
+    tracer = active_tracer()
+    budget = active_budget()
+    if budget is None:
+        if tracer is None:
+            return Validator(data, schema, prepared=prepared)
+        return TracedValidator(data, schema, prepared=prepared, tracer=tracer)
+    if tracer is None:
+        return BudgetedValidator(data, schema, prepared=prepared, budget=budget)
+    return TracedBudgetedValidator(
+        data, schema, prepared=prepared, tracer=tracer, budget=budget
+    )
 
 
 class BaseItemValidator(object):
 
+    #: The indexes of the items to validate, all of them (from ``index``)
+    #: when it is ``None``. See :mod:`notario.sampling`
+    indexes = None
+
     def __init__(self, data, schema, tree=None, index=None, name=None):
         self.data = data
         self.schema = schema
         self.tree = tree or []
         self.index = index or 0
         self.name = name
+        self.budget = active_budget()
+        if self.budget is not None and isinstance(data, (list, dict)):
+            self.budget.items(len(data), self.tree)
 
     def validate(self):
         self.traverser(self.data, self.schema, self.tree)
@@ -226,6 +688,11 @@ class BaseItemValidator(object):
             raise SchemaError(data, tree, reason=reason)
         self.leaves(data, schema, tree)
 
+    def item_indexes(self, data):
+        if self.indexes is None:
+            return range(self.index, len(data))
+        return self.indexes
+
 
 class IterableValidator(BaseItemValidator):
     """
@@ -242,12 +709,36 @@ class IterableValidator(BaseItemValidator):
 
     def leaf(self, index):
         self.data_sanity(self.data, tree=self.tree)
-        self.enforce(self.data, self.schema, index, self.tree)
+        if self.budget is not None:
+            self.budget.node(self.tree)
+        tracer = active_tracer()
+        if tracer is None:
+            return self.enforce(self.data, self.schema, index, self.tree)
+        tracer.node(
+            'list[%s]' % index, self.schema,
+            self.enforce, self.data, self.schema, index, self.tree
+        )
 
     def leaves(self, data, schema, tree):
         self.data_sanity(data, tree=tree)
-        for item_index in range(self.index, len(data)):
-            self.enforce(data, schema, item_index, tree)
+        schema = prepare_type_check(schema)
+        tracer = active_tracer()
+        budget = self.budget
+        if tracer is None and budget is None:
+            for item_index in self.item_indexes(data):
+                self.enforce(data, schema, item_index, tree)
+        elif tracer is None:
+            for item_index in self.item_indexes(data):
+                budget.node(tree)
+                self.enforce(data, schema, item_index, tree)
+        else:
+            for item_index in self.item_indexes(data):
+                if budget is not None:
+                    budget.node(tree)
+                tracer.node(
+                    'list[%s]' % item_index, schema,
+                    self.enforce, data, schema, item_index, tree
+                )
 
     def enforce(self, data, schema, item_index, tree):
         # yo dawg, a recursive validator within a recursive validator anyone?
@@ -255,7 +746,7 @@ class IterableValidator(BaseItemValidator):
             return schema(data[item_index], tree)
         if isinstance(data[item_index], dict) and isinstance(schema, tuple):
             try:
-                _validator = Validator(data[item_index], schema)
+                _validator = nested_validator(data[item_index], schema)
                 _validator.validate()
             except Invalid:
                 e = sys.exc_info()[1]
@@ -269,6 +760,10 @@ class IterableValidator(BaseItemValidator):
                 e = sys.exc_info()[1]
                 tree.extend(e.path)
                 raise SchemaError('', tree, reason=e._reason, pair='value')
+            except ValidationBudgetExceeded:
+                e = sys.exc_info()[1]
+                e.path = tree + ['list[%s]' % item_index] + e.path
+                raise
 
         elif isinstance(schema, tuple) and not isinstance(data[item_index], (tuple, dict)):
             raise SchemaError(data, tree, reason='iterable contains single items, schema does not')
@@ -281,6 +776,8 @@ class IterableValidator(BaseItemValidator):
             except AssertionError:
                 reason = sys.exc_info()[1]
                 tree.append('list[%s]' % item_index)
+                if schema.__class__ is TypeCheck:
+                    schema = schema.validator
                 raise Invalid(schema, tree, reason=reason, pair='item')
 
 
@@ -291,10 +788,15 @@ class RecursiveValidator(BaseItemValidator):
     """
 
     def leaf(self, index):
+        if self.budget is not None:
+            self.budget.node(self.tree)
         self.enforce(self.data, self.schema, index, self.tree)
 
     def leaves(self, data, schema, tree):
-        for item_index in range(self.index, len(data)):
+        budget = self.budget
+        for item_index in self.item_indexes(data):
+            if budget is not None:
+                budget.node(tree)
             self.enforce(data, schema, item_index, tree)
 
     def enforce(self, data, schema, item_index, tree):
@@ -302,7 +804,7 @@ class RecursiveValidator(BaseItemValidator):
         if is_callable(schema) and hasattr(schema, '__validator_leaf__'):
             return schema(data, tree)
         try:
-            _validate = Validator({}, self.schema)
+            _validate = nested_validator({}, self.schema)
             _validate.data = {0: data[item_index]}
             _validate.validate()
         except Invalid:
@@ -313,9 +815,47 @@ class RecursiveValidator(BaseItemValidator):
             e = sys.exc_info()[1]
             tree.extend(e.path)
             raise SchemaError('', tree, reason=e._reason, pair='value')
+        except ValidationBudgetExceeded:
+            e = sys.exc_info()[1]
+            e.path = tree + e.path
+            raise
+
+
+def project(data, schema):
+    """
+    The items of ``data`` picked by the cherry picked ``schema``. When
+    ``data`` is a :class:`notario.normal.DataView` the picked keys are taken
+    from the original dictionary, so the keys that are not picked are never
+    sorted nor looked at.
+    """
+    picked = getattr(schema, 'picked', None)
+    raw = getattr(data, '_raw', None)
+    if picked is None or raw is None:
+        return sift(data, schema.must_validate, picked)
+    if len(picked) < len(raw):
+        projected = dict((key, raw[key]) for key in picked if key in raw)
+    else:
+        projected = dict((key, value) for key, value in raw.items() if key in picked)
+    return DataView(projected)
 
 
 def enforce(data_item, schema_item, tree, pair):
+    if schema_item.__class__ is TypeCheck:
+        if isinstance(data_item, schema_item.valid_types):
+            if schema_item.wrapped is None:
+                return
+            # the type is correct, only the decorated validator needs to run
+            validator, schema_item = schema_item.wrapped, schema_item.validator
+            try:
+                return validator(data_item)
+            except AssertionError:
+                e = sys.exc_info()[1]
+                if pair == 'value':
+                    tree.append(data_item)
+                raise Invalid(schema_item, tree, reason=e, pair=pair)
+        # let the original validator produce the failure
+        schema_item = schema_item.validator
+
     schema_is_optional = hasattr(schema_item, 'is_optional')
     if is_callable(schema_item) and not schema_is_optional:
         try:
@@ -340,15 +880,486 @@ def enforce(data_item, schema_item, tree, pair):
             raise Invalid(schema_item, tree, reason=e, pair=pair)
 
 
-def validate(data, schema, defined_keys=False):
+class TypeCheck(object):
+    """
+    The prepared form of a built-in type validator (like ``types.string``) or
+    of a validator decorated with one of them. The engine checks the value
+    directly against ``valid_types`` and only calls the original
+    ``validator`` when that check fails, so that the error message is the
+    same one the validator has always produced.
+    """
+
+    __slots__ = ('validator', 'valid_types', 'wrapped', '__validator_leaf__')
+
+    def __init__(self, validator, valid_types, wrapped=None):
+        self.validator = validator
+        self.valid_types = valid_types
+        self.wrapped = wrapped
+        if getattr(validator, '__validator_leaf__', False):
+            self.__validator_leaf__ = True
+
+    @property
+    def __name__(self):
+        return self.validator.__name__
+
+    def __repr__(self):
+        # shows up in the messages of nested schemas that did not match
+        return repr(self.validator)
+
+    def __call__(self, value, *args):
+        if isinstance(value, self.valid_types) and self.wrapped is None:
+            return
+        return self.validator(value, *args)
+
+
+#: Built-in type validators (and the validators decorated by them) mapped to
+#: the types they check for and the decorated validator
+type_checks = weakref.WeakKeyDictionary()
+
+
+def register_type_check(validator, valid_types, wrapped=None):
+    """
+    Register ``validator`` as a plain ``isinstance`` check against
+    ``valid_types`` so that prepared schemas can replace it with
+    a :class:`TypeCheck`. When ``validator`` is the result of decorating
+    another validator, that one should be passed in as ``wrapped`` so it can
+    run after the type check passes.
+    """
+    if not isinstance(valid_types, tuple):
+        valid_types = (valid_types,)
+    type_checks[validator] = (valid_types, wrapped)
+    return validator
+
+
+def prepare_type_check(schema_item):
+    """
+    Return the :class:`TypeCheck` for ``schema_item`` if it is a registered
+    type validator, otherwise ``schema_item`` is returned untouched.
+    """
+    if not is_callable(schema_item) or schema_item.__class__ is TypeCheck:
+        return schema_item
+    try:
+        check = type_checks.get(schema_item)
+    except TypeError:  # unhashable or can't be weakly referenced
+        return schema_item
+    if check is None:
+        return schema_item
+    return TypeCheck(schema_item, *check)
+
+
+def enforce_kind(data_item, schema_item, kind, tree, pair):
+    """
+    Like :func:`enforce`, for a ``schema_item`` already classified as
+    ``kind``: the most common kinds pass without probing ``schema_item`` for
+    what it is, anything else (and failures, for the same error) goes through
+    :func:`enforce`.
+    """
+    if kind == LITERAL:
+        if data_item == schema_item:
+            return
+    elif kind == TYPE_CHECK:
+        if schema_item.wrapped is None and isinstance(data_item, schema_item.valid_types):
+            return
+    elif kind == CALLABLE:
+        try:
+            return schema_item(data_item)
+        except AssertionError:
+            e = sys.exc_info()[1]
+            if pair == 'value':
+                tree.append(data_item)
+            raise Invalid(schema_item, tree, reason=e, pair=pair)
+    return enforce(data_item, schema_item, tree, pair)
+
+
+#: The kinds of schema nodes, see :func:`classify`
+LITERAL, CALLABLE, TYPE_CHECK, LEAF, OPTIONAL, NESTED, CHERRY_PICK = range(7)
+
+
+def classify(schema_item):
+    """
+    The kind of a schema value, in the order the engine checks for them:
+    a nested schema (``NESTED``, or ``CHERRY_PICK`` with ``must_validate``),
+    a validator that gets the tree too (``LEAF``), a prepared type
+    validator (``TYPE_CHECK``), an ``optional`` value (``OPTIONAL``), any
+    other validator (``CALLABLE``) or a value to compare with (``LITERAL``).
+    """
+    if isinstance(schema_item, nlist):
+        if hasattr(schema_item, 'must_validate'):
+            return CHERRY_PICK
+        return NESTED
+    if hasattr(schema_item, '__validator_leaf__'):
+        return LEAF
+    if schema_item.__class__ is TypeCheck:
+        return TYPE_CHECK
+    if hasattr(schema_item, 'is_optional'):
+        return OPTIONAL
+    if is_callable(schema_item):
+        return CALLABLE
+    return LITERAL
+
+
+def classify_key(schema_key):
+    """
+    The kind of a schema key, keys are never leaves nor nested schemas.
+    """
+    if schema_key.__class__ is TypeCheck:
+        return TYPE_CHECK
+    if hasattr(schema_key, 'is_optional'):
+        return OPTIONAL
+    if is_callable(schema_key):
+        return CALLABLE
+    return LITERAL
+
+
+def classify_pair(schema_item):
+    """
+    The kinds of the key and value of a schema item, ``None`` if it is not
+    a key/value pair.
+    """
+    if not isinstance(schema_item, tuple) or len(schema_item) != 2:
+        return None
+    key, value = schema_item
+    return classify_key(key), classify(value)
+
+
+def alpha_keys(schema):
+    """
+    The string keys of a normalized schema (unwrapping optional ones), which
+    have to be in alphabetical order.
+    """
+    keys = []
+    for index in schema.keys():
+        key = schema[index][0]
+        if isinstance(key, str):
+            keys.append(key)
+        elif hasattr(key, '_object') :
+            if isinstance(key._object, str):
+                keys.append(key._object)
+    return keys
+
+
+def prepare(schema):
+    """
+    Walk a normalized schema and replace the registered type validators with
+    their :class:`TypeCheck` so the engine can dispatch on them directly. The
+    normalized schema is modified in place and returned.
+
+    Every level gets the ``kinds`` of its keys and values (see
+    :func:`classify`), its ``optionals`` keys and whether it is ``ordered``
+    alphabetically, so none of that is figured out again while validating.
+    Cherry picked levels get the set of keys they pick too.
+    """
+    if not isinstance(schema, nlist):
+        return prepare_type_check(schema)
+    if getattr(schema, 'kinds', None) is not None:
+        # prepared already (a shared schema) or being prepared further up,
+        # when a schema references itself
+        return schema
+    schema.kinds = ()
+    kinds = []
+    optionals = []
+    for index, item in schema.items():
+        if not isinstance(item, tuple) or len(item) != 2:
+            kinds.append(None)
+            continue
+        key, value = item
+        if isinstance(value, nlist):
+            value = prepare(value)
+        else:
+            value = prepare_type_check(value)
+        key = prepare_type_check(key)
+        schema[index] = (key, value)
+        kinds.append(classify_pair(schema[index]))
+        optional_key = getattr(key, '_object', None)
+        if optional_key:
+            optionals.append((index, optional_key))
+    schema.kinds = tuple(kinds)
+    schema.optionals = tuple(optionals)
+    schema.ordered = False
+    if None not in kinds:
+        keys = alpha_keys(schema)
+        schema.ordered = keys == sorted(keys)
+    schema.literal = literal_subtree(schema)
+    if hasattr(schema, 'must_validate'):
+        schema.picked = picked_keys(schema.must_validate)
+    return schema
+
+
+def literal_subtree(schema):
+    """
+    The dictionary that data has to be equal to for ``schema`` (a prepared
+    schema level) to pass, when all of its keys are strings in alphabetical
+    order and its values are literals or schemas like it. ``None`` if
+    validation has to walk it.
+    """
+    if not schema.ordered or not schema or hasattr(schema, 'must_validate'):
+        return None
+    expected = {}
+    for index, (key, value) in schema.items():
+        if not isinstance(key, basestring):
+            return None
+        key_kind, value_kind = schema.kinds[index]
+        if value_kind == NESTED:
+            # a schema referencing itself is still being prepared
+            value = getattr(value, 'literal', None)
+            if value is None:
+                return None
+        elif value_kind != LITERAL or isinstance(value, (dict, list, tuple, set)):
+            return None
+        expected[key] = value
+    if len(expected) != len(schema):
+        return None
+    return expected
+
+
+class CompiledSchema(object):
+    """
+    A schema that is normalized and prepared once, so that validating many
+    documents against it does not pay for that every time. Use
+    :func:`compile` to create one.
+    """
+
+    def __init__(self, schema, defined_keys=False, hooks=None, sample=None,
+                 result_cache=None):
+        if defined_keys:
+            schema = cherry_pick(expand_schema(schema))
+        self.raw_schema = schema
+        self.schema = prepare(Schema({}, schema).normalized())
+        self.hooks = hooks
+        self.sample = sample
+        self.result_cache = result_cache
+        self.selections = {}
+
+    def select(self, paths):
+        """
+        Return a compiled schema that only validates the data at ``paths``,
+        see :mod:`notario.paths`. It is compiled once for the same paths.
+        """
+        from notario.paths import select, split
+        key = frozenset(split(path) for path in paths)
+        selected = self.selections.get(key)
+        if selected is None:
+            selected = CompiledSchema(
+                select(self.raw_schema, paths), result_cache=self.result_cache
+            )
+            self.selections[key] = selected
+        return selected
+
+    def validate(self, data, profile=None, hooks=None, paths=None, sample=None,
+                 deadline=None, max_nodes=None, max_depth=None, max_items=None):
+        """
+        Validate ``data`` against the compiled schema. See :func:`validate`
+        for the arguments.
+        """
+        if not isinstance(data, dict):
+            raise TypeError('expected data to be of type dict, but got: %s' % type(data))
+        if sample is None:
+            sample = self.sample
+        if paths is not None:
+            selected = self.select(paths)
+            return selected.validate(
+                data, profile=profile, hooks=chain_hooks(self.hooks, hooks),
+                sample=sample, deadline=deadline, max_nodes=max_nodes,
+                max_depth=max_depth, max_items=max_items
+            )
+
+        if profile is True:
+            from notario.profile import Profile
+            profile = Profile()
+        hooks = chain_hooks(
+            getattr(_local, 'hooks', None), self.hooks, hooks, profile
+        )
+        budget = None
+        if (deadline, max_nodes, max_depth, max_items) != (None, None, None, None):
+            budget = Budget(deadline, max_nodes, max_depth, max_items)
+
+        if hooks is None and budget is None and not sample:
+            if self.result_cache is not None:
+                return self.result_cache.validate(self, data, self.run)
+            return self.run(data)
+
+        previous_sampling = sampling.start(sample or None)
+        try:
+            if hooks is None and budget is None:
+                validator = Validator(data, self.raw_schema, prepared=self.schema)
+                validator.validate()
+            elif hooks is None:
+                self.budgeted(data, budget)
+            else:
+                self.traced(data, hooks, budget)
+        finally:
+            report = sampling.finish(previous_sampling)
+        if profile is None:
+            return report
+        profile.sampling = report
+        return profile
+
+    def run(self, data):
+        previous_sampling = sampling.start(None)
+        try:
+            validator = Validator(data, self.raw_schema, prepared=self.schema)
+            validator.validate()
+        finally:
+            report = sampling.finish(previous_sampling)
+        return report
+
+    def budgeted(self, data, budget):
+        previous = getattr(_local, 'budget', None)
+        _local.budget = budget
+        try:
+            validator = BudgetedValidator(
+                data, self.raw_schema, prepared=self.schema, budget=budget
+            )
+            validator.validate()
+        finally:
+            _local.budget = previous
+
+    def traced(self, data, hooks, budget=None):
+        previous = active_tracer(), getattr(_local, 'budget', None)
+        _local.tracer = tracer = Tracer(hooks)
+        try:
+            if budget is None:
+                validator = TracedValidator(
+                    data, self.raw_schema, prepared=self.schema, tracer=tracer
+                )
+            else:
+                _local.budget = budget
+                validator = TracedBudgetedValidator(
+                    data, self.raw_schema, prepared=self.schema, tracer=tracer,
+                    budget=budget
+                )
+            tracer.node(None, validator.schema, validator.validate)
+        finally:
+            _local.tracer, _local.budget = previous
+
+    def is_valid(self, data):
+        """
+        Tell if ``data`` is valid for the compiled schema, see
+        :func:`is_valid`.
+        """
+        if not isinstance(data, dict):
+            raise TypeError('expected data to be of type dict, but got: %s' % type(data))
+        previous_sampling = sampling.start(self.sample)
+        try:
+            return Checker(data, self.raw_schema, prepared=self.schema).is_valid()
+        finally:
+            sampling.finish(previous_sampling)
+
+    def explain(self, data):
+        """
+        Validate ``data`` against the compiled schema, returning the exception
+        of the failure instead of raising it, see :func:`explain`.
+        """
+        try:
+            self.validate(data)
+        except (Invalid, SchemaError):
+            return sys.exc_info()[1]
+
+
+def compile(schema, defined_keys=False, hooks=None, cache_dir=None, sample=None,
+            result_cache=None):
+    """
+    Prepare ``schema`` once to validate any number of documents against it::
+
+        compiled = compile(schema)
+        for document in documents:
+            compiled.validate(document)
+
+    :param hooks: A :class:`Hooks` object installed for every validation
+                  done with the compiled schema.
+    :param cache_dir: A directory to save the compiled schema to, and load it
+                      from the next time. See :mod:`notario.snapshot`.
+    :param sample: A :class:`notario.sampling.Sample` for the ``AllItems``
+                   and ``AllObjects`` validators of the schema that do not
+                   have one.
+    :param result_cache: A :class:`notario.results.ResultCache` to keep the
+                         results of the documents validated in, so that
+                         validating them again does not traverse them.
+    """
+    if cache_dir is not None:
+        from notario.snapshot import load_or_compile
+        return load_or_compile(
+            schema, cache_dir, defined_keys=defined_keys, hooks=hooks,
+            sample=sample, result_cache=result_cache
+        )
+    return CompiledSchema(
+        schema, defined_keys=defined_keys, hooks=hooks, sample=sample,
+        result_cache=result_cache
+    )
+
+
+def validate(data, schema, defined_keys=False, profile=None, hooks=None, paths=None,
+             sample=None, deadline=None, max_nodes=None, max_depth=None, max_items=None):
     """
     Main entry point for the validation engine.
 
     :param data: The incoming data, as a dictionary object.
     :param schema: The schema from which data will be validated against
+    :param profile: Either ``True`` or a :class:`notario.profile.Profile` to
+                    record how long every node of the schema took. The
+                    profile is returned.
+    :param hooks: A :class:`Hooks` object to follow this validation.
+    :param paths: Validate only the parts of the data at these paths, like
+                  ``['metadata.labels', 'spec.containers']``. See
+                  :mod:`notario.paths`.
+    :param sample: A :class:`notario.sampling.Sample` to validate only some
+                   of the items of the ``AllItems`` and ``AllObjects``
+                   validators that do not have one. When items were not
+                   validated a :class:`notario.sampling.Report` is returned
+                   (or set as the ``sampling`` attribute of the profile).
+    :param deadline: Stop validating after this many seconds.
+    :param max_nodes: Stop validating after this many key/value pairs and
+                      array (or object) items.
+    :param max_depth: Do not validate dictionaries nested deeper than this.
+    :param max_items: Do not validate arrays (or objects, with the recursive
+                      validators) with more items than this.
+    :raises: :class:`notario.exceptions.ValidationBudgetExceeded` when
+             validation goes over one of the limits. They are checked between
+             nodes, so a single validator that takes long is not stopped.
     """
-    if isinstance(data, dict):
-        validator = Validator(data, schema, defined_keys=defined_keys)
-        validator.validate()
+    if not isinstance(data, dict):
+        raise TypeError('expected data to be of type dict, but got: %s' % type(data))
+    if paths is not None:
+        # only the selected part of the schema is prepared
+        from notario.paths import select
+        if defined_keys:
+            schema = cherry_pick(expand_schema(schema))
+        compiled = CompiledSchema(select(schema, paths))
     else:
+        compiled = CompiledSchema(schema, defined_keys=defined_keys)
+    return compiled.validate(
+        data, profile=profile, hooks=hooks, sample=sample,
+        deadline=deadline, max_nodes=max_nodes, max_depth=max_depth,
+        max_items=max_items
+    )
+
+
+def is_valid(data, schema, defined_keys=False):
+    """
+    Return ``True`` if ``data`` is valid for ``schema`` and ``False`` if
+    :func:`validate` would raise :class:`notario.exceptions.Invalid` (or
+    :class:`notario.exceptions.SchemaError`) for it. It is faster than
+    catching the exception, since it does not keep track of where it is in the
+    data to report it, so use :func:`explain` to find out why some data is
+    not valid.
+
+    Hooks and profiles are not called for it.
+    """
+    if not isinstance(data, dict):
+        raise TypeError('expected data to be of type dict, but got: %s' % type(data))
+    return CompiledSchema(schema, defined_keys=defined_keys).is_valid(data)
+
+
+def explain(data, schema, defined_keys=False):
+    """
+    Validate ``data`` against ``schema`` and return the
+    :class:`notario.exceptions.Invalid` (or
+    :class:`notario.exceptions.SchemaError`) exception that :func:`validate`
+    would raise, or ``None`` if ``data`` is valid::
+
+        if not is_valid(data, schema):
+            log.warning('rejected: %s', explain(data, schema))
+    """
+    if not isinstance(data, dict):
         raise TypeError('expected data to be of type dict, but got: %s' % type(data))
+    return CompiledSchema(schema, defined_keys=defined_keys).explain(data)
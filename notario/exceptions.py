@@ -94,3 +94,21 @@ class Skip(Exception):
     to get the right key for a given data.
     """
     pass
+
+
+class ValidationBudgetExceeded(Exception):
+    """
+    Raised when validating some data goes over one of the limits given to
+    :func:`notario.engine.validate` (like ``max_nodes``). It tells nothing
+    about the data being valid or not, validation stopped before finding out.
+    """
+
+    def __init__(self, limit, value, path):
+        self.limit = limit
+        self.value = value
+        self.path = path
+        Exception.__init__(self, self.__str__())
+
+    def __str__(self):
+        path = ''.join('-> %s ' % key for key in self.path) or '-> top level '
+        return '%swent over the validation budget: %s (%s)' % (path, self.limit, self.value)
@@ -0,0 +1,229 @@
+"""
+Validation of many files at once, for checks that run over a repository
+where most of the files do not change between runs::
+
+    cache = FileCache('/var/cache/myapp/results.sqlite')
+    errors = validate_files(paths, schema, cache=cache, load=yaml.safe_load)
+
+The outcome of every file is saved to a local ``sqlite3`` database, keyed by
+a hash of the contents of the file, the fingerprint of the schema (see
+:func:`notario.snapshot.fingerprint`), the function loading the files and
+the version of notario, so only the files that changed (or all of them when
+the schema, or a module defining its validators, changed) are validated
+again.
+
+Results are kept for the ``max_entries`` most recently used files (and for at
+most ``max_age`` seconds, if given), results of other versions of notario are
+dropped.
+"""
+import functools
+import hashlib
+import json
+import sqlite3
+import sys
+import time
+
+import notario
+from notario import engine
+from notario._compat import basestring
+from notario.exceptions import Invalid, SchemaError
+
+
+def schema_fingerprint(schema, defined_keys=False):
+    """
+    A fingerprint of ``schema`` that changes with the schema and with the
+    source files of the modules defining its validators, or ``None`` if the
+    schema can't be fingerprinted.
+    """
+    from notario.snapshot import fingerprint, sources
+    try:
+        key, modules = fingerprint(schema, defined_keys)
+    except Exception:
+        return None
+    found = sources(modules)
+    versions = repr(sorted((name, found[name][1:]) for name in found))
+    return hashlib.sha1((key + versions).encode('utf-8')).hexdigest()
+
+
+def loader_name(load):
+    """
+    A name for the ``load`` function that is the same in every process, so
+    that the outcomes of files loaded differently (say as JSON and as YAML)
+    are not mixed up. Partials are named after their function and
+    arguments. ``None`` for functions that can't be imported by name (like
+    lambdas) or arguments that are not plain values, their files are not
+    cached.
+    """
+    from notario.snapshot import importable
+    if isinstance(load, functools.partial):
+        keywords = sorted((load.keywords or {}).items())
+        parts = [loader_name(load.func)]
+        parts.extend(loader_name(arg) for arg in load.args)
+        parts.extend(loader_name(value) for key, value in keywords)
+        if None in parts:
+            return None
+        names = [key + '=' for key, value in keywords]
+        names = [''] * (len(parts) - len(names)) + names
+        return 'partial(%s)' % ', '.join(n + part for n, part in zip(names, parts))
+    if load is None or isinstance(load, (basestring, bytes, int, float, bool)):
+        return repr(load)
+    if isinstance(load, tuple):
+        parts = [loader_name(item) for item in load]
+        if None in parts:
+            return None
+        return '(%s)' % ', '.join(parts)
+    if getattr(load, '__module__', None) and hasattr(load, '__name__') and importable(load):
+        return '%s.%s' % (load.__module__, getattr(load, '__qualname__', load.__name__))
+    return None
+
+
+class FileCache(object):
+    """
+    Outcomes of validated files, saved in the ``sqlite3`` database at
+    ``path``.
+    """
+
+    def __init__(self, path, max_entries=100000, max_age=None):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.version = notario.__version__
+        self.hits = 0
+        self.misses = 0
+        self.connection = sqlite3.connect(path, timeout=30)
+        with self.connection:
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS results ('
+                'content TEXT, schema TEXT, version TEXT, error TEXT, used REAL, '
+                'PRIMARY KEY (content, schema, version))'
+            )
+            self.connection.execute(
+                'CREATE INDEX IF NOT EXISTS results_used ON results (used)'
+            )
+        self.used = []
+
+    def get(self, content, schema):
+        """
+        Return ``(found, error)`` for the file with the hash ``content``
+        validated with the schema with the fingerprint ``schema``, where
+        ``error`` is ``None`` if it was valid.
+        """
+        row = self.connection.execute(
+            'SELECT error FROM results WHERE content = ? AND schema = ? AND version = ?',
+            (content, schema, self.version)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        self.used.append((content, schema, self.version))
+        return True, row[0]
+
+    def put(self, content, schema, error):
+        """
+        Save the outcome of a file, ``error`` being ``None`` if it was valid.
+        """
+        self.connection.execute(
+            'INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)',
+            (content, schema, self.version, error, time.time())
+        )
+
+    def flush(self):
+        """
+        Save the outcomes added and the results used since the last flush,
+        and evict what goes over the limits.
+        """
+        now = time.time()
+        with self.connection:
+            self.connection.executemany(
+                'UPDATE results SET used = ? WHERE content = ? AND schema = ? AND version = ?',
+                [(now,) + key for key in self.used]
+            )
+            self.used = []
+            self.evict(now)
+
+    def evict(self, now=None):
+        execute = self.connection.execute
+        execute('DELETE FROM results WHERE version != ?', (self.version,))
+        if self.max_age is not None:
+            execute('DELETE FROM results WHERE used < ?', ((now or time.time()) - self.max_age,))
+        if self.max_entries is not None:
+            execute(
+                'DELETE FROM results WHERE rowid IN (SELECT rowid FROM results '
+                'ORDER BY used DESC LIMIT -1 OFFSET ?)', (self.max_entries,)
+            )
+
+    def clear(self):
+        """
+        Drop every saved outcome.
+        """
+        with self.connection:
+            self.connection.execute('DELETE FROM results')
+        self.used = []
+
+    def close(self):
+        self.flush()
+        self.connection.close()
+
+    def __len__(self):
+        return self.connection.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+
+def check(contents, compiled, load):
+    """
+    Validate the ``contents`` of a file, returning the error message or
+    ``None`` if it is valid.
+    """
+    try:
+        data = load(contents.decode('utf-8'))
+    except Exception:
+        return 'could not load the file: %s' % sys.exc_info()[1]
+    if not isinstance(data, dict):
+        return 'expected data to be of type dict, but got: %s' % type(data)
+    try:
+        compiled.validate(data)
+    except (Invalid, SchemaError):
+        return str(sys.exc_info()[1])
+
+
+def validate_files(paths, schema, cache=None, load=json.loads, defined_keys=False):
+    """
+    Validate the files at ``paths`` against ``schema``, returning a
+    dictionary of the paths of the files that are not valid to their error
+    messages.
+
+    :param cache: A :class:`FileCache` to skip the files validated already.
+                  Nothing is cached for schemas or ``load`` functions that
+                  can't be named the same way in every process.
+    :param load: The function that loads the text of a file into a
+                 dictionary, like ``yaml.safe_load``.
+    """
+    compiled = engine.compile(schema, defined_keys=defined_keys)
+    fingerprint = None
+    if cache is not None:
+        fingerprint = schema_fingerprint(schema, defined_keys)
+        loader = loader_name(load)
+        if fingerprint is None or loader is None:
+            fingerprint = None
+        else:
+            key = fingerprint + loader
+            fingerprint = hashlib.sha1(key.encode('utf-8')).hexdigest()
+    errors = {}
+    try:
+        for path in paths:
+            with open(path, 'rb') as f:
+                contents = f.read()
+            if fingerprint is None:
+                error = check(contents, compiled, load)
+            else:
+                content = hashlib.sha1(contents).hexdigest()
+                found, error = cache.get(content, fingerprint)
+                if not found:
+                    error = check(contents, compiled, load)
+                    cache.put(content, fingerprint, error)
+            if error is not None:
+                errors[path] = error
+    finally:
+        if fingerprint is not None:
+            cache.flush()
+    return errors
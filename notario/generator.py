@@ -0,0 +1,293 @@
+"""
+Generate data out of a schema, valid (and purposely invalid) documents to
+load test and benchmark schemas without curating fixtures by hand.
+"""
+import copy
+import random
+import string
+
+from notario import engine
+from notario._compat import basestring
+from notario.exceptions import NotarioException
+from notario.utils import is_callable, expand_schema
+from notario.validators import Hybrid
+from notario.validators.chainable import AllIn, AnyIn
+from notario.validators.iterables import AllItems, AnyItem, MultiIterable
+from notario.validators.recursive import AllObjects, AnyObject, MultiRecursive
+
+
+class Generator(object):
+    """
+    Produces documents for ``schema`` using a ``random.Random`` seeded with
+    ``seed``, so that the same seed produces the same documents.
+
+    Literal keys and values are used as they are, and values for the type
+    validators in :mod:`notario.validators.types` (or validators decorated
+    with them) are made up, as well as arrays and objects for the iterable
+    and recursive validators. Optional keys are included half of the time.
+
+    Arrays have at most ``max_items`` items, and ``max_depth`` limits how
+    deep recursive (``delay``-ed) schemas go: from that depth on arrays and
+    objects are generated empty and optional keys are left out.
+
+    Any other validator can be supported by giving it a ``__generate__``
+    attribute, a callable that receives the ``random.Random`` instance and
+    returns a value. Validators that wrap another one (with
+    ``functools.wraps``) are generated from the wrapped one and checked
+    against the wrapping validator.
+    """
+
+    def __init__(self, schema, seed=None, max_items=5, max_depth=5, attempts=50):
+        self.schema = schema
+        self.compiled = engine.compile(schema)
+        self.random = random.Random(seed)
+        self.max_items = max_items
+        self.max_depth = max_depth
+        self.attempts = attempts
+
+    def is_valid(self, document):
+        try:
+            self.compiled.validate(document)
+        except NotarioException:
+            return False
+        return True
+
+    def document(self):
+        """
+        Generate a document that is valid for the schema.
+        """
+        for _ in range(self.attempts):
+            document = self.object(self.schema, 0)
+            if self.is_valid(document):
+                return document
+        raise ValueError('could not generate a valid document for the schema')
+
+    def invalid(self, document):
+        """
+        Return a copy of ``document`` with a random mutation (a value of the
+        wrong type, a missing key or an unexpected key) that makes it invalid.
+        """
+        for _ in range(self.attempts):
+            mutated = copy.deepcopy(document)
+            self.mutate(mutated)
+            if not self.is_valid(mutated):
+                return mutated
+        raise ValueError('could not generate an invalid document for the schema')
+
+    def mutate(self, document):
+        containers = list(self.containers(document))
+        container = self.random.choice(containers)
+        if isinstance(container, list):
+            index = self.random.randrange(len(container))
+            container[index] = self.wrong_value(container[index])
+            return
+
+        mutation = self.random.choice(['type', 'missing', 'unexpected'])
+        if mutation == 'unexpected' or not container:
+            container['~%s' % self.text()] = self.text()
+        elif mutation == 'missing':
+            del container[self.random.choice(sorted(container, key=repr))]
+        else:
+            key = self.random.choice(sorted(container, key=repr))
+            container[key] = self.wrong_value(container[key])
+
+    def containers(self, value):
+        """
+        All the dictionaries and non-empty lists in ``value``.
+        """
+        if isinstance(value, dict):
+            yield value
+            items = value.values()
+        elif isinstance(value, list):
+            if value:
+                yield value
+            items = value
+        else:
+            return
+        for item in items:
+            for container in self.containers(item):
+                yield container
+
+    def wrong_value(self, value):
+        if isinstance(value, basestring):
+            return self.random.randint(-1000, 1000)
+        return self.text()
+
+    #
+    # Schemas
+    #
+
+    def pairs(self, schema):
+        schema = expand_schema(schema)
+        if schema and isinstance(schema[0], tuple):
+            return list(schema)
+        return [schema]
+
+    def object(self, schema, depth):
+        if depth > self.max_depth * 4:
+            raise ValueError('could not generate data within the maximum depth')
+        document = {}
+        pairs = self.pairs(schema)
+        for position, (key, value) in enumerate(pairs):
+            optional_key = getattr(key, '_object', None)
+            if optional_key is not None:
+                if depth >= self.max_depth or self.random.random() < 0.5:
+                    continue
+                key = optional_key
+            elif is_callable(key):
+                key = self.key(key, document, pairs[position + 1:])
+            document[key] = self.value(value, depth)
+        return document
+
+    def key(self, validator, document, following):
+        """
+        Keys are matched to the schema in alphabetical order, so a key
+        generated for a callable must sort after the keys before it and
+        before the literal keys that follow it.
+        """
+        lower = max([k for k in document if isinstance(k, basestring)] or [''])
+        upper = None
+        for key, _ in following:
+            key = getattr(key, '_object', key)
+            if isinstance(key, basestring):
+                upper = key
+                break
+        for _ in range(self.attempts):
+            key = self.value(validator, 0)
+            if not isinstance(key, basestring):
+                return key
+            key = lower + key
+            if key not in document and (upper is None or key < upper):
+                return key
+        raise ValueError('could not generate a key for %s' % validator.__name__)
+
+    def value(self, schema, depth):
+        if hasattr(schema, '__ref__'):
+            schema = expand_schema(schema)
+        if isinstance(schema, tuple):
+            return self.object(schema, depth + 1)
+        if not is_callable(schema):
+            return copy.deepcopy(schema)
+        return self.callable(schema, depth)
+
+    def items(self, depth, minimum=0):
+        if depth >= self.max_depth:
+            return minimum
+        return self.random.randint(minimum, max(self.max_items, minimum))
+
+    def callable(self, validator, depth):
+        generate = getattr(validator, '__generate__', None)
+        if generate is not None:
+            return generate(self.random)
+
+        check = engine.prepare_type_check(validator)
+        if check.__class__ is engine.TypeCheck:
+            if check.wrapped is None:
+                return self.typed(check.valid_types)
+            return self.checked(validator, lambda: self.typed(check.valid_types))
+
+        if isinstance(validator, (AllItems, AnyItem)):
+            minimum = 1 if isinstance(validator, AnyItem) else 0
+            schema = expand_schema(validator.schema)
+            return [
+                self.value(schema, depth + 1)
+                for _ in range(self.items(depth, minimum))
+            ]
+        if isinstance(validator, MultiIterable):
+            return [
+                self.value(expand_schema(self.random.choice(validator.schemas)), depth + 1)
+                for _ in range(self.items(depth))
+            ]
+        if isinstance(validator, (AllObjects, AnyObject)):
+            minimum = 1 if isinstance(validator, AnyObject) else 0
+            return self.objects(
+                [validator.schema] * self.items(depth, minimum), depth + 1
+            )
+        if isinstance(validator, MultiRecursive):
+            schemas = [
+                self.random.choice(validator.schemas) for _ in range(self.items(depth))
+            ]
+            return self.objects(schemas, depth + 1)
+        if isinstance(validator, Hybrid):
+            try:
+                return self.callable(validator.validator, depth)
+            except TypeError:
+                return self.objects([validator.schema], depth + 1)
+        if isinstance(validator, AllIn):
+            return self.checked(validator, lambda: self.callable(validator.args[0], depth))
+        if isinstance(validator, AnyIn):
+            return self.callable(self.random.choice(validator.args), depth)
+
+        wrapped = getattr(validator, '__wrapped__', None)
+        if wrapped is not None:
+            return self.checked(validator, lambda: self.callable(wrapped, depth))
+        raise TypeError('cannot generate data for callable: %s' % validator.__name__)
+
+    def objects(self, schemas, depth):
+        """
+        Merge objects generated for every schema in ``schemas``, as needed by
+        the recursive validators.
+        """
+        document = {}
+        for schema in schemas:
+            document.update(self.object(schema, depth))
+        return document
+
+    def checked(self, validator, generate):
+        """
+        Generate values until one passes ``validator``.
+        """
+        for _ in range(self.attempts):
+            value = generate()
+            try:
+                validator(value)
+            except AssertionError:
+                continue
+            return value
+        raise ValueError('could not generate a value for %s' % validator.__name__)
+
+    #
+    # Values
+    #
+
+    def text(self):
+        length = self.random.randint(1, 12)
+        return ''.join(self.random.choice(string.ascii_lowercase) for _ in range(length))
+
+    def typed(self, valid_types):
+        valid_type = valid_types[0]
+        if valid_type is bool:
+            return self.random.choice([True, False])
+        if valid_type is int:
+            return self.random.randint(-1000, 1000)
+        if valid_type is list:
+            return [self.random.randint(-1000, 1000) for _ in range(self.items(0))]
+        if valid_type is dict:
+            return dict((self.text(), self.random.randint(-1000, 1000)) for _ in range(self.items(0)))
+        if issubclass(basestring, valid_type) or valid_type is str:
+            return self.text()
+        raise TypeError('cannot generate data of type: %s' % valid_type.__name__)
+
+
+def generate(schema, n, seed=None, invalid_ratio=0, labels=False, **options):
+    """
+    Generate ``n`` documents for ``schema``, reproducible with the same
+    ``seed``. About ``invalid_ratio`` of them (a number between 0 and 1) are
+    made invalid with a random mutation. With ``labels=True`` every document
+    comes in a ``(document, valid)`` tuple::
+
+        for document, valid in generate(schema, 1000, seed=1, invalid_ratio=0.1, labels=True):
+            ...
+
+    Other keyword arguments are passed on to :class:`Generator`.
+    """
+    generator = Generator(schema, seed=seed, **options)
+    for _ in range(n):
+        document = generator.document()
+        valid = generator.random.random() >= invalid_ratio
+        if not valid:
+            document = generator.invalid(document)
+        if labels:
+            yield document, valid
+        else:
+            yield document
@@ -1,39 +1,124 @@
-from notario.utils import ndict, is_nested_tuple
+from notario.utils import ndict, nlist, is_nested_tuple
 
 
 class BaseNormalize(object):
 
     def __init__(self, data, schema):
-        self.raw_data = dict(data)
+        self.raw_data = data
         self.raw_schema = schema
 
-    def ordered_dict(self, data_structure, use_n_dict=False):
-        if use_n_dict:
-            ordered = ndict()
-        else:
-            ordered = {}
-        for number, value in enumerate(data_structure):
-            ordered[number] = value
-        return ordered
 
+class DataView(ndict):
+    """
+    A read-only view of a dictionary with the normalized form the engine works
+    with: integers as keys, for the ``(key, value)`` items sorted by key, so
+    that ``{'b': 2, 'a': 1}`` looks like ``{0: ('a', 1), 1: ('b', 2)}``.
+    Nested dictionaries are presented as views too.
 
-class Data(BaseNormalize):
+    Nothing is copied and the original dictionary is never altered. The keys
+    are sorted the first time an item is needed (so parts of a document that
+    are never validated are never sorted) and the index, which only holds
+    references to the original keys and values, is kept for lookups.
+    """
+
+    __slots__ = ('_raw', '_loaded')
+
+    def __init__(self, raw):
+        self._raw = raw
+        self._loaded = False
+
+    def _load(self):
+        items = []
+        for key in sorted(self._raw):
+            value = self._raw[key]
+            if isinstance(value, dict):
+                value = DataView(value)
+            items.append((key, value))
+        dict.update(self, enumerate(items))
+        self._loaded = True
+
+    def __missing__(self, index):
+        # only called by ``dict`` for keys it does not have, which are all of
+        # them until the index is loaded
+        if self._loaded:
+            raise KeyError(index)
+        self._load()
+        return dict.__getitem__(self, index)
+
+    def get(self, index, default=None):
+        if not self._loaded:
+            self._load()
+        return dict.get(self, index, default)
+
+    def __len__(self):
+        return len(self._raw)
+
+    def __iter__(self):
+        if not self._loaded:
+            self._load()
+        return dict.__iter__(self)
+
+    def __contains__(self, index):
+        if not self._loaded:
+            self._load()
+        return dict.__contains__(self, index)
+
+    def keys(self):
+        if not self._loaded:
+            self._load()
+        return dict.keys(self)
+
+    def values(self):
+        if not self._loaded:
+            self._load()
+        return dict.values(self)
+
+    def items(self):
+        if not self._loaded:
+            self._load()
+        return dict.items(self)
 
-    def _normalize(self, data_structure, sort=True):
-        if sort:
-            for k, v in data_structure.items():
-                if isinstance(v, dict):
-                    data_structure[k] = self._normalize(v)
-            data_structure = sorted(data_structure.items())
-        return self.ordered_dict(data_structure, use_n_dict=True)
+    def __eq__(self, other):
+        if isinstance(other, DataView) and other._raw is self._raw:
+            return True
+        if not isinstance(other, dict):
+            return NotImplemented
+        if isinstance(other, DataView) and not other._loaded:
+            other._load()
+        if not self._loaded:
+            self._load()
+        return dict.__eq__(self, other)
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        if equal is NotImplemented:
+            return equal
+        return not equal
+
+    __hash__ = None
+
+    def __repr__(self):
+        if not self._loaded:
+            self._load()
+        return dict.__repr__(self)
+
+    def _read_only(self, *args, **kw):
+        raise TypeError('%s is read-only' % self.__class__.__name__)
+
+    __setitem__ = __delitem__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+
+class Data(BaseNormalize):
 
     def normalized(self):
         """
-        Normalizes the ``raw_data`` (a plain dictionary) and returns an ordered
-        dictionary, with integers as keys for tuples.
+        Returns a :class:`DataView` of the ``raw_data`` (a plain dictionary),
+        an ordered dictionary with integers as keys for tuples.
         """
-        normalized_data = self._normalize(self.raw_data)
-        return normalized_data
+        if isinstance(self.raw_data, DataView):
+            return self.raw_data
+        return DataView(self.raw_data)
 
 
 class Schema(BaseNormalize):
@@ -41,22 +126,41 @@ class Schema(BaseNormalize):
     def _normalize(self, data):
         if len(data) == 2 and isinstance(data[1], tuple) or len(data) > 2:
             if not isinstance(data[0], tuple):
-                new_struct = ndict({0: (data[0], self._normalize(data[1]))})
+                new_struct = nlist([(data[0], self._normalize(data[1]))])
             else:
-                new_struct = self.ordered_dict(data, use_n_dict=True)
+                new_struct = nlist(data)
             for i in range(len(new_struct)):
-                value = new_struct.get(i)
+                value = new_struct[i]
                 if is_nested_tuple(value):
                     new_struct[i] = (value[0], self._normalize(value[1]))
+                elif is_reference(value):
+                    new_struct[i] = (value[0], value[1].prepared())
             if hasattr(data, 'must_validate'):
                 new_struct.must_validate = data.must_validate
             return new_struct
         else:
-            new_struct = ndict({0: data})
+            if is_reference(data):
+                data = (data[0], data[1].prepared())
+            new_struct = nlist([data])
             if hasattr(data, 'must_validate'):
                 new_struct.must_validate = data.must_validate
             return new_struct
 
     def normalized(self):
+        """
+        Normalizes the ``raw_schema`` into an :class:`notario.utils.nlist` of
+        ``(key, value)`` items, recursing into nested schemas. References to
+        named schemas (see :mod:`notario.registry`) are replaced by their
+        shared, already prepared, form.
+        """
+        if hasattr(self.raw_schema, '__ref__'):
+            return self.raw_schema.prepared()
         normalized_data = self._normalize(self.raw_schema)
         return normalized_data
+
+
+def is_reference(item):
+    """
+    A key/value pair with a reference to a named schema as the value.
+    """
+    return isinstance(item, tuple) and len(item) == 2 and hasattr(item[1], '__ref__')
@@ -0,0 +1,136 @@
+"""
+Validation of only some parts of a document, selected by their paths::
+
+    validate(data, schema, paths=['metadata.labels', 'spec.containers'])
+
+A path is a string of keys separated by dots, or a tuple of keys for keys
+that have dots in them or are not strings. The schema is cut down to the
+keys in the paths, like a :class:`notario.validators.cherry_pick` at every
+level, so the rest of the document is not validated nor looked at. Errors
+have the same paths they would have when validating the whole document.
+
+Arrays validated with ``AllItems`` and objects validated with ``AllObjects``
+are selected through: ``spec.containers.image`` selects the ``image`` of
+every item of ``containers``, and ``a.bar`` selects the ``bar`` of every
+object of ``a``. Values with any other validator are validated whole.
+"""
+import copy
+
+from notario._compat import basestring
+from notario.utils import expand_schema, is_callable
+from notario.validators import cherry_pick, schema_pairs
+from notario.validators.iterables import AllItems
+from notario.validators.recursive import AllObjects
+
+
+def split(path):
+    """
+    The keys of ``path``, as a tuple.
+    """
+    if isinstance(path, basestring):
+        return tuple(path.split('.'))
+    return tuple(path)
+
+
+def selection(paths):
+    """
+    The ``paths`` as nested dictionaries of the keys selected at every level,
+    where ``None`` selects everything under a key. ``None`` if one of the
+    paths is empty, which selects the whole document.
+    """
+    selected = {}
+    for keys in paths:
+        keys = split(keys)
+        if not keys:
+            return None
+        node = selected
+        for key in keys[:-1]:
+            node = node.setdefault(key, {})
+            if node is None:  # everything under it is selected already
+                break
+        else:
+            node[keys[-1]] = None
+    return selected
+
+
+def matches(schema_key, key):
+    """
+    Tell if ``schema_key`` is the one for the data ``key``.
+    """
+    if hasattr(schema_key, 'is_optional'):
+        return schema_key._object == key
+    if is_callable(schema_key):
+        try:
+            schema_key(key)
+        except AssertionError:
+            return False
+        return True
+    return schema_key == key
+
+
+def picked(pairs, keys):
+    """
+    A :class:`notario.validators.cherry_pick` of ``pairs`` that validates the
+    data ``keys``, which the schema keys may not be equal to (like
+    ``types.string``).
+    """
+    if len(pairs) == 1:
+        pairs = pairs[0]
+    # cherry_pick() works the keys out of the pairs, these are known already
+    schema = tuple.__new__(cherry_pick, pairs)
+    schema.must_validate = tuple(keys)
+    return schema
+
+
+def format_path(keys):
+    return '.'.join(str(key) for key in keys)
+
+
+def select_level(schema, selected, path):
+    pairs = schema_pairs(schema)
+    if not pairs:
+        raise LookupError('there are no keys to select at: %s' % format_path(path))
+    found = []
+    keys = sorted(selected)
+    for key in keys:
+        for schema_key, value in pairs:
+            if matches(schema_key, key):
+                break
+        else:
+            raise LookupError('path is not in the schema: %s' % format_path(path + (key,)))
+        if selected[key] is not None:
+            value = select_value(value, selected[key], path + (key,))
+        found.append((schema_key, value))
+    return picked(found, keys)
+
+
+def select_value(value, selected, path):
+    if hasattr(value, '__ref__'):
+        value = expand_schema(value)
+    if isinstance(value, tuple):
+        return select_level(value, selected, path)
+    if value.__class__ is AllItems:
+        schema = select_level(expand_schema(value.schema), selected, path)
+    elif value.__class__ is AllObjects:
+        pairs = schema_pairs(value.schema)
+        if len(pairs) != 1:
+            return value
+        key, objects = pairs[0]
+        schema = (key, select_value(objects, selected, path))
+    else:
+        return value
+    value = copy.copy(value)
+    value.schema = schema
+    return value
+
+
+def select(schema, paths):
+    """
+    Return ``schema`` cut down to validate only the data at ``paths``.
+
+    :raises: LookupError if a path is not in the schema
+    """
+    selected = selection(paths)
+    if selected is None:
+        return schema
+    return select_level(expand_schema(schema), selected, ())
@@ -0,0 +1,268 @@
+"""
+Per-node profiling of the validation engine. Instead of attributing time to
+the engine internals (like a regular profiler would) it is attributed to the
+paths of the schema being validated.
+
+It can also measure the memory used by a validation, with ``tracemalloc``.
+"""
+import os
+import re
+
+try:
+    import tracemalloc
+except ImportError:  # pragma: no cover, Python 2
+    tracemalloc = None
+
+from notario import engine
+from notario._compat import basestring
+from notario.exceptions import NotarioException
+from notario.utils import is_callable, safe_repr
+
+
+list_item = re.compile(r'^list\[\d*\]$')
+
+
+class NodeStats(object):
+    """
+    The accumulated numbers for a single path of the schema.
+    """
+
+    __slots__ = ('path', 'calls', 'total', 'own', 'raised', 'swallowed')
+
+    def __init__(self, path):
+        self.path = path
+        self.calls = 0
+        self.total = 0.0
+        self.own = 0.0
+        self.raised = 0
+        self.swallowed = 0
+
+    def __repr__(self):
+        return '<NodeStats %s calls=%s total=%.6f>' % (
+            format_path(self.path), self.calls, self.total
+        )
+
+
+def format_path(path):
+    if not path:
+        return '-> top level'
+    return ' '.join('-> %s' % key for key in path)
+
+
+def schema_key(key, schema_node):
+    """
+    Return the key used to group a node: array items are grouped regardless
+    of their index and keys validated by a callable are grouped by the name of
+    the callable (e.g. ``<string>``), so that every object validated against
+    the same schema ends up in the same path.
+    """
+    if isinstance(key, basestring) and list_item.match(key):
+        return 'list[]'
+    if isinstance(schema_node, tuple) and len(schema_node) == 2:
+        skey = schema_node[0]
+        if is_callable(skey):
+            optional_key = getattr(skey, '_object', None)
+            if optional_key is not None:
+                return optional_key
+            return '<%s>' % safe_repr(skey)
+    return key
+
+
+class Profile(engine.Hooks):
+    """
+    Records, for every path of a schema, how many times it was validated, the
+    total time spent on it (including nested nodes) and its own time, and how
+    many errors it raised or swallowed (errors raised by nested nodes that
+    did not make it out, like the misses of an ``AnyItem``).
+
+    It is used with :func:`notario.validate` or :func:`profiling`::
+
+        profile = validate(data, schema, profile=True)
+        print(profile.report())
+    """
+
+    def __init__(self):
+        self.nodes = {}
+        self._stack = []
+
+    def on_node_enter(self, path, schema_node):
+        if self._stack:
+            key = self._stack[-1][0] + (schema_key(path[-1], schema_node),)
+        else:
+            key = ()
+        # the schema path, time spent in nested nodes and their failures
+        self._stack.append([key, 0.0, 0])
+
+    def on_node_exit(self, path, ok, elapsed):
+        key, nested_time, nested_failures = self._stack.pop()
+        stats = self.nodes.get(key)
+        if stats is None:
+            stats = self.nodes[key] = NodeStats(key)
+        stats.calls += 1
+        stats.total += elapsed
+        stats.own += elapsed - nested_time
+        if ok:
+            stats.swallowed += nested_failures
+        else:
+            stats.raised += 1
+            stats.swallowed += max(nested_failures - 1, 0)
+        if self._stack:
+            parent = self._stack[-1]
+            parent[1] += elapsed
+            if not ok:
+                parent[2] += 1
+
+    def stats(self, sort='total'):
+        """
+        All the recorded paths, from the hottest one, sorted by ``sort``
+        which can be any of the :class:`NodeStats` numbers.
+        """
+        return sorted(
+            self.nodes.values(),
+            key=lambda stats: getattr(stats, sort),
+            reverse=True
+        )
+
+    def report(self, limit=20, sort='total'):
+        """
+        A table of the hottest ``limit`` paths.
+        """
+        lines = ['%8s %12s %12s %8s %10s  %s' % (
+            'calls', 'total', 'own', 'raised', 'swallowed', 'path'
+        )]
+        for stats in self.stats(sort=sort)[:limit]:
+            lines.append('%8d %12.6f %12.6f %8d %10d  %s' % (
+                stats.calls, stats.total, stats.own, stats.raised,
+                stats.swallowed, format_path(stats.path)
+            ))
+        return '\n'.join(lines)
+
+
+def profiling(profile=None):
+    """
+    Profile every validation done in the current thread while the context
+    manager is active::
+
+        with profiling() as profile:
+            for document in documents:
+                validate(document, schema)
+        print(profile.report())
+    """
+    return engine.tracing(profile or Profile())
+
+
+package_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def module_name(filename):
+    """
+    The notario module for ``filename`` (like ``notario.engine``) or
+    ``<other>`` for anything that is not part of notario.
+    """
+    filename = os.path.abspath(filename)
+    if not filename.startswith(package_dir + os.sep):
+        return '<other>'
+    relative = os.path.splitext(os.path.relpath(filename, package_dir))[0]
+    return '.'.join(['notario'] + relative.split(os.sep))
+
+
+class MemoryUsage(object):
+    """
+    The memory used by a validation: ``peak`` is the highest number of bytes
+    allocated (over what was allocated before it started). What was
+    allocated on the way to the peak and freed is not broken down, only the
+    memory still held when validation was over (like prepared schemas and
+    cached results): ``retained`` maps every module to the ``size`` and
+    ``count`` of those memory blocks, ``retained_blocks`` being the total
+    count. If the validation failed the exception is kept in ``error``.
+    """
+
+    def __init__(self):
+        self.peak = 0
+        self.retained_blocks = 0
+        self.retained = {}
+        self.error = None
+
+    def as_dict(self):
+        return {
+            'peak': self.peak,
+            'retained_blocks': self.retained_blocks,
+            'retained': dict(
+                (name, dict(stats)) for name, stats in self.retained.items()
+            ),
+        }
+
+    def report(self):
+        lines = ['peak: %d bytes, retained blocks: %d' % (self.peak, self.retained_blocks)]
+        retained = sorted(
+            self.retained.items(), key=lambda item: item[1]['size'], reverse=True
+        )
+        for name, stats in retained:
+            lines.append('%12d bytes %8d blocks  %s' % (stats['size'], stats['count'], name))
+        return '\n'.join(lines)
+
+
+def measure_memory(func):
+    """
+    Call ``func`` (which should be doing validation) and return the
+    :class:`MemoryUsage` of it. Validation runs as it would otherwise (no
+    hooks are installed), so the peak is the one of a real validation. A
+    breakdown of the peak would need snapshots taken as it goes, which are
+    allocated too and would change it.
+
+    Requires ``tracemalloc`` (Python 3.4 and newer). Before Python 3.9 the
+    peak can only be measured from when tracing started, so if it was
+    already tracing it may include what was allocated before.
+    """
+    if tracemalloc is None:
+        raise RuntimeError('measuring memory requires the tracemalloc module')
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        baseline = tracemalloc.get_traced_memory()[0]
+        reset_peak = getattr(tracemalloc, 'reset_peak', None)
+        if reset_peak is not None:
+            reset_peak()
+
+        usage = MemoryUsage()
+        try:
+            func()
+        except NotarioException as error:
+            usage.error = error
+        usage.peak = max(tracemalloc.get_traced_memory()[1] - baseline, 0)
+
+        ignored = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ]
+        after = tracemalloc.take_snapshot().filter_traces(ignored)
+        for stat in after.compare_to(before.filter_traces(ignored), 'filename'):
+            if stat.size_diff <= 0:
+                continue
+            name = module_name(stat.traceback[0].filename)
+            stats = usage.retained.setdefault(name, {'size': 0, 'count': 0})
+            stats['size'] += stat.size_diff
+            stats['count'] += max(stat.count_diff, 0)
+            usage.retained_blocks += max(stat.count_diff, 0)
+        return usage
+    finally:
+        if started:
+            tracemalloc.stop()
+
+
+def memory_usage(data, schema, **kw):
+    """
+    Validate ``data`` against ``schema`` (a schema or a compiled one) and
+    return the :class:`MemoryUsage` of the validation, including the
+    preparation of the schema when it is not compiled::
+
+        >>> usage = memory_usage(data, schema)
+        >>> print(usage.report())
+
+    Any keyword argument is passed on to :func:`notario.validate`.
+    """
+    if isinstance(schema, engine.CompiledSchema):
+        return measure_memory(lambda: schema.validate(data, **kw))
+    return measure_memory(lambda: engine.validate(data, schema, **kw))
@@ -0,0 +1,125 @@
+"""
+Named schemas, for the sub-schemas that many schemas have in common (an
+address, an amount of money...). A schema is registered once::
+
+    register('address', (
+        ('city', types.string),
+        ('street', types.string),
+    ))
+
+and referenced with :class:`ref` anywhere a schema can go::
+
+    schema = (
+        ('billing', ref('address')),
+        ('shipping', AllItems(ref('address'))),
+    )
+
+Every reference shares the same prepared schema, which is prepared the first
+time it is needed, no matter how many schemas use it. A registered schema
+can reference itself (or other schemas that reference it back) for
+recursive structures.
+"""
+import threading
+
+from notario import engine
+from notario.normal import Schema
+from notario.utils import nlist, safe_repr
+
+
+schemas = {}
+lock = threading.RLock()
+
+
+class Registered(object):
+    """
+    A registered ``schema`` and its prepared form, once it is needed.
+    """
+
+    def __init__(self, name, schema):
+        self.name = name
+        self.schema = schema
+        self.node = None
+        self.ready = False
+
+    def prepared(self):
+        if self.ready:
+            return self.node
+        with lock:
+            if self.node is not None:
+                # ready, or being prepared by this thread which means that
+                # the schema references itself
+                return self.node
+            # references back to this schema while it is prepared get this
+            # same (still empty) node
+            node = self.node = nlist()
+            if hasattr(self.schema, 'must_validate'):
+                node.must_validate = self.schema.must_validate
+            try:
+                node.extend(Schema({}, self.schema).normalized())
+                engine.prepare(node)
+            except Exception:
+                self.node = None
+                raise
+            self.ready = True
+            return node
+
+
+def register(name, schema):
+    """
+    Register ``schema`` as ``name`` so that it can be referenced with
+    :class:`ref`. Registering a name twice raises a ``ValueError``, it has to
+    be removed with :func:`unregister` first.
+    """
+    if not isinstance(schema, tuple):
+        raise TypeError("got a non schema argument: %s" % safe_repr(schema))
+    with lock:
+        if name in schemas:
+            raise ValueError('a schema is already registered as: %s' % name)
+        registered = schemas[name] = Registered(name, schema)
+        engine.shared_schemas[id(schema)] = (schema, registered)
+    return schema
+
+
+def unregister(name):
+    """
+    Remove the schema registered as ``name``. Schemas already prepared with
+    references to it keep using it.
+    """
+    with lock:
+        registered = schemas.pop(name)
+        engine.shared_schemas.pop(id(registered.schema), None)
+
+
+def lookup(name):
+    try:
+        return schemas[name]
+    except KeyError:
+        raise LookupError('no schema is registered as: %s' % name)
+
+
+class ref(object):
+    """
+    A reference to the schema registered as ``name``. It is looked up when
+    the schema using it is prepared, so it can be used before ``name`` is
+    registered.
+    """
+
+    __slots__ = ('name',)
+    __delayed__ = True
+    __ref__ = True
+
+    def __init__(self, name):
+        self.name = name
+
+    @property
+    def __name__(self):
+        return 'ref(%r)' % self.name
+
+    def __repr__(self):
+        return self.__name__
+
+    def __call__(self):
+        return lookup(self.name).schema
+
+    def prepared(self):
+        return lookup(self.name).prepared()
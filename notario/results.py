@@ -0,0 +1,172 @@
+"""
+A cache of validation results, for documents that are validated again and
+again without changing::
+
+    cache = ResultCache(size=10000)
+    compiled = compile(schema, result_cache=cache)
+    compiled.validate(document)
+
+Documents are looked up by a hash of their contents (see :func:`digest`),
+so an identical document skips validation and gets the same result: ``None``
+or a copy of the same exception raised again. Validations with ``paths`` are
+cached apart from the ones of the whole document. Validations with hooks,
+profiles, limits or the sampling policy of the compiled schema are not
+cached. Passing validations that sampled the items of an array (with
+``AllItems(schema, sample=...)`` for example) are not cached either, since
+a different sample could fail. Documents with values other than
+dictionaries, lists, tuples, strings, numbers, booleans and ``None`` are
+always validated.
+
+Validators that depend on something other than the document (like a list of
+names loaded from a database) make cached results stale when that changes,
+use :meth:`ResultCache.invalidate` (or :meth:`ResultCache.clear`) then.
+"""
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+
+from notario._compat import basestring
+from notario.exceptions import Invalid, SchemaError
+
+
+scalars = set([basestring, bytes, str, int, float, bool, type(None)])
+try:
+    scalars.add(long)  # noqa
+except NameError:
+    pass
+
+
+def canonical(value):
+    """
+    A string that is the same for equal documents, no matter the order of
+    their keys, and different for values of different types (like ``1``,
+    ``1.0``, ``True`` and ``'1'``).
+
+    :raises: TypeError for values of any other type
+    """
+    cls = value.__class__
+    if cls in scalars:
+        return repr(value)
+    if isinstance(value, dict):
+        items = sorted(canonical(k) + ':' + canonical(v) for k, v in value.items())
+        return '{' + ','.join(items) + '}'
+    if isinstance(value, list):
+        return '[' + ','.join([canonical(item) for item in value]) + ']'
+    if isinstance(value, tuple):
+        return '(' + ','.join([canonical(item) for item in value]) + ')'
+    raise TypeError('can not hash values of type %s' % cls.__name__)
+
+
+def copy_error(error):
+    """
+    A copy of ``error`` with a path of its own, so that changing the
+    exception a caller got does not change the one in the cache.
+    """
+    copied = error.__class__.__new__(error.__class__)
+    copied.__dict__.update(error.__dict__)
+    copied.args = error.args
+    copied.path = list(error.path)
+    return copied
+
+
+def digest(data):
+    """
+    The hash of the contents of ``data``, see :func:`canonical`.
+    """
+    return hashlib.sha1(canonical(data).encode('utf-8')).digest()
+
+
+class ResultCache(object):
+    """
+    Keeps the results of the last ``size`` documents validated (by any
+    compiled schema using it), dropping the least recently used ones.
+    """
+
+    def __init__(self, size=1024):
+        self.size = size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def validate(self, compiled, data, validate):
+        """
+        Return (or raise) the result of validating ``data`` with
+        ``compiled``, calling ``validate(data)`` if it is not cached. It
+        returns ``None``, or a :class:`notario.sampling.Report` when items
+        were sampled, which is not cached.
+        """
+        try:
+            key = id(compiled), digest(data)
+        except TypeError:
+            return validate(data)
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry is not None and entry[0] is compiled:
+                self.entries[key] = entry
+                self.hits += 1
+                found = entry
+            else:
+                self.misses += 1
+                found = None
+        if found is not None:
+            if found[1] is not None:
+                raise copy_error(found[1])
+            return None
+
+        error = None
+        try:
+            result = validate(data)
+        except Exception:
+            error = sys.exc_info()[1]
+            if not isinstance(error, (Invalid, SchemaError)):
+                raise
+        else:
+            if result is not None:
+                # items were sampled, another sample could fail
+                return result
+        cached = None
+        if error is not None:
+            cached = copy_error(error)
+        with self.lock:
+            self.entries[key] = (compiled, cached)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+        if error is not None:
+            raise error
+        return None
+
+    def invalidate(self, compiled=None):
+        """
+        Drop the results of ``compiled``, or of every compiled schema if it
+        is not given.
+        """
+        with self.lock:
+            if compiled is None:
+                self.entries.clear()
+                return
+            for key in [key for key, entry in self.entries.items() if entry[0] is compiled]:
+                del self.entries[key]
+
+    def discard(self, compiled, data):
+        """
+        Drop the result of validating ``data`` with ``compiled``.
+        """
+        try:
+            key = id(compiled), digest(data)
+        except TypeError:
+            return
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        """
+        Drop every result and reset the counts of ``hits`` and ``misses``.
+        """
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = 0
@@ -0,0 +1,160 @@
+"""
+Validation of a sample of the items of very large arrays, for data from
+trusted sources where validating every item costs more than it is worth::
+
+    schema = ('events', AllItems(event, sample=Sample(fraction=0.01)))
+
+A compiled schema can have a policy for all of its ``AllItems`` and
+``AllObjects`` validators that do not have one of their own (pass
+``sample=False`` to one of them to always validate all of its items)::
+
+    compiled = compile(schema, sample=Sample(stride=100))
+    report = compiled.validate(data)
+
+When items were sampled, ``validate`` returns a :class:`Report` telling how
+many were validated, it returns ``None`` as usual otherwise. The first and
+the last items are always validated.
+"""
+import math
+import random
+import threading
+
+
+class Sample(object):
+    """
+    Which items of an array to validate, given as exactly one of:
+
+    :param fraction: Validate this fraction of the items (like ``0.01``),
+                     picked at random.
+    :param stride: Validate one item out of every ``stride`` items.
+    :param size: Validate this many items, picked at random.
+    :param seed: Seed for the items picked at random, so that the same ones
+                 are picked every time for arrays of the same length.
+    """
+
+    def __init__(self, fraction=None, stride=None, size=None, seed=None):
+        given = [option for option in (fraction, stride, size) if option is not None]
+        if len(given) != 1:
+            raise TypeError('expected one of fraction, stride or size')
+        if fraction is not None and not 0 < fraction <= 1:
+            raise ValueError('fraction must be more than 0 and up to 1, got: %r' % fraction)
+        for count in (stride, size):
+            if count is not None and count < 1:
+                raise ValueError('stride and size must be at least 1, got: %r' % count)
+        self.fraction = fraction
+        self.stride = stride
+        self.size = size
+        self.seed = seed
+        self.random = random.Random(seed)
+
+    def __getstate__(self):
+        # the state of the generator would change the fingerprint of the
+        # schemas using it (see notario.snapshot), it is seeded again instead
+        state = self.__dict__.copy()
+        del state['random']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.random = random.Random(self.seed)
+
+    def __repr__(self):
+        for name in ('fraction', 'stride', 'size'):
+            if getattr(self, name) is not None:
+                return 'Sample(%s=%r)' % (name, getattr(self, name))
+
+    def indexes(self, count):
+        """
+        The indexes of the items to validate out of ``count``, in order.
+        """
+        if self.stride is not None:
+            picked = list(range(0, count, self.stride))
+        else:
+            size = self.size
+            if size is None:
+                size = int(math.ceil(self.fraction * count))
+            if size >= count:
+                return range(count)
+            generator = self.random
+            if self.seed is not None:
+                # seeded for every array, so the same arrays get the same items
+                generator = random.Random('%r:%d' % (self.seed, count))
+            picked = generator.sample(range(count), size)
+            picked.append(0)
+        if count:
+            picked.append(count - 1)
+        return sorted(set(picked))
+
+
+class Report(object):
+    """
+    What was validated out of the sampled arrays (and dictionaries): how
+    many of them were sampled, and the number of items ``checked`` out of
+    their ``total``.
+    """
+
+    def __init__(self):
+        self.arrays = 0
+        self.checked = 0
+        self.total = 0
+
+    @property
+    def sampled(self):
+        """
+        ``True`` if some items were not validated.
+        """
+        return self.checked < self.total
+
+    def __repr__(self):
+        return '<Report checked %d of %d items in %d arrays>' % (
+            self.checked, self.total, self.arrays
+        )
+
+
+_local = threading.local()
+
+
+def policy(sample):
+    """
+    The :class:`Sample` a validator created with ``sample`` uses: its own,
+    none when it is ``False``, or the policy of the schema being validated.
+    """
+    if sample is None:
+        return getattr(_local, 'policy', None)
+    return sample or None
+
+
+def indexes(sample, count):
+    """
+    The indexes ``sample`` picks out of ``count`` items, recorded in the
+    :class:`Report` of the validation running in this thread.
+    """
+    picked = sample.indexes(count)
+    report = getattr(_local, 'report', None)
+    if report is None:
+        report = _local.report = Report()
+    report.arrays += 1
+    report.checked += len(picked)
+    report.total += count
+    return picked
+
+
+def start(sample):
+    """
+    Set the policy (``sample``) of the validation starting in this thread,
+    returning what to pass to :func:`finish` when it is over.
+    """
+    previous = getattr(_local, 'policy', None), getattr(_local, 'report', None)
+    _local.policy = sample
+    _local.report = None
+    return previous
+
+
+def finish(previous):
+    """
+    Restore what was there before :func:`start` and return the
+    :class:`Report` of the validation, if anything was sampled.
+    """
+    report = _local.report
+    _local.policy, _local.report = previous
+    return report
@@ -0,0 +1,400 @@
+"""
+Compiled schemas saved to (and loaded from) a cache directory, so that
+processes that start often do not normalize and prepare every schema again::
+
+    compiled = compile(schema, cache_dir='/var/cache/myapp/schemas')
+
+Snapshots are keyed by a fingerprint of the schema definition, so a schema
+that changes gets a new snapshot. The modules that define the validators of
+a schema are checked too: when one of them changed since the snapshot was
+saved, the schema is compiled again and the snapshot replaced.
+
+Snapshots are pickles of the prepared schema only: the objects of the schema
+definition (its validators, and the schemas they hold) are saved as
+references to the ones of the schema being compiled, see :func:`live_objects`.
+A loaded schema runs on the same validators a compiled one would, so a
+validator closing over a set that changes later, or an adaptive validator
+gathering stats, works the same. Loading a pickle can run arbitrary code, so
+the cache directory must not be writable by anyone that is not trusted.
+"""
+import hashlib
+import marshal
+import os
+import pickle
+import sys
+import tempfile
+import types
+
+import notario
+from notario import engine
+from notario._compat import basestring
+from notario.utils import expand_schema, is_callable
+
+
+protocol = 2
+
+#: Values saved in snapshots as they are, not as references
+plain_values = (basestring, bytes, int, float, bool, type(None))
+try:
+    plain_values += (long,)  # noqa
+except NameError:
+    pass
+
+
+def importable(func):
+    """
+    Tell if ``func`` can be pickled as a reference, which is the case when
+    importing it by name gives back the same function.
+    """
+    module = sys.modules.get(getattr(func, '__module__', None))
+    obj = module
+    name = getattr(func, '__qualname__', func.__name__)
+    for part in name.split('.'):
+        obj = getattr(obj, part, None)
+    return obj is func
+
+
+def load_code(dumped):
+    return marshal.loads(dumped)
+
+
+def builtin_type(name):
+    return getattr(types, name)
+
+
+def module_globals(name):
+    if name not in sys.modules:
+        __import__(name)
+    return sys.modules[name].__dict__
+
+
+class Globals(object):
+    """
+    Stands for the globals of the module ``name`` in a pickle.
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __reduce__(self):
+        return module_globals, (self.name,)
+
+
+class Pickler(pickle.Pickler):
+    """
+    Pickles functions that can't be imported by name (closures like the ones
+    returned by :func:`notario.decorators.optional`) with their code and the
+    values they close over, on Python 3.8 and newer. Elsewhere those can't be
+    pickled and the schema is not saved.
+    """
+
+    #: Types that can't be pickled by name
+    builtin_types = dict(
+        (getattr(types, name), name)
+        for name in ('FunctionType', 'CellType') if hasattr(types, name)
+    )
+
+    def __init__(self, *args, **kwargs):
+        pickle.Pickler.__init__(self, *args, **kwargs)
+        self.globals = {}
+
+    def reducer_override(self, obj):
+        cls = obj.__class__
+        if cls is types.CodeType:
+            # pickled once for all the closures that share it
+            return load_code, (marshal.dumps(obj),)
+        if cls is types.FunctionType:
+            if importable(obj):
+                return NotImplemented
+            return self.reduce_function(obj)
+        if cls is getattr(types, 'CellType', None):
+            return cls, (obj.cell_contents,)
+        if cls is type and obj in self.builtin_types:
+            return builtin_type, (self.builtin_types[obj],)
+        return NotImplemented
+
+    def reduce_function(self, func):
+        module = func.__globals__['__name__']
+        if module not in self.globals:
+            self.globals[module] = Globals(module)
+        attributes = dict(
+            (key, value) for key, value in func.__dict__.items()
+            if key != '__expanded__'
+        )
+        names = {'__qualname__': func.__qualname__, '__module__': func.__module__}
+        return types.FunctionType, (
+            func.__code__,
+            self.globals[module],
+            func.__name__,
+            func.__defaults__,
+            func.__closure__,
+        ), (attributes, names)
+
+
+class Fingerprint(Pickler):
+    """
+    Hashes a schema definition by pickling it, remembering the modules that
+    define the functions and classes used in it. Functions are pickled by
+    reference, so the schemas of ``delay``-ed functions and of references
+    to named schemas are pickled (and hashed) after the schema.
+    """
+
+    def __init__(self):
+        Pickler.__init__(self, self, protocol)
+        self.hash = hashlib.sha1()
+        self.modules = set()
+        self.delayed = []
+
+    def write(self, data):
+        self.hash.update(data)
+
+    def reducer_override(self, obj):
+        if isinstance(obj, type) or obj.__class__ is types.FunctionType:
+            self.modules.add(obj.__module__)
+        if getattr(obj, '__delayed__', False) and not isinstance(obj, type):
+            self.delayed.append(obj)
+        return Pickler.reducer_override(self, obj)
+
+
+def fingerprint(schema, defined_keys=False):
+    """
+    Return the fingerprint of ``schema`` (used as the name of its snapshot)
+    and the names of the modules it depends on.
+    """
+    walk = Fingerprint()
+    walk.dump((notario.__version__, sys.version_info[:3], defined_keys, schema))
+    expanded = set()
+    while walk.delayed:
+        try:
+            schema = expand_schema(walk.delayed.pop())
+        except LookupError:  # a reference to a schema not registered yet
+            schema = None
+        if id(schema) not in expanded:
+            expanded.add(id(schema))
+            walk.dump(schema)
+    return walk.hash.hexdigest(), walk.modules
+
+
+def children(obj):
+    """
+    The objects held by ``obj`` that :func:`live_objects` goes through.
+    """
+    if isinstance(obj, (tuple, list)):
+        return list(obj)
+    if isinstance(obj, dict):
+        return [item for pair in obj.items() for item in pair]
+    if isinstance(obj, (set, frozenset)):
+        return []  # not in a stable order
+    found = []
+    if obj.__class__ is types.FunctionType:
+        # the attributes of decorated validators, and what they decorate
+        attributes = getattr(obj, '__dict__', {})
+        found.extend(value for key, value in attributes.items() if key != '__expanded__')
+    else:
+        try:
+            state = obj.__getstate__() if hasattr(obj, '__getstate__') else obj.__dict__
+        except Exception:
+            state = None
+        if state is not None:
+            found.append(state)
+    if getattr(obj, '__delayed__', False):
+        try:
+            found.append(expand_schema(obj))
+        except LookupError:  # a reference to a schema not registered yet
+            pass
+    return found
+
+
+def live_objects(schema):
+    """
+    The objects of ``schema`` (its tuples, validators and the state of the
+    validators) in the order they are found, which is the same for schemas
+    with the same fingerprint. Snapshots refer to them by their index.
+    """
+    found, seen = [], set()
+    stack = [schema]
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, plain_values) or isinstance(obj, type) or id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        found.append(obj)
+        stack.extend(reversed(children(obj)))
+    return found
+
+
+class SnapshotPickler(Pickler):
+    """
+    Pickles the ``objects`` of the schema definition (see
+    :func:`live_objects`) as their index.
+    """
+
+    def __init__(self, file, protocol, objects):
+        Pickler.__init__(self, file, protocol)
+        self.live = dict((id(obj), index) for index, obj in enumerate(objects))
+
+    def persistent_id(self, obj):
+        return self.live.get(id(obj))
+
+
+class SnapshotUnpickler(pickle.Unpickler):
+    """
+    Loads the objects saved by :class:`SnapshotPickler` as their index from
+    the ``objects`` of the schema being compiled.
+    """
+
+    def __init__(self, file, objects):
+        pickle.Unpickler.__init__(self, file)
+        self.objects = objects
+
+    def persistent_load(self, index):
+        return self.objects[index]
+
+
+def object_classes(objects):
+    return [obj.__class__.__name__ for obj in objects]
+
+
+def nested_schemas(node, found=None, seen=None):
+    """
+    Prepare the schemas of the validators in the prepared schema ``node``
+    (like the one of an ``AllItems``) that are otherwise prepared the first
+    time a document needs them, so that they are saved with the snapshot.
+    Return them as ``(schema, prepared)`` tuples.
+    """
+    if found is None:
+        found, seen = [], set()
+    if id(node) in seen:
+        return found
+    seen.add(id(node))
+    if isinstance(node, (list, tuple)):
+        for item in node:
+            nested_schemas(item, found, seen)
+        return found
+    if not is_callable(node):
+        return found
+    schemas = list(getattr(node, 'schemas', None) or ())
+    schemas.append(getattr(node, 'schema', None))
+    for schema in schemas:
+        # delay-ed and registered schemas are expanded when they are used,
+        # only the ones written in place can be saved
+        if not isinstance(schema, tuple) or id(schema) in seen:
+            continue
+        seen.add(id(schema))
+        try:
+            prepared = engine.prepared_schema(schema)
+        except Exception:
+            continue
+        found.append((schema, prepared))
+        nested_schemas(prepared, found, seen)
+    for arg in getattr(node, 'args', None) or ():
+        nested_schemas(arg, found, seen)
+    return found
+
+
+def sources(modules):
+    """
+    Map every module to the path, modification time and size of its source
+    file, for the modules that have one.
+    """
+    found = {}
+    for name in modules:
+        module = sys.modules.get(name)
+        path = getattr(module, '__file__', None)
+        if not path:
+            continue
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        found[name] = (path, stat.st_mtime, stat.st_size)
+    return found
+
+
+def is_fresh(saved):
+    for name, source in saved.items():
+        if sources([name]).get(name) != source:
+            return False
+    return True
+
+
+def load(path, schema):
+    """
+    Return the compiled ``schema`` saved in ``path``, or ``None`` if there is
+    none or it is no longer fresh.
+    """
+    try:
+        with open(path, 'rb') as snapshot:
+            saved = pickle.load(snapshot)
+            for name in saved:
+                if name not in sys.modules:
+                    __import__(name)
+            if not is_fresh(saved):
+                return None
+            objects = live_objects(schema)
+            if pickle.load(snapshot) != object_classes(objects):
+                # not the schema it was saved for
+                return None
+            compiled, nested = SnapshotUnpickler(snapshot, objects).load()
+    except Exception:
+        # missing, unreadable or unpickling failed: compile it again
+        return None
+    with engine.prepared_schemas_lock:
+        for schema, prepared in nested:
+            engine.prepared_schemas[id(schema)] = (schema, prepared)
+        while len(engine.prepared_schemas) > engine.prepared_schemas_size:
+            engine.prepared_schemas.popitem(last=False)
+    return compiled
+
+
+def save(compiled, path, modules, schema):
+    """
+    Save ``compiled`` (compiled from ``schema``) to ``path``, replacing it
+    atomically so that other processes never load a partial snapshot.
+    Nothing is saved if the schema can't be pickled.
+    """
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory)
+    except OSError:
+        if not os.path.isdir(directory):
+            raise
+    fd, temporary = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as snapshot:
+            objects = live_objects(schema)
+            pickle.dump(sources(modules), snapshot, protocol)
+            pickle.dump(object_classes(objects), snapshot, protocol)
+            SnapshotPickler(snapshot, protocol, objects).dump(
+                (compiled, nested_schemas(compiled.schema))
+            )
+        os.rename(temporary, path)
+    except Exception:
+        os.remove(temporary)
+        return False
+    return True
+
+
+def load_or_compile(schema, cache_dir, defined_keys=False, hooks=None, sample=None,
+                    result_cache=None):
+    """
+    Return the compiled ``schema`` from its snapshot in ``cache_dir``,
+    compiling (and saving) it when there is no fresh snapshot for it.
+    Schemas that can't be pickled are compiled every time.
+    """
+    try:
+        key, modules = fingerprint(schema, defined_keys)
+    except Exception:
+        return engine.CompiledSchema(
+            schema, defined_keys=defined_keys, hooks=hooks, sample=sample,
+            result_cache=result_cache
+        )
+    path = os.path.join(cache_dir, key + '.pickle')
+    compiled = load(path, schema)
+    if compiled is None:
+        compiled = engine.CompiledSchema(schema, defined_keys=defined_keys)
+        save(compiled, path, modules, schema)
+    compiled.hooks = hooks
+    compiled.sample = sample
+    compiled.result_cache = result_cache
+    return compiled
@@ -113,3 +113,15 @@ class TestNotEmpty(object):
         exc_msg = str(exc.value)
 
         assert 'not two' in exc_msg
+
+
+class TestCost(object):
+
+    def test_sets_the_hint(self):
+        @decorators.cost(10)
+        def validator(value): pass
+        assert validator.__cost__ == 10
+
+    def test_returns_the_same_validator(self):
+        def validator(value): pass
+        assert decorators.cost(10)(validator) is validator
@@ -1,9 +1,13 @@
+import time
+
 from pytest import raises
-from notario import engine
-from notario.exceptions import Invalid, SchemaError
+from notario import engine, ensure
+from notario.exceptions import Invalid, SchemaError, ValidationBudgetExceeded
 from notario.validators import recursive, iterables, types
-from notario.decorators import optional
+from notario.decorators import optional, delay
 from notario.tests import util
+from notario.utils import expand_schema
+from notario.validators import cherry_pick
 
 
 class TestEnforce(object):
@@ -270,8 +274,559 @@ class TestOptionalKeys(object):
         assert 'b -> 3' in exc_msg
 
 
+class TestTypeCheck(object):
+
+    def test_builtin_type_validators_are_prepared(self):
+        validator = engine.Validator({'a': 1}, (types.string, types.integer))
+        key, value = validator.schema[0]
+        assert isinstance(key, engine.TypeCheck)
+        assert key.validator is types.string
+        assert value.valid_types == (int,)
+
+    def test_decorated_type_validators_are_prepared(self):
+        @types.string
+        def starts_with_a(value):
+            ensure(value.startswith('a'))
+        check = engine.prepare_type_check(starts_with_a)
+        assert check.validator is starts_with_a
+        assert check.wrapped.__name__ == 'starts_with_a'
+
+    def test_other_decorators_are_not_prepared(self):
+        validator = optional(types.string)
+        assert engine.prepare_type_check(validator) is validator
+
+    def test_literals_are_not_prepared(self):
+        assert engine.prepare_type_check(['a']) == ['a']
+
+    def test_failure_message_is_kept(self):
+        data = {'a': 1}
+        schema = ('a', types.string)
+        with raises(Invalid) as exc:
+            engine.Validator(data, schema).validate()
+        assert exc.value.schema_item is types.string
+        assert exc.value.reason == 'not of type string'
+        assert '-> a -> 1 did not pass validation against callable: string' in exc.value.args[0]
+
+    def test_nested_schema_message_has_the_validator(self):
+        with raises(Invalid) as exc:
+            engine.validate({'a': 1}, ('a', ('b', types.dictionary)))
+        message = str(exc.value)
+        assert 'TypeCheck' not in message
+        assert repr(types.dictionary) in message
+
+    def test_decorated_validator_runs_after_type_check(self):
+        @types.string
+        def starts_with_a(value):
+            ensure(value.startswith('a'), 'does not start with a')
+        data = {'a': 'bar'}
+        schema = ('a', starts_with_a)
+        with raises(Invalid) as exc:
+            engine.Validator(data, schema).validate()
+        assert exc.value.reason == 'does not start with a'
+
+    def test_decorated_validator_fails_type_check(self):
+        @types.string
+        def starts_with_a(value):
+            ensure(value.startswith('a'), 'does not start with a')
+        data = {'a': 1}
+        schema = ('a', starts_with_a)
+        with raises(Invalid) as exc:
+            engine.Validator(data, schema).validate()
+        assert exc.value.reason == 'not of type string'
+
+    def test_dictionary_leaf_passes(self):
+        data = {'a': {'b': 1}}
+        schema = ('a', types.dictionary)
+        assert engine.Validator(data, schema).validate() is None
+
+    def test_dictionary_leaf_fails(self):
+        data = {'a': 1}
+        schema = ('a', types.dictionary)
+        with raises(Invalid) as exc:
+            engine.Validator(data, schema).validate()
+        assert exc.value.reason == 'not of type dictionary'
+
+
+class TestClassify(object):
+
+    def test_literal(self):
+        assert engine.classify('a') == engine.LITERAL
+
+    def test_callable(self):
+        assert engine.classify(lambda value: True) == engine.CALLABLE
+
+    def test_type_check(self):
+        check = engine.prepare_type_check(types.string)
+        assert engine.classify(check) == engine.TYPE_CHECK
+
+    def test_leaf(self):
+        assert engine.classify(iterables.AllItems(1)) == engine.LEAF
+
+    def test_optional_value(self):
+        assert engine.classify(optional(1)) == engine.OPTIONAL
+
+    def test_optional_key(self):
+        assert engine.classify_key(optional('a')) == engine.OPTIONAL
+
+    def test_leaf_keys_are_callables(self):
+        assert engine.classify_key(iterables.AllItems(1)) == engine.CALLABLE
+
+    def test_nested(self):
+        validator = engine.Validator({'a': {'b': 1}}, ('a', ('b', 1)))
+        assert engine.classify(validator.schema[0][1]) == engine.NESTED
+
+    def test_cherry_pick(self):
+        validator = engine.Validator({'a': 1}, ('a', 1), defined_keys=True)
+        assert engine.classify(validator.schema) == engine.CHERRY_PICK
+
+
+class TestPrepare(object):
+
+    def test_kinds(self):
+        schema = ((optional('a'), types.string), ('b', ('c', 1)))
+        prepared = engine.Validator({'b': {'c': 1}}, schema).schema
+        assert prepared.kinds == (
+            (engine.OPTIONAL, engine.TYPE_CHECK),
+            (engine.LITERAL, engine.NESTED),
+        )
+        assert prepared[1][1].kinds == ((engine.LITERAL, engine.LITERAL),)
+
+    def test_optionals(self):
+        schema = ((optional('a'), 1), ('b', 1))
+        prepared = engine.Validator({'b': 1}, schema).schema
+        assert prepared.optionals == ((0, 'a'),)
+
+    def test_ordered(self):
+        prepared = engine.Validator({'a': 1}, (('a', 1), ('b', 1))).schema
+        assert prepared.ordered is True
+
+    def test_not_ordered_fails_validation(self):
+        validator = engine.Validator({'a': 1, 'b': 1}, (('b', 1), ('a', 1)))
+        assert validator.schema.ordered is False
+        with raises(SchemaError) as exc:
+            validator.validate()
+        assert 'schema item is not alphabetically ordered' in exc.value.args[0]
+
+    def test_not_ordered_without_missing_optional_key_passes(self):
+        schema = ((optional('b'), 1), ('a', 1))
+        assert engine.Validator({'a': 1}, schema).validate() is None
+
+    def test_cherry_picked_keys(self):
+        schema = engine.compile((('a', 1), (optional('b'), 2)), defined_keys=True).schema
+        assert set(['a', 'b']) <= schema.picked
+        data = {'a': 1, 'b': 2, 'c': 3}
+        assert engine.validate(data, (('a', 1), (optional('b'), 2)), defined_keys=True) is None
+
+
+
+class TestProject(object):
+
+    def test_keys_not_picked_are_not_sorted(self):
+        # keys that can't be sorted together would fail if they were
+        data = {'a': 1, 3: 'three', 'b': 2}
+        assert engine.validate(data, ('a', 1), defined_keys=True) is None
+
+    def test_picks_from_the_original_dictionary(self):
+        schema = engine.compile((('a', 1), ('c', 3)), defined_keys=True).schema
+        data = engine.project(engine.DataView({'a': 1, 'b': 2, 'c': 3}), schema)
+        assert data == {0: ('a', 1), 1: ('c', 3)}
+
+    def test_missing_picked_key_fails(self):
+        with raises(Invalid):
+            engine.validate({'b': 2, 'c': 3}, (('a', 1), ('c', 3)), defined_keys=True)
+
+    def test_optional_picked_key(self):
+        schema = (('a', 1), (optional('b'), 2))
+        assert engine.validate({'a': 1, 'c': 3}, schema, defined_keys=True) is None
+        with raises(Invalid):
+            engine.validate({'a': 1, 'b': 3, 'c': 3}, schema, defined_keys=True)
+
+    def test_more_picked_keys_than_data(self):
+        schema = tuple(('k%02d' % i, i) for i in range(20))
+        data = {'k01': 1, 'x': 0}
+        assert engine.is_valid(data, schema, defined_keys=True) is False
+
+    def test_nested_cherry_pick(self):
+        schema = ('a', cherry_pick(('b', 1)))
+        assert engine.validate({'a': {'b': 1, 'c': 2}}, schema) is None
+
+
+class TestLiteralSubtree(object):
+
+    def test_literal_schema(self):
+        prepared = engine.Validator({}, (('a', 1), ('b', 'x'))).schema
+        assert prepared.literal == {'a': 1, 'b': 'x'}
+
+    def test_nested_literal_schema(self):
+        prepared = engine.Validator({}, (('a', ('c', 1)), ('b', 'x'))).schema
+        assert prepared.literal == {'a': {'c': 1}, 'b': 'x'}
+
+    def test_only_literal_levels(self):
+        prepared = engine.Validator({}, (('a', ('c', 1)), ('b', types.string))).schema
+        assert prepared.literal is None
+        assert prepared[0][1].literal == {'c': 1}
+
+    def test_not_for_optional_keys(self):
+        prepared = engine.Validator({}, ((optional('a'), 1), ('b', 'x'))).schema
+        assert prepared.literal is None
+
+    def test_not_for_unordered_keys(self):
+        prepared = engine.Validator({}, (('b', 1), ('a', 1))).schema
+        assert prepared.literal is None
+
+    def test_not_for_container_values(self):
+        prepared = engine.Validator({}, ('a', [1])).schema
+        assert prepared.literal is None
+
+    def test_not_for_cherry_picked_schemas(self):
+        prepared = engine.Validator({}, ('a', 1), defined_keys=True).schema
+        assert prepared.literal is None
+
+    def test_equal_data_passes(self):
+        data = {'a': {'c': 1, 'd': True}, 'b': 'x'}
+        schema = (('a', (('c', 1), ('d', True))), ('b', 'x'))
+        assert engine.Validator(data, schema).validate() is None
+
+    def test_mismatch_reports_the_same_error(self):
+        data = {'a': {'c': 1, 'd': False}, 'b': 'x'}
+        schema = (('a', (('c', 1), ('d', True))), ('b', 'x'))
+        with raises(Invalid) as exc:
+            engine.Validator(data, schema).validate()
+        assert exc.value.path == ['a', 'd', False]
+
+    def test_traced_validation_walks_the_schema(self):
+        hooks = RecordingHooks()
+        engine.validate({'a': 1, 'b': 'x'}, (('a', 1), ('b', 'x')), hooks=hooks)
+        assert ('enter', ('a',)) in hooks.events
+
+
+class TestPreparedSchema(object):
+
+    def test_is_shared(self):
+        schema = ('a', 1)
+        assert engine.prepared_schema(schema) is engine.prepared_schema(schema)
+
+    def test_equal_schemas_are_not_confused(self):
+        first, second = ('a', 1), ('a', 2)
+        assert engine.prepared_schema(first) == {0: ('a', 1)}
+        assert engine.prepared_schema(second) == {0: ('a', 2)}
+
+    def test_is_bounded(self, monkeypatch):
+        monkeypatch.setattr(engine, 'prepared_schemas_size', 2)
+        schemas = [('a', number) for number in range(5)]
+        for schema in schemas:
+            engine.prepared_schema(schema)
+        assert len(engine.prepared_schemas) == 2
+
+    def test_recursive_schemas_are_prepared_once(self):
+        calls = []
+
+        @delay
+        def node():
+            calls.append(1)
+            return (('children', iterables.AllItems(node)), ('name', types.string))
+
+        def tree(depth):
+            children = [tree(depth - 1), tree(depth - 1)] if depth else []
+            return {'children': children, 'name': 'node'}
+
+        engine.validate({'root': [tree(5)]}, ('root', iterables.AllItems(node)))
+        assert len(calls) == 1
+        expanded = expand_schema(node)
+        # the prepared schema refers back to the validator that uses it
+        prepared = engine.prepared_schema(expanded)
+        assert prepared[0][1] is expanded[0][1]
+
+    def test_recursive_schema_failure(self):
+        @delay
+        def node():
+            return (('children', iterables.AllItems(node)), ('name', types.string))
+
+        data = {'root': [{'children': [{'children': [], 'name': 1}], 'name': 'a'}]}
+        with raises(Invalid) as exc:
+            engine.validate(data, ('root', iterables.AllItems(node)))
+        assert exc.value.path == ['root', 'list[0]', 'children', 'list[0]', 'name', 1]
+
+
 class TestValidate(object):
 
     def test_refuses_non_dicts(self):
         with raises(TypeError):
             engine.validate(['a list'], ('a', 'b'))
+
+
+class RecordingHooks(engine.Hooks):
+
+    def __init__(self):
+        self.events = []
+
+    def on_node_enter(self, path, schema_node):
+        self.events.append(('enter', path))
+
+    def on_node_exit(self, path, ok, elapsed):
+        self.events.append(('exit', path, ok))
+
+    def on_invalid(self, exc):
+        self.events.append(('invalid', str(exc)))
+
+
+class TestHooks(object):
+
+    def test_nodes_are_reported_in_order(self):
+        hooks = RecordingHooks()
+        engine.validate({'a': {'b': 1}}, ('a', ('b', 1)), hooks=hooks)
+        assert hooks.events == [
+            ('enter', ()),
+            ('enter', ('a',)),
+            ('enter', ('a', 'b')),
+            ('exit', ('a', 'b'), True),
+            ('exit', ('a',), True),
+            ('exit', (), True),
+        ]
+
+    def test_array_items_are_nodes(self):
+        hooks = RecordingHooks()
+        data = {'a': [{'b': 1}]}
+        engine.validate(data, ('a', iterables.AllItems(('b', 1))), hooks=hooks)
+        assert ('enter', ('a', 'list[0]')) in hooks.events
+        assert ('enter', ('a', 'list[0]', 'b')) in hooks.events
+
+    def test_recursive_items_are_nodes(self):
+        hooks = RecordingHooks()
+        data = {'a': {'x': {'b': 1}}}
+        schema = ('a', recursive.AllObjects((types.string, ('b', 1))))
+        engine.validate(data, schema, hooks=hooks)
+        assert ('enter', ('a', 'x', 'b')) in hooks.events
+
+    def test_invalid_is_reported_once(self):
+        hooks = RecordingHooks()
+        with raises(Invalid):
+            engine.validate({'a': {'b': 1}}, ('a', ('b', 2)), hooks=hooks)
+        invalid = [e for e in hooks.events if e[0] == 'invalid']
+        assert invalid == [('invalid', '-> a -> b -> 1 did not match 2')]
+        assert ('exit', (), False) in hooks.events
+
+    def test_swallowed_invalid_is_reported(self):
+        hooks = RecordingHooks()
+        engine.validate({'a': [1, 2]}, ('a', iterables.AnyItem(2)), hooks=hooks)
+        assert ('exit', ('a', 'list[0]'), False) in hooks.events
+        assert len([e for e in hooks.events if e[0] == 'invalid']) == 1
+
+    def test_compiled_schema_hooks(self):
+        hooks = RecordingHooks()
+        compiled = engine.compile(('a', 1), hooks=hooks)
+        compiled.validate({'a': 1})
+        compiled.validate({'a': 1})
+        assert hooks.events.count(('enter', ('a',))) == 2
+
+    def test_tracing_installs_hooks_for_the_thread(self):
+        hooks = RecordingHooks()
+        with engine.tracing(hooks):
+            engine.validate({'a': 1}, ('a', 1))
+        engine.validate({'a': 1}, ('a', 1))
+        assert hooks.events.count(('enter', ('a',))) == 1
+
+    def test_chain_hooks(self):
+        first, second = RecordingHooks(), RecordingHooks()
+        engine.validate({'a': 1}, ('a', 1), hooks=engine.chain_hooks(first, None, second))
+        assert first.events == second.events != []
+
+    def test_chain_nothing(self):
+        assert engine.chain_hooks(None, None) is None
+
+
+class TestCompile(object):
+
+    def test_validates_many_times(self):
+        compiled = engine.compile((('a', 1), ('b', types.string)))
+        assert compiled.validate({'a': 1, 'b': 'b'}) is None
+        with raises(Invalid):
+            compiled.validate({'a': 1, 'b': 2})
+
+    def test_optional_keys_do_not_alter_the_compiled_schema(self):
+        compiled = engine.compile((('a', 1), (optional('b'), 2)))
+        compiled.validate({'a': 1})
+        with raises(Invalid) as exc:
+            compiled.validate({'a': 1, 'b': 3})
+        assert '-> b -> 3 did not match 2' in str(exc.value)
+
+    def test_defined_keys(self):
+        compiled = engine.compile(('a', 1), defined_keys=True)
+        assert compiled.validate({'a': 1, 'b': 2}) is None
+
+    def test_refuses_non_dicts(self):
+        with raises(TypeError):
+            engine.compile(('a', 'b')).validate(['a list'])
+
+
+@types.string
+def short(value):
+    assert len(value) < 4, 'too long'
+
+
+class TestIsValid(object):
+
+    schema = (
+        ('a', 1),
+        (optional('b'), (('c', types.string), ('d', optional(short)))),
+        ('e', iterables.AllItems(types.integer)),
+        ('f', (('g', 'h'), ('i', ('j', True)))),
+    )
+
+    documents = [
+        {'a': 1, 'e': [1], 'f': {'g': 'h', 'i': {'j': True}}},
+        {'a': 1, 'b': {'c': 'x', 'd': 'abc'}, 'e': [], 'f': {'g': 'h', 'i': {'j': True}}},
+        {'a': 1, 'b': {'c': 'x', 'd': 'abcd'}, 'e': [], 'f': {'g': 'h', 'i': {'j': True}}},
+        {'a': 1, 'b': {'c': 1}, 'e': [], 'f': {'g': 'h', 'i': {'j': True}}},
+        {'a': 1, 'b': {}, 'e': [], 'f': {'g': 'h', 'i': {'j': True}}},
+        {'a': 2, 'e': [1], 'f': {'g': 'h', 'i': {'j': True}}},
+        {'a': 1, 'e': ['1'], 'f': {'g': 'h', 'i': {'j': True}}},
+        {'a': 1, 'e': 1, 'f': {'g': 'h', 'i': {'j': True}}},
+        {'a': 1, 'e': [1], 'f': {'g': 'h', 'i': {'j': False}}},
+        {'a': 1, 'e': [1], 'f': {'g': 'h', 'i': {}}},
+        {'a': 1, 'e': [1], 'f': 'h'},
+        {'a': 1, 'e': [1]},
+        {'a': 1, 'e': [1], 'f': {'g': 'h', 'i': {'j': True}}, 'z': 1},
+        {'a': 1, 'aa': 1, 'f': {'g': 'h', 'i': {'j': True}}},
+        {},
+    ]
+
+    def test_agrees_with_validate(self):
+        compiled = engine.compile(self.schema)
+        for document in self.documents:
+            assert compiled.is_valid(document) is (compiled.explain(document) is None)
+
+    def test_valid(self):
+        assert engine.is_valid(self.documents[0], self.schema) is True
+
+    def test_invalid(self):
+        assert engine.is_valid(self.documents[2], self.schema) is False
+
+    def test_callable_keys(self):
+        schema = ((types.string, types.integer), ('b', 2))
+        assert engine.is_valid({'a': 1, 'b': 2}, schema) is True
+        assert engine.is_valid({'a': 'a', 'b': 2}, schema) is False
+
+    def test_defined_keys(self):
+        assert engine.is_valid({'a': 1, 'b': 2}, ('a', 1), defined_keys=True) is True
+        assert engine.is_valid({'a': 2, 'b': 2}, ('a', 1), defined_keys=True) is False
+
+    def test_unordered_schema_is_not_valid(self):
+        schema = (('b', 1), ('a', 1))
+        assert engine.is_valid({'a': 1, 'b': 1}, schema) is False
+        assert isinstance(engine.explain({'a': 1, 'b': 1}, schema), SchemaError)
+
+    def test_does_not_build_exceptions(self, monkeypatch):
+        def refuse(*args, **kwargs):
+            raise AssertionError('an exception was created')
+        monkeypatch.setattr(Invalid, '__init__', refuse)
+        assert engine.is_valid({'a': 2, 'e': [1]}, self.schema) is False
+
+    def test_refuses_non_dicts(self):
+        with raises(TypeError):
+            engine.is_valid(['a list'], ('a', 'b'))
+
+
+class TestExplain(object):
+
+    def test_valid(self):
+        assert engine.explain({'a': 1}, ('a', 1)) is None
+
+    def test_returns_the_exception(self):
+        exc = engine.explain({'a': {'b': 2}}, ('a', ('b', 1)))
+        assert isinstance(exc, Invalid)
+        assert exc.path == ['a', 'b', 2]
+
+
+@delay
+def node():
+    return (('children', iterables.AllItems(node)), ('name', types.string))
+
+
+def tree(depth):
+    children = [tree(depth - 1)] if depth else []
+    return {'children': children, 'name': 'node'}
+
+
+class TestBudget(object):
+
+    def test_within_budget(self):
+        data = {'root': [tree(5)]}
+        schema = ('root', iterables.AllItems(node))
+        assert engine.validate(data, schema, deadline=10, max_nodes=100, max_depth=10, max_items=5) is None
+
+    def test_max_depth(self):
+        with raises(ValidationBudgetExceeded) as exc:
+            engine.validate({'root': [tree(5)]}, ('root', iterables.AllItems(node)), max_depth=3)
+        assert exc.value.limit == 'max_depth'
+        assert exc.value.path == ['root', 'list[0]', 'children', 'list[0]', 'children', 'list[0]']
+
+    def test_max_nodes(self):
+        with raises(ValidationBudgetExceeded) as exc:
+            engine.validate({'a': 1, 'b': 2, 'c': 3}, (('a', 1), ('b', 2), ('c', types.integer)), max_nodes=2)
+        assert exc.value.limit == 'max_nodes'
+        assert exc.value.path == ['c']
+
+    def test_array_items_are_nodes(self):
+        with raises(ValidationBudgetExceeded):
+            engine.validate({'a': list(range(10))}, ('a', iterables.AllItems(types.integer)), max_nodes=5)
+
+    def test_max_items(self):
+        with raises(ValidationBudgetExceeded) as exc:
+            engine.validate({'a': list(range(10))}, ('a', iterables.AllItems(types.integer)), max_items=5)
+        assert exc.value.limit == 'max_items'
+        assert exc.value.path == ['a']
+
+    def test_max_items_of_any_item(self):
+        with raises(ValidationBudgetExceeded) as exc:
+            engine.validate({'a': [5] * 1000}, ('a', iterables.AnyItem(5)), max_items=10)
+        assert exc.value.limit == 'max_items'
+
+    def test_any_item_within_budget(self):
+        assert engine.validate({'a': [1, 5]}, ('a', iterables.AnyItem(5)), max_items=10) is None
+
+    def test_max_items_of_objects(self):
+        data = {'a': {'b': 1, 'c': 2}}
+        with raises(ValidationBudgetExceeded):
+            engine.validate(data, ('a', recursive.AllObjects((types.string, 1))), max_items=1)
+
+    def test_deadline(self):
+        with raises(ValidationBudgetExceeded) as exc:
+            engine.validate({'a': 1}, ('a', types.integer), deadline=-1)
+        assert exc.value.limit == 'deadline'
+
+    def test_deadline_between_array_items(self):
+        calls = []
+
+        def slow(value):
+            calls.append(value)
+            time.sleep(0.002)
+
+        with raises(ValidationBudgetExceeded) as exc:
+            engine.validate({'a': list(range(500))}, ('a', iterables.AllItems(slow)), deadline=0.01)
+        assert exc.value.limit == 'deadline'
+        assert exc.value.path == ['a']
+        assert len(calls) < 50
+
+    def test_stops_backtracking(self):
+        schemas = [(('a', types.integer), ('b', i)) for i in range(50)]
+        data = {'a': [{'a': 1, 'b': 0}, {'a': 1, 'b': 49}] * 50}
+        schema = ('a', iterables.MultiIterable(*schemas, discriminator=False))
+        with raises(ValidationBudgetExceeded):
+            engine.validate(data, schema, max_nodes=500)
+
+    def test_invalid_data_within_budget(self):
+        with raises(Invalid):
+            engine.validate({'a': 2}, ('a', 1), max_nodes=10)
+
+    def test_with_hooks(self):
+        hooks = RecordingHooks()
+        with raises(ValidationBudgetExceeded):
+            engine.validate({'a': 1, 'b': 2}, (('a', 1), ('b', types.integer)), hooks=hooks, max_nodes=1)
+        assert hooks.events[-1] == ('exit', (), False)
+
+    def test_budget_does_not_leak(self):
+        with raises(ValidationBudgetExceeded):
+            engine.validate({'a': list(range(10))}, ('a', iterables.AllItems(types.integer)), max_items=5)
+        assert engine.validate({'a': list(range(10))}, ('a', iterables.AllItems(types.integer))) is None
+        assert getattr(engine._local, 'budget', None) is None
@@ -0,0 +1,133 @@
+import functools
+import json
+
+from notario.files import FileCache, loader_name, schema_fingerprint, validate_files
+from notario.validators import types
+
+
+schema = (('a', types.string), ('b', types.integer))
+
+
+def load_pairs(text, separator='='):
+    return dict(line.split(separator, 1) for line in text.splitlines())
+
+
+def write(tmpdir, name, data):
+    path = tmpdir.join(name)
+    path.write(json.dumps(data))
+    return str(path)
+
+
+class TestSchemaFingerprint(object):
+
+    def test_same_schema(self):
+        assert schema_fingerprint(schema) == schema_fingerprint((('a', types.string), ('b', types.integer)))
+
+    def test_changed_schema(self):
+        assert schema_fingerprint(schema) != schema_fingerprint((('a', types.string), ('b', types.string)))
+
+
+class TestValidateFiles(object):
+
+    def test_errors_by_path(self, tmpdir):
+        valid = write(tmpdir, 'valid.json', {'a': 'x', 'b': 1})
+        invalid = write(tmpdir, 'invalid.json', {'a': 'x', 'b': 'y'})
+        errors = validate_files([valid, invalid], schema)
+        assert list(errors) == [invalid]
+        assert 'b' in errors[invalid]
+
+    def test_files_that_can_not_be_loaded(self, tmpdir):
+        path = tmpdir.join('broken.json')
+        path.write('{')
+        array = write(tmpdir, 'array.json', [1])
+        errors = validate_files([str(path), array], schema)
+        assert 'could not load' in errors[str(path)]
+        assert 'dict' in errors[array]
+
+    def test_unchanged_files_are_not_validated_again(self, tmpdir):
+        cache = FileCache(str(tmpdir.join('cache.sqlite')))
+        valid = write(tmpdir, 'valid.json', {'a': 'x', 'b': 1})
+        invalid = write(tmpdir, 'invalid.json', {'a': 'x', 'b': 'y'})
+        first = validate_files([valid, invalid], schema, cache=cache)
+        second = validate_files([valid, invalid], schema, cache=cache)
+        assert first == second
+        assert (cache.hits, cache.misses) == (2, 2)
+
+    def test_saved_to_disk(self, tmpdir):
+        database = str(tmpdir.join('cache.sqlite'))
+        valid = write(tmpdir, 'valid.json', {'a': 'x', 'b': 1})
+        FileCache(database).close()
+        validate_files([valid], schema, cache=FileCache(database))
+        cache = FileCache(database)
+        validate_files([valid], schema, cache=cache)
+        assert cache.hits == 1
+
+    def test_changed_files_are_validated(self, tmpdir):
+        cache = FileCache(str(tmpdir.join('cache.sqlite')))
+        path = write(tmpdir, 'data.json', {'a': 'x', 'b': 1})
+        assert validate_files([path], schema, cache=cache) == {}
+        write(tmpdir, 'data.json', {'a': 'x', 'b': 'y'})
+        assert list(validate_files([path], schema, cache=cache)) == [path]
+
+    def test_changed_schemas_validate_again(self, tmpdir):
+        cache = FileCache(str(tmpdir.join('cache.sqlite')))
+        path = write(tmpdir, 'data.json', {'a': 'x', 'b': 1})
+        validate_files([path], schema, cache=cache)
+        errors = validate_files([path], (('a', types.string), ('b', types.string)), cache=cache)
+        assert list(errors) == [path]
+        assert cache.hits == 0
+
+    def test_loaders_do_not_share_outcomes(self, tmpdir):
+        cache = FileCache(str(tmpdir.join('cache.sqlite')))
+        path = tmpdir.join('data.txt')
+        path.write('a=x\nb=y')
+        pairs = (('a', types.string), ('b', types.string))
+        assert 'could not load' in validate_files([str(path)], pairs, cache=cache)[str(path)]
+        assert validate_files([str(path)], pairs, cache=cache, load=load_pairs) == {}
+        assert cache.hits == 0
+
+    def test_loaders_without_a_name_are_not_cached(self, tmpdir):
+        cache = FileCache(str(tmpdir.join('cache.sqlite')))
+        path = write(tmpdir, 'data.json', {'a': 'x', 'b': 1})
+        validate_files([path], schema, cache=cache, load=lambda text: json.loads(text))
+        assert len(cache) == 0
+
+
+class TestLoaderName(object):
+
+    def test_functions(self):
+        assert loader_name(json.loads) == 'json.loads'
+        assert loader_name(load_pairs) == 'notario.tests.test_files.load_pairs'
+
+    def test_partials(self):
+        name = loader_name(functools.partial(load_pairs, separator=':'))
+        assert name == loader_name(functools.partial(load_pairs, separator=':'))
+        assert name != loader_name(functools.partial(load_pairs, separator='='))
+        assert '0x' not in name
+
+    def test_no_stable_name(self):
+        assert loader_name(lambda text: text) is None
+        assert loader_name(functools.partial(load_pairs, separator=object())) is None
+
+
+class TestEviction(object):
+
+    def test_max_entries(self, tmpdir):
+        cache = FileCache(str(tmpdir.join('cache.sqlite')), max_entries=2)
+        paths = [write(tmpdir, '%d.json' % i, {'a': 'x', 'b': i}) for i in range(3)]
+        validate_files(paths, schema, cache=cache)
+        assert len(cache) == 2
+
+    def test_other_versions(self, tmpdir):
+        database = str(tmpdir.join('cache.sqlite'))
+        old = FileCache(database)
+        old.version = '0.0.1'
+        validate_files([write(tmpdir, 'data.json', {'a': 'x', 'b': 1})], schema, cache=old)
+        assert len(old) == 1
+        FileCache(database).flush()
+        assert len(old) == 0
+
+    def test_max_age(self, tmpdir):
+        cache = FileCache(str(tmpdir.join('cache.sqlite')), max_age=-1)
+        validate_files([write(tmpdir, 'data.json', {'a': 'x', 'b': 1})], schema, cache=cache)
+        assert len(cache) == 0
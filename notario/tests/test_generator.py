@@ -0,0 +1,106 @@
+from pytest import raises
+from notario import generate, validate
+from notario.decorators import delay, optional
+from notario.exceptions import NotarioException
+from notario.generator import Generator
+from notario.validators import types
+from notario.validators.chainable import AnyIn
+from notario.validators.iterables import AllItems, AnyItem, MultiIterable
+from notario.validators.recursive import AllObjects
+
+
+@delay
+def node():
+    return (('children', AllItems(node)), ('name', types.string))
+
+
+schema = (
+    ('a', 1),
+    ('b', types.boolean),
+    ('c', AllItems((('id', types.integer), ('tags', AnyItem(types.string))))),
+    (optional('d'), types.string),
+    ('e', AllObjects((types.string, types.integer))),
+    ('f', AllItems(node)),
+    ('g', AnyIn(types.string, types.integer)),
+    ('h', ('x', 'y')),
+    ('i', MultiIterable(('a', 1), ('b', types.string))),
+)
+
+
+def is_valid(document, schema):
+    try:
+        validate(document, schema)
+    except NotarioException:
+        return False
+    return True
+
+
+class TestGenerate(object):
+
+    def test_generates_n_documents(self):
+        assert len(list(generate(schema, 10, seed=1))) == 10
+
+    def test_documents_are_valid(self):
+        for document in generate(schema, 50, seed=1):
+            validate(document, schema)
+
+    def test_same_seed_same_documents(self):
+        assert list(generate(schema, 10, seed=1)) == list(generate(schema, 10, seed=1))
+
+    def test_different_seed_different_documents(self):
+        assert list(generate(schema, 10, seed=1)) != list(generate(schema, 10, seed=2))
+
+    def test_literals_are_used_as_is(self):
+        document = next(generate(schema, 1, seed=1))
+        assert document['a'] == 1
+        assert document['h'] == {'x': 'y'}
+
+    def test_optional_keys_are_sometimes_left_out(self):
+        documents = list(generate(schema, 50, seed=1))
+        assert any('d' in document for document in documents)
+        assert any('d' not in document for document in documents)
+
+    def test_callable_keys_keep_the_order_of_the_schema(self):
+        schema = (('a', 1), (types.string, types.integer), ('z', 2))
+        for document in generate(schema, 20, seed=1):
+            validate(document, schema)
+
+    def test_recursion_is_capped(self):
+        def depth(nodes):
+            return 1 + max([depth(n['children']) for n in nodes] or [0])
+        for document in generate(('f', AllItems(node)), 20, seed=1, max_depth=3):
+            assert depth(document['f']) <= 4
+
+    def test_labels_match_validation(self):
+        labelled = list(generate(schema, 100, seed=1, invalid_ratio=0.5, labels=True))
+        assert any(valid for _, valid in labelled)
+        assert any(not valid for _, valid in labelled)
+        for document, valid in labelled:
+            assert is_valid(document, schema) is valid
+
+    def test_all_invalid(self):
+        for document in generate(schema, 20, seed=1, invalid_ratio=1):
+            assert is_valid(document, schema) is False
+
+
+class TestGenerator(object):
+
+    def test_uses_the_generate_attribute(self):
+        def even(value):
+            assert value % 2 == 0
+        even.__generate__ = lambda random: random.randint(0, 10) * 2
+        document = Generator(('a', even), seed=1).document()
+        assert document['a'] % 2 == 0
+
+    def test_unknown_callables_are_not_supported(self):
+        def validator(value):
+            pass
+        with raises(TypeError):
+            Generator(('a', validator), seed=1).document()
+
+    def test_decorated_validators_are_checked(self):
+        @types.string
+        def short(value):
+            assert len(value) < 4
+        for document in generate(('a', short), 20, seed=1):
+            assert len(document['a']) < 4
@@ -1,6 +1,8 @@
 import re
+from pytest import raises
 
-from notario import normal
+from notario import normal, utils
+from notario.validators import cherry_pick
 
 
 class TestSchema(object):
@@ -28,3 +30,74 @@ class TestSchema(object):
         regex = re.compile(".*")
         result = normal.Schema({"foo": regex}, ['a']).normalized()
         assert result == {0: ['a']}
+
+
+class TestData(object):
+
+    def test_nested_dictionaries_are_not_altered(self):
+        data = {'a': {'b': {'c': {'d': 1}}}}
+        normal.Data(data, {}).normalized()
+        assert data == {'a': {'b': {'c': {'d': 1}}}}
+
+    def test_nested_dictionaries_are_normalized(self):
+        data = {'a': {'c': 1, 'b': 2}}
+        result = normal.Data(data, {}).normalized()
+        assert result == {0: ('a', {0: ('b', 2), 1: ('c', 1)})}
+
+
+class TestDataView(object):
+
+    def test_values_are_not_copied(self):
+        value = ['a', 'list']
+        view = normal.DataView({'a': value})
+        assert view[0][1] is value
+
+    def test_nested_dictionaries_are_views(self):
+        nested = {'b': 1}
+        view = normal.DataView({'a': nested})
+        assert isinstance(view[0][1], normal.DataView)
+        assert view[0][1]._raw is nested
+
+    def test_nested_views_are_sorted_lazily(self):
+        view = normal.DataView({'a': {'c': 1, 'b': 2}})
+        nested = view[0][1]
+        assert nested._loaded is False
+        assert nested[0] == ('b', 2)
+        assert nested._loaded is True
+
+    def test_length_does_not_sort(self):
+        view = normal.DataView({'b': 1, 'a': 2})
+        assert len(view) == 2
+        assert view._loaded is False
+
+    def test_missing_index(self):
+        view = normal.DataView({'a': 1})
+        with raises(KeyError):
+            view[1]
+
+    def test_read_only(self):
+        data = {'a': 1}
+        view = normal.DataView(data)
+        with raises(TypeError):
+            view[1] = ('b', 2)
+        with raises(TypeError):
+            view.update({1: ('b', 2)})
+        assert data == {'a': 1}
+
+    def test_compares_to_the_normalized_form(self):
+        view = normal.DataView({'b': {'d': 1}, 'a': 2})
+        assert view == {0: ('a', 2), 1: ('b', {0: ('d', 1)})}
+        assert view != {0: ('a', 2)}
+        assert normal.DataView({}) == {}
+
+
+class TestSchemaNodes(object):
+
+    def test_normalized_schemas_are_nlists(self):
+        result = normal.Schema({}, ('a', ('b', 1))).normalized()
+        assert isinstance(result, utils.nlist)
+        assert isinstance(result[0][1], utils.nlist)
+
+    def test_keeps_must_validate(self):
+        result = normal.Schema({}, cherry_pick((('a', 1), ('b', 2)))).normalized()
+        assert result.must_validate == ('a', 'b')
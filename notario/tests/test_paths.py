@@ -0,0 +1,121 @@
+from pytest import raises
+from notario import compile, engine, validate
+from notario.decorators import optional
+from notario.exceptions import Invalid
+from notario.paths import select, selection
+from notario.validators import types
+from notario.validators.iterables import AllItems
+from notario.validators.recursive import AllObjects
+
+
+schema = (
+    ('metadata', (
+        ('labels', AllObjects((types.string, types.string))),
+        ('name', types.string),
+        (optional('namespace'), types.string),
+    )),
+    ('spec', (
+        ('containers', AllItems((('image', types.string), ('name', types.string)))),
+        ('replicas', types.integer),
+    )),
+)
+
+
+def document():
+    return {
+        'metadata': {'labels': {'app': 'web'}, 'name': 1},
+        'spec': {'containers': [{'image': 'nginx', 'name': 2}], 'replicas': 'two'},
+    }
+
+
+class TestSelection(object):
+
+    def test_nested_keys(self):
+        assert selection(['a.b', 'a.c', 'd']) == {'a': {'b': None, 'c': None}, 'd': None}
+
+    def test_shorter_path_selects_everything(self):
+        assert selection(['a.b', 'a']) == {'a': None}
+        assert selection(['a', 'a.b']) == {'a': None}
+
+    def test_tuple_paths(self):
+        assert selection([('a.b', 1)]) == {'a.b': {1: None}}
+
+    def test_empty_path_is_the_whole_document(self):
+        assert selection(['a', ()]) is None
+
+
+class TestValidatePaths(object):
+
+    def test_skips_what_is_not_selected(self):
+        assert validate(document(), schema, paths=['metadata.labels', 'spec.containers.image']) is None
+
+    def test_error_has_the_full_path(self):
+        with raises(Invalid) as exc:
+            validate(document(), schema, paths=['spec.replicas'])
+        assert exc.value.path == ['spec', 'replicas', 'two']
+
+    def test_through_all_items(self):
+        with raises(Invalid) as exc:
+            validate(document(), schema, paths=['spec.containers.name'])
+        assert exc.value.path == ['spec', 'containers', 'list[0]', 'name', 2]
+
+    def test_through_all_objects(self):
+        nested = ('a', AllObjects((types.string, (('bar', types.boolean), ('baz', types.boolean)))))
+        data = {'a': {'x': {'bar': True, 'baz': 'no'}, 'y': {'bar': True, 'baz': 'no'}}}
+        assert validate(data, nested, paths=['a.bar']) is None
+        with raises(Invalid) as exc:
+            validate(data, nested, paths=['a.baz'])
+        assert exc.value.path == ['a', 'x', 'baz', 'no']
+
+    def test_missing_required_key(self):
+        data = {'metadata': {'labels': {}}}
+        with raises(Invalid):
+            validate(data, schema, paths=['metadata.name'])
+
+    def test_missing_optional_key(self):
+        data = {'metadata': {'name': 'web'}}
+        assert validate(data, schema, paths=['metadata.namespace']) is None
+
+    def test_key_not_in_schema(self):
+        with raises(LookupError) as exc:
+            validate(document(), schema, paths=['spec.volumes'])
+        assert 'spec.volumes' in str(exc.value)
+
+    def test_callable_keys(self):
+        objects = (types.string, (('a', 1), ('b', 2)))
+        assert validate({'x': {'a': 1, 'b': 3}}, objects, paths=['x.a']) is None
+
+    def test_only_the_selected_keys_are_prepared(self, monkeypatch):
+        sizes = []
+        prepare = engine.prepare
+
+        def recording(schema):
+            sizes.append(len(schema))
+            return prepare(schema)
+
+        monkeypatch.setattr(engine, 'prepare', recording)
+        wide = tuple(('k%03d' % i, (('x', types.integer), ('y', 1))) for i in range(100))
+        assert validate({'k001': {'x': 1}, 'k002': 'y'}, wide, paths=['k001.x']) is None
+        assert max(sizes) == 1
+
+    def test_defined_keys(self):
+        data = {'spec': {'replicas': 2}, 'other': 1}
+        assert validate(data, schema, paths=['spec.replicas'], defined_keys=True) is None
+
+    def test_select_does_not_alter_the_schema(self):
+        select(schema, ['spec.containers.image'])
+        with raises(Invalid):
+            validate({'spec': {'containers': [{'image': 'x', 'name': 1}], 'replicas': 1},
+                      'metadata': {'labels': {}, 'name': 'x'}}, schema)
+
+
+class TestCompiledSelect(object):
+
+    def test_selected_once(self):
+        compiled = compile(schema)
+        assert compiled.select(['spec.replicas']) is compiled.select(('spec.replicas',))
+
+    def test_validate_paths(self):
+        compiled = compile(schema)
+        assert compiled.validate(document(), paths=['metadata.labels']) is None
+        assert compiled.select(['metadata.labels']).is_valid(document()) is True
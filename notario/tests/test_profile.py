@@ -0,0 +1,136 @@
+from pytest import raises
+from notario import validate, engine
+from notario.exceptions import Invalid
+from notario.results import ResultCache
+from notario import compile
+from notario.profile import (Profile, profiling, format_path, memory_usage,
+                             module_name)
+from notario.validators import iterables, recursive, types
+
+
+def paths(profile):
+    return dict((stats.path, stats) for stats in profile.stats())
+
+
+class TestValidateWithProfile(object):
+
+    def test_returns_a_new_profile(self):
+        profile = validate({'a': 1}, ('a', 1), profile=True)
+        assert isinstance(profile, Profile)
+
+    def test_returns_the_profile_passed_in(self):
+        profile = Profile()
+        assert validate({'a': 1}, ('a', 1), profile=profile) is profile
+
+    def test_no_profile_returns_none(self):
+        assert validate({'a': 1}, ('a', 1)) is None
+
+    def test_records_nested_paths(self):
+        data = {'a': {'b': 1, 'c': 2}}
+        schema = ('a', (('b', 1), ('c', 2)))
+        profile = validate(data, schema, profile=True)
+        assert set(paths(profile)) == set([(), ('a',), ('a', 'b'), ('a', 'c')])
+
+    def test_array_items_are_grouped(self):
+        data = {'a': [{'b': 1}, {'b': 1}, {'b': 1}]}
+        schema = ('a', iterables.AllItems(('b', 1)))
+        recorded = paths(validate(data, schema, profile=True))
+        assert recorded[('a', 'list[]')].calls == 3
+        assert recorded[('a', 'list[]', 'b')].calls == 3
+
+    def test_callable_keys_are_grouped(self):
+        data = {'a': {'x': {'y': True}, 'z': {'y': False}}}
+        schema = ('a', recursive.AllObjects((types.string, ('y', types.boolean))))
+        recorded = paths(validate(data, schema, profile=True))
+        assert recorded[('a', '<string>')].calls == 2
+
+    def test_own_time_is_not_larger_than_total(self):
+        data = {'a': {'b': 1}}
+        profile = validate(data, ('a', ('b', 1)), profile=True)
+        for stats in profile.stats():
+            assert stats.own <= stats.total
+
+    def test_counts_swallowed_errors(self):
+        data = {'a': [1, 2, 3]}
+        schema = ('a', iterables.AnyItem(3))
+        recorded = paths(validate(data, schema, profile=True))
+        assert recorded[('a', 'list[]')].raised == 2
+        assert recorded[('a',)].swallowed == 2
+
+    def test_counts_raised_errors(self):
+        profile = Profile()
+        with raises(Invalid):
+            validate({'a': 1}, ('a', 2), profile=profile)
+        recorded = paths(profile)
+        assert recorded[('a',)].raised == 1
+        assert recorded[()].raised == 1
+        assert recorded[()].swallowed == 0
+
+
+class TestProfiling(object):
+
+    def test_collects_every_validation(self):
+        with profiling() as profile:
+            validate({'a': 1}, ('a', 1))
+            validate({'a': 1}, ('a', 1))
+        assert paths(profile)[('a',)].calls == 2
+
+    def test_stops_collecting_on_exit(self):
+        with profiling() as profile:
+            validate({'a': 1}, ('a', 1))
+        validate({'a': 1}, ('a', 1))
+        assert paths(profile)[('a',)].calls == 1
+
+
+class TestReport(object):
+
+    def test_hottest_paths_first(self):
+        profile = validate({'a': {'b': 1}}, ('a', ('b', 1)), profile=True)
+        lines = profile.report().split('\n')
+        assert lines[1].endswith('-> top level')
+        assert len(lines) == 4
+
+    def test_limit(self):
+        profile = validate({'a': {'b': 1}}, ('a', ('b', 1)), profile=True)
+        assert len(profile.report(limit=1).split('\n')) == 2
+
+    def test_format_path(self):
+        assert format_path(('a', 'list[]')) == '-> a -> list[]'
+
+
+class TestMemoryUsage(object):
+
+    def test_reports_peak(self):
+        data = {'a': dict(('key%s' % n, n) for n in range(100))}
+        schema = ('a', tuple(('key%s' % n, n) for n in sorted(range(100), key=str)))
+        usage = memory_usage(data, schema)
+        assert usage.peak > 0
+        assert usage.error is None
+
+    def test_modules_holding_memory(self):
+        compiled = compile(('a', 1), result_cache=ResultCache())
+        usage = memory_usage({'a': 1}, compiled)
+        assert usage.retained_blocks > 0
+        assert 'notario.results' in usage.retained
+
+    def test_measures_untraced_validation(self):
+        # the fast path of AnyItem does not copy nor trace the items
+        usage = memory_usage({'a': list(range(20000))}, ('a', iterables.AnyItem(19999)))
+        assert usage.peak < 20000
+
+    def test_keeps_the_error(self):
+        usage = memory_usage({'a': 1}, ('a', 2))
+        assert isinstance(usage.error, Invalid)
+
+    def test_compiled_schemas(self):
+        usage = memory_usage({'a': 1}, compile(('a', 1)))
+        assert usage.peak > 0
+
+    def test_as_dict(self):
+        usage = memory_usage({'a': 1}, ('a', 1))
+        assert set(usage.as_dict()) == set(['peak', 'retained_blocks', 'retained'])
+
+    def test_module_name(self):
+        assert module_name(engine.__file__) == 'notario.engine'
+        assert module_name(iterables.__file__) == 'notario.validators.iterables'
+        assert module_name('/usr/lib/python/json/__init__.py') == '<other>'
@@ -0,0 +1,93 @@
+from pytest import raises
+from notario import compile, engine, validate, registry
+from notario.decorators import optional
+from notario.exceptions import Invalid
+from notario.registry import register, ref, unregister
+from notario.utils import expand_schema
+from notario.validators import types
+from notario.validators.iterables import AllItems
+
+
+address = (('city', types.string), ('street', types.string))
+
+
+class TestRegistry(object):
+
+    def teardown_method(self, method):
+        for name in list(registry.schemas):
+            unregister(name)
+
+    def test_register_returns_the_schema(self):
+        assert register('address', address) is address
+
+    def test_register_twice(self):
+        register('address', address)
+        with raises(ValueError):
+            register('address', address)
+
+    def test_register_non_schema(self):
+        with raises(TypeError):
+            register('string', types.string)
+
+    def test_unregister(self):
+        register('address', address)
+        unregister('address')
+        assert 'address' not in registry.schemas
+        assert id(address) not in engine.shared_schemas
+
+    def test_unknown_reference(self):
+        with raises(LookupError):
+            validate({'a': {'city': 'x'}}, ('a', ref('address')))
+
+    def test_reference_as_value(self):
+        register('address', address)
+        data = {'a': {'city': 'x', 'street': 'y'}}
+        assert validate(data, ('a', ref('address'))) is None
+
+    def test_reference_as_value_fails(self):
+        register('address', address)
+        data = {'a': {'city': 'x', 'street': 1}, 'b': 1}
+        with raises(Invalid) as exc:
+            validate(data, (('a', ref('address')), ('b', 1)))
+        assert exc.value.path == ['a', 'street', 1]
+
+    def test_reference_as_whole_schema(self):
+        register('address', address)
+        assert validate({'city': 'x', 'street': 'y'}, ref('address')) is None
+
+    def test_reference_in_validator(self):
+        register('address', address)
+        data = {'a': [{'city': 'x', 'street': 'y'}, {'city': 'x', 'street': 1}]}
+        with raises(Invalid) as exc:
+            validate(data, ('a', AllItems(ref('address'))))
+        assert exc.value.path == ['a', 'list[1]', 'street', 1]
+
+    def test_references_share_the_prepared_schema(self):
+        register('address', address)
+        first = compile(('billing', ref('address')))
+        second = compile((('a', 1), ('shipping', ref('address'))))
+        assert first.schema[0][1] is second.schema[1][1]
+        assert engine.prepared_schema(expand_schema(ref('address'))) is first.schema[0][1]
+
+    def test_reference_before_registering(self):
+        compiled = compile(('a', AllItems(ref('address'))))
+        register('address', address)
+        assert compiled.validate({'a': [{'city': 'x', 'street': 'y'}]}) is None
+
+    def test_recursive_reference(self):
+        register('node', ((optional('next'), ref('node')), ('value', types.integer)))
+        data = {'value': 1, 'next': {'value': 2, 'next': {'value': 'three'}}}
+        with raises(Invalid) as exc:
+            validate(data, ref('node'))
+        assert exc.value.path == ['next', 'next', 'value', 'three']
+
+    def test_recursive_reference_is_a_back_edge(self):
+        register('node', ((optional('next'), ref('node')), ('value', types.integer)))
+        node = ref('node').prepared()
+        assert node[0][1] is node
+
+    def test_mutual_references(self):
+        register('a', (('b', AllItems(ref('b'))), ('name', 'a')))
+        register('b', (('a', AllItems(ref('a'))), ('name', 'b')))
+        data = {'b': [{'a': [{'b': [], 'name': 'a'}], 'name': 'b'}], 'name': 'a'}
+        assert validate(data, ref('a')) is None
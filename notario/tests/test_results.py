@@ -0,0 +1,138 @@
+from collections import OrderedDict
+
+from pytest import raises
+from notario import compile
+from notario.exceptions import Invalid
+from notario.results import ResultCache, canonical, digest
+from notario.sampling import Sample
+from notario.validators import types
+from notario.validators.iterables import AllItems
+
+
+class TestDigest(object):
+
+    def test_key_order_does_not_matter(self):
+        first = OrderedDict([('a', 1), ('b', {'c': [1, 2], 'd': None})])
+        second = OrderedDict([('b', {'d': None, 'c': [1, 2]}), ('a', 1)])
+        assert digest(first) == digest(second)
+
+    def test_types_matter(self):
+        values = [1, 1.0, True, '1', u'x', None, [1], (1,), {1: 1}, {'1': 1}]
+        assert len(set(canonical(value) for value in values)) == len(values)
+
+    def test_item_order_matters(self):
+        assert digest({'a': [1, 2]}) != digest({'a': [2, 1]})
+
+    def test_unknown_types(self):
+        with raises(TypeError):
+            digest({'a': object()})
+        with raises(TypeError):
+            digest({'a': set([1])})
+
+
+class TestResultCache(object):
+
+    schema = (('a', types.string), ('b', types.integer))
+
+    def test_valid_documents_are_cached(self):
+        cache = ResultCache()
+        compiled = compile(self.schema, result_cache=cache)
+        assert compiled.validate({'a': 'x', 'b': 1}) is None
+        assert compiled.validate({'b': 1, 'a': 'x'}) is None
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_the_same_error_is_raised_again(self):
+        cache = ResultCache()
+        compiled = compile(self.schema, result_cache=cache)
+        with raises(Invalid) as first:
+            compiled.validate({'a': 'x', 'b': 'y'})
+        first.value.path.append('changed')
+        with raises(Invalid) as second:
+            compiled.validate({'a': 'x', 'b': 'y'})
+        with raises(Invalid) as third:
+            compiled.validate({'a': 'x', 'b': 'y'})
+        assert second.value is not third.value
+        assert str(second.value) == str(third.value)
+        assert second.value.path == third.value.path == ['b', 'y']
+        assert cache.hits == 2
+
+    def test_paths_are_cached_apart(self):
+        cache = ResultCache()
+        compiled = compile(self.schema, result_cache=cache)
+        assert compiled.validate({'a': 'x', 'b': 'y'}, paths=['a']) is None
+        with raises(Invalid):
+            compiled.validate({'a': 'x', 'b': 'y'})
+        assert compiled.validate({'a': 'x', 'b': 'y'}, paths=['a']) is None
+        assert (cache.hits, len(cache)) == (1, 2)
+
+    def test_sampled_passes_are_not_cached(self):
+        cache = ResultCache()
+        compiled = compile(('a', AllItems(types.integer, sample=Sample(size=2))), result_cache=cache)
+        report = compiled.validate({'a': list(range(10))})
+        assert report.sampled is True
+        assert len(cache) == 0
+
+    def test_schemas_do_not_share_results(self):
+        cache = ResultCache()
+        compile(self.schema, result_cache=cache).validate({'a': 'x', 'b': 1})
+        with raises(Invalid):
+            compile((('a', types.integer), ('b', types.integer)), result_cache=cache).validate(
+                {'a': 'x', 'b': 1}
+            )
+
+    def test_least_recently_used_are_dropped(self):
+        cache = ResultCache(size=2)
+        compiled = compile(self.schema, result_cache=cache)
+        for data in ({'a': 'x', 'b': 1}, {'a': 'x', 'b': 2}, {'a': 'x', 'b': 1}, {'a': 'x', 'b': 3}):
+            compiled.validate(data)
+        assert len(cache) == 2
+        compiled.validate({'a': 'x', 'b': 1})
+        assert cache.hits == 2
+
+    def test_invalidate(self):
+        cache = ResultCache()
+        compiled = compile(self.schema, result_cache=cache)
+        other = compile(self.schema, result_cache=cache)
+        compiled.validate({'a': 'x', 'b': 1})
+        other.validate({'a': 'x', 'b': 1})
+        cache.invalidate(compiled)
+        assert len(cache) == 1
+        cache.invalidate()
+        assert len(cache) == 0
+
+    def test_discard(self):
+        cache = ResultCache()
+        compiled = compile(self.schema, result_cache=cache)
+        compiled.validate({'a': 'x', 'b': 1})
+        compiled.validate({'a': 'x', 'b': 2})
+        cache.discard(compiled, {'b': 1, 'a': 'x'})
+        assert len(cache) == 1
+
+    def test_external_state(self):
+        allowed = set(['x'])
+
+        def known(value):
+            assert value in allowed
+
+        cache = ResultCache()
+        compiled = compile((('a', known), ('b', types.integer)), result_cache=cache)
+        compiled.validate({'a': 'x', 'b': 1})
+        allowed.clear()
+        compiled.validate({'a': 'x', 'b': 1})
+        cache.invalidate(compiled)
+        with raises(Invalid):
+            compiled.validate({'a': 'x', 'b': 1})
+
+    def test_documents_that_can_not_be_hashed_are_validated(self):
+        cache = ResultCache()
+        compiled = compile((('a', types.string), ('b', 1)), result_cache=cache)
+        with raises(Invalid):
+            compiled.validate({'a': 'x', 'b': set([1])})
+        assert len(cache) == 0
+
+    def test_not_cached_with_limits(self):
+        cache = ResultCache()
+        compiled = compile(self.schema, result_cache=cache)
+        compiled.validate({'a': 'x', 'b': 1}, max_nodes=10)
+        compiled.validate({'a': 'x', 'b': 1}, profile=True)
+        assert len(cache) == 0
@@ -0,0 +1,116 @@
+import pickle
+
+from pytest import raises
+from notario import compile, validate
+from notario.exceptions import Invalid
+from notario.sampling import Sample
+from notario.validators import types
+from notario.validators.iterables import AllItems
+from notario.validators.recursive import AllObjects
+
+
+class TestSample(object):
+
+    def test_needs_one_option(self):
+        with raises(TypeError):
+            Sample()
+        with raises(TypeError):
+            Sample(fraction=0.5, stride=2)
+
+    def test_bad_values(self):
+        with raises(ValueError):
+            Sample(fraction=0)
+        with raises(ValueError):
+            Sample(stride=0)
+
+    def test_stride_includes_the_last(self):
+        assert Sample(stride=4).indexes(10) == [0, 4, 8, 9]
+
+    def test_size(self):
+        indexes = Sample(size=3, seed=1).indexes(100)
+        assert indexes[0] == 0
+        assert indexes[-1] == 99
+        assert 3 <= len(indexes) <= 5
+        assert indexes == sorted(indexes)
+
+    def test_fraction(self):
+        indexes = Sample(fraction=0.1, seed=1).indexes(1000)
+        assert 100 <= len(indexes) <= 102
+
+    def test_small_arrays_are_validated_whole(self):
+        assert list(Sample(size=10).indexes(5)) == [0, 1, 2, 3, 4]
+        assert list(Sample(fraction=0.5).indexes(1)) == [0]
+        assert list(Sample(stride=3).indexes(0)) == []
+
+    def test_same_seed_same_indexes(self):
+        assert Sample(size=5, seed=3).indexes(100) == Sample(size=5, seed=3).indexes(100)
+
+    def test_seed_picks_the_same_every_time(self):
+        sample = Sample(size=3, seed=1)
+        assert sample.indexes(100) == sample.indexes(100)
+        assert Sample(fraction=0.1, seed=2).indexes(50) == Sample(fraction=0.1, seed=2).indexes(50)
+
+    def test_pickle_does_not_keep_the_generator_state(self):
+        sample = Sample(size=5, seed=3)
+        assert pickle.dumps(sample) == pickle.dumps(Sample(size=5, seed=3))
+        loaded = pickle.loads(pickle.dumps(sample))
+        assert loaded.indexes(100) == Sample(size=5, seed=3).indexes(100)
+
+
+class TestSampledValidators(object):
+
+    def test_all_items(self):
+        data = {'a': [1] * 10}
+        data['a'][5] = 'one'
+        schema = ('a', AllItems(types.integer, sample=Sample(stride=4)))
+        report = validate(data, schema)
+        assert (report.arrays, report.checked, report.total) == (1, 4, 10)
+        assert report.sampled is True
+
+    def test_first_and_last_are_validated(self):
+        schema = ('a', AllItems(types.integer, sample=Sample(stride=100)))
+        with raises(Invalid):
+            validate({'a': [1, 2, 3, 'four']}, schema)
+
+    def test_all_objects(self):
+        data = {'a': dict(('k%d' % i, i) for i in range(10))}
+        schema = ('a', AllObjects((types.string, types.integer), sample=Sample(size=2)))
+        report = validate(data, schema)
+        assert report.total == 10
+        assert 3 <= report.checked <= 4
+
+    def test_nothing_sampled(self):
+        assert validate({'a': [1, 2]}, ('a', AllItems(types.integer))) is None
+
+    def test_whole_arrays_are_not_sampled(self):
+        report = validate({'a': [1, 2]}, ('a', AllItems(types.integer, sample=Sample(size=5))))
+        assert report.sampled is False
+
+
+class TestPolicy(object):
+
+    schema = (('a', AllItems(types.integer)), ('b', AllItems(types.integer, sample=False)))
+
+    def test_compiled_policy(self):
+        compiled = compile(self.schema, sample=Sample(stride=10))
+        report = compiled.validate({'a': list(range(100)), 'b': list(range(100))})
+        assert (report.arrays, report.checked, report.total) == (1, 11, 100)
+
+    def test_validate_policy(self):
+        data = {'a': list(range(100)), 'b': list(range(100))}
+        report = validate(data, self.schema, sample=Sample(stride=50))
+        assert report.checked == 3
+
+    def test_policy_can_be_turned_off(self):
+        compiled = compile(self.schema, sample=Sample(stride=10))
+        data = {'a': list(range(100)), 'b': list(range(100))}
+        assert compiled.validate(data, sample=False) is None
+
+    def test_report_with_profile(self):
+        data = {'a': list(range(100)), 'b': [1]}
+        profile = validate(data, self.schema, sample=Sample(stride=10), profile=True)
+        assert profile.sampling.checked == 11
+
+    def test_policy_does_not_leak(self):
+        compile(self.schema, sample=Sample(stride=10)).validate({'a': [1], 'b': [1]})
+        assert validate({'a': list(range(100)), 'b': [1]}, self.schema) is None
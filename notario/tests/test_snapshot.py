@@ -0,0 +1,174 @@
+import os
+import pickle
+import threading
+
+from pytest import raises
+from notario import compile, engine, snapshot
+from notario.decorators import optional
+from notario.exceptions import Invalid
+from notario.validators import types
+from notario.validators.chainable import AllIn, AnyIn
+from notario.validators.iterables import AllItems
+
+
+@types.string
+def short(value):
+    assert len(value) < 4, 'too long'
+
+
+def schema():
+    return (
+        ('a', types.string),
+        (optional('b'), AllItems((('c', types.integer), ('d', optional(short))))),
+        ('e', AnyIn(types.string, types.integer)),
+    )
+
+
+def refuse(*args, **kwargs):
+    raise AssertionError('should have been loaded from the snapshot')
+
+
+class TestCompileWithCacheDir(object):
+
+    def test_saves_a_snapshot(self, tmpdir):
+        compile(schema(), cache_dir=str(tmpdir))
+        assert len(tmpdir.listdir()) == 1
+
+    def test_loads_the_snapshot(self, tmpdir, monkeypatch):
+        compile(schema(), cache_dir=str(tmpdir))
+        monkeypatch.setattr(engine.CompiledSchema, '__init__', refuse)
+        compiled = compile(schema(), cache_dir=str(tmpdir))
+        assert compiled.validate({'a': 'x', 'b': [{'c': 1, 'd': 'abc'}], 'e': 1}) is None
+
+    def test_loaded_snapshot_fails_the_same(self, tmpdir):
+        compile(schema(), cache_dir=str(tmpdir))
+        compiled = compile(schema(), cache_dir=str(tmpdir))
+        with raises(Invalid) as exc:
+            compiled.validate({'a': 'x', 'b': [{'c': 1, 'd': 'abcd'}], 'e': 1})
+        assert exc.value.path == ['b', 'list[0]', 'd', 'abcd']
+        assert 'too long' in str(exc.value.reason)
+
+    def test_loaded_snapshot_checks_optional_keys(self, tmpdir):
+        compile(schema(), cache_dir=str(tmpdir))
+        compiled = compile(schema(), cache_dir=str(tmpdir))
+        assert compiled.validate({'a': 'x', 'e': 'y'}) is None
+
+    def test_hooks_are_not_saved(self, tmpdir):
+        hooks = engine.Hooks()
+        compile(schema(), cache_dir=str(tmpdir), hooks=hooks)
+        assert compile(schema(), cache_dir=str(tmpdir)).hooks is None
+
+    def test_corrupt_snapshot_is_replaced(self, tmpdir):
+        compile(schema(), cache_dir=str(tmpdir))
+        path = tmpdir.listdir()[0]
+        path.write('not a pickle')
+        assert compile(schema(), cache_dir=str(tmpdir)).validate({'a': 'x', 'e': 1}) is None
+        assert snapshot.load(str(path), schema()) is not None
+
+    def test_schemas_that_cannot_be_pickled_are_compiled(self, tmpdir):
+        class Locked(object):
+            def __init__(self):
+                self.lock = threading.Lock()
+
+            def __call__(self, value):
+                pass
+
+        compiled = compile(('a', Locked()), cache_dir=str(tmpdir))
+        assert compiled.validate({'a': 1}) is None
+        assert tmpdir.listdir() == []
+
+    def test_nested_schemas_are_prepared_on_load(self, tmpdir):
+        compile(schema(), cache_dir=str(tmpdir))
+        compiled = compile(schema(), cache_dir=str(tmpdir))
+        nested = compiled.schema[1][1].schema
+        assert engine.prepared_schemas[id(nested)][0] is nested
+
+
+class TestLiveObjects(object):
+
+    def test_closed_over_state_changed_after_loading(self, tmpdir):
+        names = set(['alice'])
+
+        def known(value):
+            assert value in names, 'unknown'
+
+        compile(('user', known), cache_dir=str(tmpdir))
+        loaded = compile(('user', known), cache_dir=str(tmpdir))
+        names.add('bob')
+        assert loaded.validate({'user': 'bob'}) is None
+
+    def test_loaded_schema_uses_the_validators(self, tmpdir, monkeypatch):
+        compile(('a', AnyIn(types.string, types.integer, adaptive=True)), cache_dir=str(tmpdir))
+        monkeypatch.setattr(engine.CompiledSchema, '__init__', refuse)
+        adaptive = AnyIn(types.string, types.integer, adaptive=True)
+        compiled = compile(('a', adaptive), cache_dir=str(tmpdir))
+        assert compiled.schema[0][1] is adaptive
+        compiled.validate({'a': 1})
+        assert adaptive.stats()['calls'] == 1
+
+    def test_nested_validators(self, tmpdir):
+        compile(schema(), cache_dir=str(tmpdir))
+        definition = schema()
+        compiled = compile(definition, cache_dir=str(tmpdir))
+        assert compiled.raw_schema is definition
+        assert compiled.schema[1][1] is definition[1][1]
+
+    def test_other_objects_are_not_loaded(self, tmpdir):
+        compile(schema(), cache_dir=str(tmpdir))
+        path = str(tmpdir.listdir()[0])
+        changed = schema()[:2] + (('e', AllIn(types.string, types.integer)),)
+        assert snapshot.load(path, changed) is None
+
+    def test_same_order(self):
+        first = snapshot.live_objects(schema())
+        assert snapshot.object_classes(first) == snapshot.object_classes(snapshot.live_objects(schema()))
+        assert len(first) == len(set(id(obj) for obj in first))
+
+
+class TestFingerprint(object):
+
+    def test_same_definition(self):
+        assert snapshot.fingerprint(schema())[0] == snapshot.fingerprint(schema())[0]
+
+    def test_different_definition(self):
+        changed = schema()[:2] + (('e', AnyIn(types.string, types.boolean)),)
+        assert snapshot.fingerprint(schema())[0] != snapshot.fingerprint(changed)[0]
+
+    def test_different_closures(self):
+        first = snapshot.fingerprint((optional('a'), 1))[0]
+        assert first != snapshot.fingerprint((optional('b'), 1))[0]
+
+    def test_defined_keys(self):
+        assert snapshot.fingerprint(schema())[0] != snapshot.fingerprint(schema(), True)[0]
+
+    def test_modules(self):
+        modules = snapshot.fingerprint(schema())[1]
+        assert 'notario.validators.types' in modules
+        assert __name__ in modules
+
+
+class TestIsFresh(object):
+
+    def test_unchanged_sources(self):
+        assert snapshot.is_fresh(snapshot.sources(['notario.engine'])) is True
+
+    def test_changed_sources(self):
+        path = engine.__file__
+        stat = os.stat(path)
+        saved = {'notario.engine': (path, stat.st_mtime - 1, stat.st_size)}
+        assert snapshot.is_fresh(saved) is False
+
+
+class TestPickleChainable(object):
+
+    def test_all_in(self):
+        validator = pickle.loads(pickle.dumps(AllIn(types.string, adaptive=True)))
+        assert validator.adaptive is True
+        with validator._lock:
+            pass
+
+    def test_any_in(self):
+        validator = pickle.loads(pickle.dumps(AnyIn(types.string, types.integer)))
+        assert validator.args == (types.string, types.integer)
+        with validator._lock:
+            pass
@@ -66,6 +66,23 @@ class TestSift(object):
         result = utils.sift(data, [item])
         assert result == {0: ('a', 1)}
 
+    def test_picked_keys(self):
+        data = Data({'a': 1, 'b': 2, 'c': 3}, {}).normalized()
+        result = utils.sift(data, keys=frozenset(['c', 'a']))
+        assert result == {0: ('a', 1), 1: ('c', 3)}
+
+
+class TestPickedKeys(object):
+
+    def test_unwraps_optional_keys(self):
+        item = RequiredItem()
+        item._object = 'a'
+        assert 'a' in utils.picked_keys([item, 'b'])
+        assert 'b' in utils.picked_keys([item, 'b'])
+
+    def test_unhashable(self):
+        assert utils.picked_keys([['a']]) is None
+
 
 class TestReSort(object):
 
@@ -134,6 +151,16 @@ class TestExpandSchema(object):
             return 'a', 'b'
         assert utils.expand_schema(my_schema) == ('a', 'b')
 
+    def test_is_expanded_once(self):
+        calls = []
+
+        @delay
+        def my_schema():
+            calls.append(1)
+            return 'a', 'b'
+        assert utils.expand_schema(my_schema) is utils.expand_schema(my_schema)
+        assert len(calls) == 1
+
 
 class TestIsSchema(object):
 
@@ -156,3 +183,34 @@ class TestEnsure(object):
     def test_ensure_raises_assertionerror(self):
         with raises(AssertionError):
             utils.ensure(0 == 1)
+
+
+class TestNlist(object):
+
+    def test_dictionary_interface(self):
+        items = utils.nlist([('a', 1), ('b', 2)])
+        assert list(items.keys()) == [0, 1]
+        assert items.values() == [('a', 1), ('b', 2)]
+        assert list(items.items()) == [(0, ('a', 1)), (1, ('b', 2))]
+
+    def test_get(self):
+        items = utils.nlist([('a', 1)])
+        assert items.get(0) == ('a', 1)
+        assert items.get(1) is None
+        assert items.get(-1) is None
+
+    def test_equal_to_dictionaries_keyed_by_position(self):
+        items = utils.nlist([('a', 1), ('b', 2)])
+        assert items == {0: ('a', 1), 1: ('b', 2)}
+        assert items != {0: ('b', 2), 1: ('a', 1)}
+
+    def test_repr_like_a_dictionary(self):
+        assert repr(utils.nlist([('a', 1)])) == "{0: ('a', 1)}"
+
+    def test_no_instance_dict(self):
+        items = utils.nlist()
+        assert not hasattr(items, '__dict__')
+        items.must_validate = ('a',)
+        assert items.must_validate == ('a',)
+        with raises(AttributeError):
+            items.other = True
@@ -1,6 +1,7 @@
 from pytest import raises
 from notario.validators import chainable
 from notario.validators import types
+from notario.decorators import cost
 
 
 class TestBasicChainValidator(object):
@@ -46,3 +47,97 @@ class TestAnyIn(object):
         with raises(AssertionError) as exc:
             chain('some value')
         assert exc.value.args[0] == 'did not passed validation against any validator'
+
+
+class TestAdaptiveAnyIn(object):
+
+    def test_unknown_options_are_refused(self):
+        def foo(value): pass
+        with raises(TypeError) as exc:
+            chainable.AnyIn(foo, adaptative=True)
+        assert exc.value.args[0] == "got an unexpected keyword argument: adaptative"
+
+    def test_not_adaptive_by_default(self):
+        chain = chainable.AnyIn(types.boolean, types.string)
+        for _ in range(200):
+            chain('some value')
+        assert chain.order == (0, 1)
+        assert chain.stats()['calls'] == 0
+
+    def test_reorders_most_passing_first(self):
+        chain = chainable.AnyIn(types.boolean, types.integer, types.string,
+                                adaptive=True, reorder_every=10)
+        for _ in range(10):
+            chain('some value')
+        assert chain.order == (2, 0, 1)
+        stats = chain.stats()
+        assert stats['calls'] == 10
+        assert stats['validators'][0] == ('string', 10)
+
+    def test_keeps_order_before_reordering(self):
+        chain = chainable.AnyIn(types.boolean, types.string,
+                                adaptive=True, reorder_every=10)
+        for _ in range(9):
+            chain('some value')
+        assert chain.order == (0, 1)
+
+    def test_ties_keep_declaration_order(self):
+        chain = chainable.AnyIn(types.boolean, types.integer, types.string,
+                                adaptive=True, reorder_every=2)
+        chain('some value')
+        chain(1)
+        assert chain.order == (1, 2, 0)
+
+    def test_no_validator_passes(self):
+        chain = chainable.AnyIn(types.boolean, types.string, adaptive=True)
+        with raises(AssertionError) as exc:
+            chain(1)
+        assert exc.value.args[0] == 'did not passed validation against any validator'
+        assert chain.stats()['failures'] == 1
+
+
+class TestCostAwareAllIn(object):
+
+    def test_cheapest_validators_run_first(self):
+        calls = []
+        @cost(10)
+        def expensive(value): calls.append('expensive')
+        def cheap(value): calls.append('cheap')
+        chain = chainable.AllIn(expensive, cheap)
+        chain('some value')
+        assert calls == ['cheap', 'expensive']
+
+    def test_ordered_keeps_declaration_order(self):
+        calls = []
+        @cost(10)
+        def expensive(value): calls.append('expensive')
+        def cheap(value): calls.append('cheap')
+        chain = chainable.AllIn(expensive, cheap, ordered=True)
+        chain('some value')
+        assert calls == ['expensive', 'cheap']
+
+    def test_ordered_error_is_deterministic(self):
+        chain = chainable.AllIn(cost(10)(types.boolean), types.integer, ordered=True)
+        with raises(AssertionError):
+            chain("some string")
+        assert chain.__name__ == 'AllIn -> boolean'
+
+    def test_adaptive_runs_frequently_failing_first(self):
+        def always_passes(value): pass
+        chain = chainable.AllIn(always_passes, types.integer,
+                                adaptive=True, reorder_every=10)
+        for _ in range(10):
+            with raises(AssertionError):
+                chain("some string")
+        assert chain.order == (1, 0)
+        stats = chain.stats()
+        assert stats['calls'] == 10
+        name, runs, failures, elapsed = stats['validators'][0]
+        assert (name, runs, failures) == ('integer', 10, 10)
+
+    def test_adaptive_keeps_the_error_message(self):
+        chain = chainable.AllIn(types.boolean, types.string, adaptive=True)
+        with raises(AssertionError) as exc:
+            chain("some string")
+        assert exc.value.args[0].args[0] == 'not of type boolean'
+        assert chain.__name__ == 'AllIn -> boolean'
@@ -1,5 +1,5 @@
 from pytest import raises
-from notario.validators import iterables, types
+from notario.validators import cherry_pick, iterables, types
 from notario.exceptions import Invalid, SchemaError
 
 
@@ -61,6 +61,46 @@ class TestAnyItem(object):
             all_items(data, [])
         assert 'expected a list but got int' == exc.value.reason
 
+    def test_literal_object_pass(self):
+        data = [{'a': 1}, {'a': 2, 'b': 'x'}]
+        any_item = iterables.AnyItem((('a', 2), ('b', 'x')))
+        assert any_item.literal(any_item.schema)[0] == 'object'
+        assert any_item(data, []) is None
+
+    def test_literal_object_needs_every_key(self):
+        data = [{'a': 2, 'b': 'x', 'c': 1}]
+        with raises(Invalid) as exc:
+            iterables.AnyItem((('a', 2), ('b', 'x')))(data, [])
+        msg = "-> list[] did not contain any valid items matching (('a', 2), ('b', 'x'))"
+        assert exc.value.args[0] == msg
+
+    def test_literal_cherry_pick_is_a_subset(self):
+        data = [{'a': 2, 'b': 'x', 'c': 1}]
+        any_item = iterables.AnyItem(cherry_pick((('a', 2), ('b', 'x'))))
+        assert any_item.literal(any_item.schema)[0] == 'subset'
+        assert any_item(data, []) is None
+
+    def test_unordered_schema_goes_through_the_engine(self):
+        any_item = iterables.AnyItem((('b', 'x'), ('a', 2)))
+        assert any_item.literal(any_item.schema) is None
+        with raises(SchemaError):
+            any_item([{'a': 2, 'b': 'x'}], [])
+
+    def test_callable_values_go_through_the_engine(self):
+        any_item = iterables.AnyItem(('a', types.integer))
+        assert any_item.literal(any_item.schema) is None
+        assert any_item([{'a': 'x'}, {'a': 1}], []) is None
+
+    def test_single_items_before_a_match_are_an_error(self):
+        with raises(SchemaError):
+            iterables.AnyItem(('a', 1))([1, {'a': 1}], [])
+
+    def test_misses_do_not_grow_the_tree(self):
+        any_item = iterables.AnyItem(types.string)
+        with raises(Invalid) as exc:
+            any_item([1, 2, 3], ['a'])
+        assert exc.value.path == ['a', 'list[]']
+
 
 
 class TestAllItems(object):
@@ -126,3 +166,65 @@ class TestAllItems(object):
         error = exc.value.args[0]
         assert  "list[0] did not match schema" in error
         assert "(required key in data is missing: interface)" in error
+
+
+click = (('id', types.integer), ('type', 'click'))
+message = (('text', types.string), ('type', 'message'))
+
+
+class TestMultiIterable(object):
+
+    def test_infers_the_discriminator(self):
+        multi = iterables.MultiIterable(click, message)
+        assert multi.dispatch().key == 'type'
+        assert multi.dispatch().index == {'click': (0,), 'message': (1,)}
+
+    def test_no_discriminator_to_infer(self):
+        multi = iterables.MultiIterable(('a', 1), ('b', 1))
+        assert multi.dispatch() is False
+
+    def test_explicit_discriminator(self):
+        multi = iterables.MultiIterable(click, message, discriminator='id')
+        assert multi.dispatch().key == 'id'
+        assert multi.dispatch().wildcards == (0, 1)
+
+    def test_disabled_discriminator(self):
+        multi = iterables.MultiIterable(click, message, discriminator=False)
+        assert multi.dispatch() is False
+
+    def test_unknown_option(self):
+        with raises(TypeError):
+            iterables.MultiIterable(click, message, discriminators='type')
+
+    def test_items_go_to_their_schema(self):
+        data = [{'type': 'message', 'text': 'hi'}, {'type': 'click', 'id': 1}]
+        multi = iterables.MultiIterable(click, message)
+        assert multi(data, []) is None
+
+    def test_only_the_candidate_is_tried(self):
+        calls = []
+
+        def text(value):
+            calls.append(value)
+
+        multi = iterables.MultiIterable(click, (('text', text), ('type', 'message')))
+        multi([{'type': 'click', 'id': 1}, {'type': 'click', 'id': 2}], [])
+        assert calls == []
+
+    def test_items_without_discriminator_try_every_schema(self):
+        schemas = (click, message, ('other', 1))
+        multi = iterables.MultiIterable(*schemas, discriminator='type')
+        assert multi([{'other': 1}], []) is None
+
+    def test_failures_are_the_same(self):
+        data = [{'type': 'click', 'id': 'one'}]
+        with raises(Invalid) as dispatched:
+            iterables.MultiIterable(click, message)(data, [])
+        with raises(Invalid) as ordered:
+            iterables.MultiIterable(click, message, discriminator=False)(data, [])
+        assert str(dispatched.value) == str(ordered.value)
+
+    def test_unknown_discriminator_value(self):
+        data = [{'type': 'scroll', 'id': 1}]
+        with raises(Invalid):
+            iterables.MultiIterable(click, message)(data, [])
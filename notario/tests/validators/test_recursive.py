@@ -112,3 +112,41 @@ class TestMultiSchema(object):
             multi(data, [])
         assert 'z -> 2 did not match 1' in exc.value.args[0]
 
+
+
+class TestMultiRecursiveDiscriminator(object):
+
+    click = (types.string, (('id', types.integer), ('type', 'click')))
+    message = (types.string, (('text', types.string), ('type', 'message')))
+
+    def test_dispatch_by_key(self):
+        multi = recursive.MultiRecursive(('a', 2), ('b', 2), ('b', 1))
+        assert multi.dispatch().key is None
+        assert multi.dispatch().index == {'a': (0,), 'b': (1, 2)}
+
+    def test_infers_the_discriminator_of_values(self):
+        multi = recursive.MultiRecursive(self.click, self.message)
+        assert multi.dispatch().key == 'type'
+
+    def test_explicit_discriminator(self):
+        multi = recursive.MultiRecursive(self.click, self.message, discriminator='id')
+        assert multi.dispatch().key == 'id'
+
+    def test_disabled_discriminator(self):
+        multi = recursive.MultiRecursive(('a', 2), ('b', 1), discriminator=False)
+        assert multi.dispatch() is False
+
+    def test_items_go_to_their_schema(self):
+        data = Data({
+            'a': {'type': 'message', 'text': 'hi'}, 'b': {'type': 'click', 'id': 1}
+        }, {}).normalized()
+        multi = recursive.MultiRecursive(self.click, self.message)
+        assert multi(data, []) is None
+
+    def test_failures_are_the_same(self):
+        data = Data({'a': {'type': 'click', 'id': 'one'}}, {}).normalized()
+        with raises(Invalid) as dispatched:
+            recursive.MultiRecursive(self.click, self.message)(data, [])
+        with raises(Invalid) as ordered:
+            recursive.MultiRecursive(self.click, self.message, discriminator=False)(data, [])
+        assert str(dispatched.value) == str(ordered.value)
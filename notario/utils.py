@@ -14,7 +14,7 @@ def safe_repr(obj):
     to user a ``repr()`` call.
     """
     name = getattr(obj, '__name__', getattr(obj.__class__, '__name__'))
-    if name == 'ndict':
+    if name in ('ndict', 'DataView'):
         name = 'dict'
     return name or repr(obj)
 
@@ -36,6 +36,47 @@ class ndict(dict):
     pass
 
 
+class nlist(list):
+    """
+    A normalized schema: the ``(key, value)`` items of a schema level in
+    order, without the cost of a dictionary (and of an instance ``__dict__``)
+    for what is only a sequence. It keeps the read interface of the
+    dictionaries keyed by position used before it (``keys()``, ``values()``,
+    ``items()``, ``get()`` and comparing equal to them) and has a slot for
+    the ``must_validate`` keys of a cherry picked schema, and for what the
+    engine works out about a schema when preparing it.
+    """
+
+    __slots__ = ('must_validate', 'picked', 'kinds', 'optionals', 'ordered', 'literal')
+
+    def keys(self):
+        return range(len(self))
+
+    def values(self):
+        return list(self)
+
+    def items(self):
+        return enumerate(self)
+
+    def get(self, index, default=None):
+        if 0 <= index < len(self):
+            return self[index]
+        return default
+
+    def __eq__(self, other):
+        if isinstance(other, dict):
+            return dict(enumerate(self)) == other
+        return list.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(dict(enumerate(self)))
+
+
 def re_sort(data):
     """
     A data with keys that are not enumerated sequentially will be
@@ -54,12 +95,37 @@ def re_sort(data):
     return new_data
 
 
-def sift(data, required_items=None):
+def picked_keys(required_items):
+    """
+    The set of data keys that match ``required_items`` (the ``must_validate``
+    keys of a ``cherry_pick``), with ``optional`` keys unwrapped, so that
+    :func:`sift` can look every data key up once. ``None`` if one of them
+    can't be in a set.
+    """
+    keys = set()
+    try:
+        for required_item in required_items:
+            keys.add(required_item)
+            key = getattr(required_item, '_object', False)
+            if key:
+                keys.add(key)
+    except TypeError:  # unhashable
+        return None
+    return frozenset(keys)
+
+
+def sift(data, required_items=None, keys=None):
     """
     Receive a ``data`` object that will be in the form
     of a normalized structure (e.g. ``{0: {'a': 0}}``) and
     filter out keys that match the ``required_items``.
+
+    ``keys`` are the :func:`picked_keys` of ``required_items``, when they
+    are known already.
     """
+    if keys is not None:
+        indexes = sorted(k for k, v in data.items() if v[0] in keys)
+        return dict((number, data[k]) for number, k in enumerate(indexes))
     required_items = required_items or []
     new_data = {}
     for k, v in data.items():
@@ -126,8 +192,21 @@ def forced_leaf_validator(func):
 
 
 def expand_schema(schema):
+    """
+    Call a ``delay``-ed schema to get the actual schema. It is only called
+    the first time, the schema it returns is kept on the function so that
+    recursive schemas are the same objects at every level.
+    """
     if hasattr(schema, '__delayed__'):
-        return schema()
+        try:
+            return schema.__expanded__
+        except AttributeError:
+            expanded = schema()
+            try:
+                schema.__expanded__ = expanded
+            except AttributeError:  # can't set attributes on it
+                pass
+            return expanded
     return schema
 
 
@@ -156,3 +235,17 @@ def ensure(assertion, message=None):
         raise AssertionError(message)
 
     return True
+
+
+def pop_options(kwargs, **defaults):
+    """
+    Python 2 does not allow keyword-only arguments after ``*args``, so
+    validators taking any number of schemas or validators get their options
+    from ``kwargs``, complaining about anything that is not known.
+    """
+    options = dict(
+        (name, kwargs.pop(name, default)) for name, default in defaults.items()
+    )
+    if kwargs:
+        raise TypeError("got an unexpected keyword argument: %s" % sorted(kwargs)[0])
+    return options
@@ -1,3 +1,6 @@
+from notario.utils import expand_schema, is_callable
+
+
 
 
 class cherry_pick(tuple):
@@ -85,3 +88,100 @@ class Hybrid(object):
                 tree = []
             from notario.engine import enforce
             enforce(value, self.validator, tree, pair='value')
+
+
+#: Stands for schemas that do not require a literal value for a key
+missing = object()
+
+
+def schema_pairs(schema):
+    """
+    The ``(key, value)`` pairs of an object schema, one or many.
+    """
+    schema = expand_schema(schema)
+    if not isinstance(schema, tuple) or not schema:
+        return ()
+    if isinstance(schema[0], tuple):
+        return [pair for pair in schema if isinstance(pair, tuple) and len(pair) == 2]
+    if len(schema) == 2:
+        return (schema,)
+    return ()
+
+
+def literal(value):
+    """
+    Return ``value`` if it is a literal that can be indexed, or ``missing``.
+    """
+    if is_callable(value) or isinstance(value, (tuple, list, dict)):
+        return missing
+    try:
+        hash(value)
+    except TypeError:
+        return missing
+    return value
+
+
+def literal_value(schema, key):
+    """
+    The literal value that ``schema`` (an object schema) requires for
+    ``key``, or ``missing``.
+    """
+    for pair_key, value in schema_pairs(schema):
+        if literal(pair_key) is not missing and pair_key == key:
+            return literal(value)
+    return missing
+
+
+def infer_discriminator(schemas):
+    """
+    Find the key that every one of the object ``schemas`` requires a literal
+    value for, with the most distinct values. ``None`` if there is not one
+    with at least two.
+    """
+    values = {}
+    for position, schema in enumerate(schemas):
+        for key, value in schema_pairs(schema):
+            if literal(key) is missing or literal(value) is missing:
+                continue
+            values.setdefault(key, {})[position] = value
+    best, distinct = None, 1
+    for key in sorted(values, key=repr):
+        if len(values[key]) < len(schemas):
+            continue
+        count = len(set(values[key].values()))
+        if count > distinct:
+            best, distinct = key, count
+    return best
+
+
+class Discriminator(object):
+    """
+    An index of the schemas of the ``Multi*`` validators by the literal value
+    each one requires for a key (the discriminator), so that an item can be
+    validated against the schemas that can pass for it instead of all of
+    them. ``values`` has the value of every schema, or ``missing`` for the
+    ones that can take any value, which are always candidates.
+    """
+
+    def __init__(self, key, values):
+        self.key = key
+        self.wildcards = tuple(
+            position for position, value in enumerate(values) if value is missing
+        )
+        index = {}
+        for position, value in enumerate(values):
+            if value is not missing:
+                index.setdefault(value, set(self.wildcards)).add(position)
+        self.index = dict((value, tuple(sorted(positions))) for value, positions in index.items())
+
+    def candidates(self, value):
+        """
+        The positions of the schemas that can pass for an item with ``value``
+        for the discriminator, or ``None`` if all of them have to be tried.
+        """
+        if value is missing:
+            return None
+        try:
+            return self.index.get(value, self.wildcards)
+        except TypeError:  # unhashable
+            return None
@@ -3,7 +3,10 @@ Chainable validators are *encapsulating* validators. They
 usually will not validate per se, but can contain other validators
 inside them and pass the value to them.
 """
-from notario.utils import is_callable
+from threading import Lock
+from timeit import default_timer
+
+from notario.utils import is_callable, pop_options, safe_repr
 
 
 class BasicChainValidator(object):
@@ -19,6 +22,18 @@ class BasicChainValidator(object):
                 raise TypeError("got a non-callable argument: %s" % repr(i))
         self.args = args
 
+    def __getstate__(self):
+        # locks can't be pickled, a new one is created when unpickling
+        state = self.__dict__.copy()
+        if state.pop('_lock', None) is not None:
+            state['_lock'] = True
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if '_lock' in state:
+            self._lock = Lock()
+
 
 class AllIn(BasicChainValidator):
     """
@@ -42,18 +57,130 @@ class AllIn(BasicChainValidator):
         schema = ('foo', AllIn(min_length, max_length, StartsWith('s'))
         validate(data, schema)
 
+    Since the first failing validator rejects the value, the order in which
+    validators run matters when some of them are expensive. Validators can
+    carry a cost hint with :func:`notario.decorators.cost` (validators without
+    one have a cost of ``1``) and they will run from the cheapest to the most
+    expensive one.
+
+    With ``adaptive=True`` the validator measures how long every contained
+    validator takes and how often it fails, and every ``reorder_every`` calls
+    it sorts them so that cheap validators that fail often run first::
+
+        schema = ('foo', AllIn(types.string, long_regex_chain, adaptive=True))
+
+    The measurements are available with :meth:`stats`.
+
+    Because the error message points to the first validator that failed, it
+    can change when the order changes. Pass ``ordered=True`` (or set
+    ``AllIn.ordered = True`` to do it for every instance) to always run the
+    validators in the order they were declared.
 
     :raises: TypeError if the validator is *not* a callable
     """
 
+    ordered = False
+
+    def __init__(self, *args, **kwargs):
+        options = pop_options(
+            kwargs, adaptive=False, ordered=None, reorder_every=100
+        )
+        super(AllIn, self).__init__(*args)
+        if options['ordered'] is not None:
+            self.ordered = options['ordered']
+        self.adaptive = options['adaptive']
+        self.reorder_every = options['reorder_every']
+        self.order = tuple(
+            sorted(range(len(args)), key=lambda index: getattr(args[index], '__cost__', 1))
+        )
+        self.calls = 0
+        self.runs = [0] * len(args)
+        self.failures = [0] * len(args)
+        self.elapsed = [0.0] * len(args)
+        self._lock = Lock()
+
     def __call__(self, value):
-        for validator in self.args:
+        if self.ordered:
+            order = range(len(self.args))
+        else:
+            order = self.order
+
+        if self.adaptive and not self.ordered:
+            return self._measured_call(value, order)
+
+        for index in order:
+            validator = self.args[index]
             try:
                 validator(value)
             except AssertionError as exc:
                 self.__name__ = 'AllIn -> %s' % validator.__name__
                 raise AssertionError(exc)
 
+    def _measured_call(self, value, order):
+        measurements = []
+        try:
+            for index in order:
+                validator = self.args[index]
+                start = default_timer()
+                try:
+                    validator(value)
+                except AssertionError as exc:
+                    measurements.append((index, default_timer() - start, True))
+                    self.__name__ = 'AllIn -> %s' % validator.__name__
+                    raise AssertionError(exc)
+                measurements.append((index, default_timer() - start, False))
+        finally:
+            self._record(measurements)
+
+    def _record(self, measurements):
+        with self._lock:
+            self.calls += 1
+            for index, elapsed, failed in measurements:
+                self.runs[index] += 1
+                self.elapsed[index] += elapsed
+                if failed:
+                    self.failures[index] += 1
+            if self.calls % self.reorder_every == 0:
+                self.reorder()
+
+    def expected_cost(self, index):
+        """
+        The average time spent by a validator until a failure rejects the
+        value, which is its mean run time divided by its failure rate.
+        Validators that never ran have no cost so that they run early and get
+        measured.
+        """
+        runs = self.runs[index]
+        if not runs:
+            return 0.0
+        # smoothed, so that validators that never failed are not infinitely
+        # expensive and keep sorting by their run time
+        failure_rate = (self.failures[index] + 1.0) / (runs + 2.0)
+        return (self.elapsed[index] / runs) / failure_rate
+
+    def reorder(self):
+        """
+        Sort the validators by their :meth:`expected_cost`. Called
+        automatically every ``reorder_every`` calls in adaptive mode.
+        """
+        self.order = tuple(sorted(range(len(self.args)), key=self.expected_cost))
+
+    def stats(self):
+        """
+        Return how many times the validator was called and, in the order they
+        currently run, the name, number of runs, number of failures and total
+        time spent of every contained validator.
+        """
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'validators': [
+                    (safe_repr(self.args[index]), self.runs[index],
+                     self.failures[index], self.elapsed[index])
+                    for index in self.order
+                ],
+            }
+
 
 class AnyIn(BasicChainValidator):
     """
@@ -62,15 +189,88 @@ class AnyIn(BasicChainValidator):
     pointing out that the ``AnyIn`` validator was not able to pass against any
     contained validator.
 
+    When one of the validators is known to pass most of the time, trying it
+    first avoids failing (and catching ``AssertionError`` for) all the ones
+    declared before it. With ``adaptive=True`` the validator counts how many
+    times every contained validator passed and, every ``reorder_every``
+    calls, tries them in order of most passes. Validators that pass equally
+    often keep their declaration order::
+
+        schema = ('foo', AnyIn(types.boolean, types.integer, types.string, adaptive=True))
+
+    The counts are available with :meth:`stats`. Adaptive validators are safe
+    to share between threads.
+
     :raises: TypeError if the validator is *not* a callable
     """
     __name__ = 'AnyIn'
 
+    def __init__(self, *args, **kwargs):
+        options = pop_options(kwargs, adaptive=False, reorder_every=100)
+        super(AnyIn, self).__init__(*args)
+        self.adaptive = options['adaptive']
+        self.reorder_every = options['reorder_every']
+        self.order = tuple(range(len(args)))
+        self.passes = [0] * len(args)
+        self.calls = 0
+        self.failures = 0
+        self._lock = Lock()
+
     def __call__(self, value):
-        for validator in self.args:
+        if not self.adaptive:
+            for validator in self.args:
+                try:
+                    return validator(value)
+                except AssertionError:
+                    pass
+
+            raise AssertionError("did not passed validation against any validator")
+
+        # ``self.order`` may be swapped by another thread, the tuple it had
+        # when the loop started is the one used
+        for index in self.order:
             try:
-                return validator(value)
+                result = self.args[index](value)
             except AssertionError:
-                pass
+                continue
+            self._record(index)
+            return result
 
+        self._record(None)
         raise AssertionError("did not passed validation against any validator")
+
+    def _record(self, index):
+        with self._lock:
+            self.calls += 1
+            if index is None:
+                self.failures += 1
+            else:
+                self.passes[index] += 1
+            if self.calls % self.reorder_every == 0:
+                self.reorder()
+
+    def reorder(self):
+        """
+        Sort the validators so that the ones that passed the most are tried
+        first. Called automatically every ``reorder_every`` calls.
+        """
+        passes = self.passes
+        self.order = tuple(
+            sorted(range(len(self.args)), key=lambda index: -passes[index])
+        )
+
+    def stats(self):
+        """
+        Return how many times the validator was called, how many times none of
+        the contained validators passed and, in the order they are currently
+        tried, the name and number of passes of every contained validator.
+        """
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'failures': self.failures,
+                'validators': [
+                    (safe_repr(self.args[index]), self.passes[index])
+                    for index in self.order
+                ],
+            }
@@ -2,9 +2,14 @@
 Iterable validators for array objects only. They provide a way of
 applying a schema to any given items in an array.
 """
+from notario import sampling
 from notario.exceptions import Invalid, SchemaError
-from notario.engine import IterableValidator
-from notario.utils import is_callable, safe_repr, expand_schema, is_schema
+from notario.engine import IterableValidator, active_budget, active_tracer
+from notario.utils import is_callable, safe_repr, expand_schema, is_schema, pop_options
+from notario.validators import (
+    Discriminator, cherry_pick, infer_discriminator, literal, literal_value,
+    missing, schema_pairs
+)
 
 
 class BasicIterableValidator(object):
@@ -32,6 +37,32 @@ class BasicIterableValidator(object):
             raise Invalid(self.schema, tree, reason=reason, pair='value', msg=msg)
 
 
+def literal_object(schema):
+    """
+    For a schema of literal keys (in alphabetical order) and literal values,
+    return ``('object', value)`` with the dictionary it matches, or
+    ``('subset', value)`` for a ``cherry_pick`` of them. ``None`` otherwise.
+    """
+    if schema.__class__ not in (tuple, cherry_pick) or not schema:
+        return None
+    pairs = schema_pairs(schema)
+    if len(pairs) != (len(schema) if isinstance(schema[0], tuple) else 1):
+        return None
+    if any(literal(item) is missing for pair in pairs for item in pair):
+        return None
+    keys = [key for key, _ in pairs]
+    try:
+        if keys != sorted(set(keys)):
+            return None
+    except TypeError:
+        return None
+    if schema.__class__ is tuple:
+        return 'object', dict(pairs)
+    if tuple(schema.must_validate) == tuple(keys):
+        return 'subset', dict(pairs)
+    return None
+
+
 class AnyItem(BasicIterableValidator):
     """
     Go over all the items in an array and make sure that at least
@@ -74,17 +105,76 @@ class AnyItem(BasicIterableValidator):
 
     """
 
+    _literal = None
+
     def __call__(self, data, tree):
         schema = expand_schema(self.schema)
         self.safe_type(data, tree)
+        # with a budget every item has to be accounted for by the engine
+        if active_tracer() is None and active_budget() is None:
+            found = self.find(data, schema)
+            if found is True:
+                return
+            if found is False:
+                return self.not_found(schema, tree)
+
         index = len(data) - 1
         validator = IterableValidator(data, schema, [], index=index, name='AnyItem')
         for item_index in range(len(data)):
             try:
                 return validator.leaf(item_index)
             except Invalid:
+                # every miss starts over, instead of adding to the path of
+                # the previous ones
+                validator.tree = []
+        self.not_found(schema, tree)
+
+    def literal(self, schema):
+        """
+        Return a ``(kind, value)`` tuple telling how items can be compared
+        against ``schema`` without going through the engine (see
+        :meth:`find`), or ``None`` if they can't.
+        """
+        if self._literal is not None and self._literal[0] is schema:
+            return self._literal[1]
+        kind = None
+        if isinstance(schema, tuple):
+            kind = literal_object(schema)
+        elif not is_callable(schema):
+            try:
+                if schema == schema:
+                    kind = ('item', schema)
+            except Exception:
                 pass
+        self._literal = (schema, kind)
+        return kind
 
+    def find(self, data, schema):
+        """
+        Look for an item matching ``schema`` at C speed when possible:
+        a single value is looked up with ``in``, and a schema of literal keys
+        and values is matched by dictionaries equal to it (or having its
+        items, for a ``cherry_pick``). ``True`` or ``False`` tell if there
+        is one, and ``None`` that the items have to go through the engine.
+        """
+        kind = self.literal(schema)
+        if kind is None:
+            return None
+        kind, value = kind
+        if kind == 'item':
+            return value in data
+        for item in data:
+            if not isinstance(item, dict):
+                # the engine complains about these, let it do so
+                return None
+            if kind == 'object':
+                if item == value:
+                    return True
+            elif all(key in item and item[key] == expected for key, expected in value.items()):
+                return True
+        return False
+
+    def not_found(self, schema, tree):
         tree.append('list[]')
         if is_callable(schema):
             msg = "did not contain any valid items against callable: %s" % schema.__name__
@@ -135,12 +225,26 @@ class AllItems(BasicIterableValidator):
     failure was created and it goes even further giving the key and value of
     the object it went against.
 
+    For very large arrays from trusted sources, ``sample`` can be
+    a :class:`notario.sampling.Sample` to validate only some of the items,
+    or ``False`` to always validate all of them regardless of the policy of
+    the compiled schema::
+
+        schema = ('foo', AllItems(('a', 1), sample=Sample(stride=100)))
+
     """
 
+    def __init__(self, schema, sample=None):
+        self.schema = schema
+        self.sample = sample
+
     def __call__(self, data, tree):
         schema = expand_schema(self.schema)
         self.safe_type(data, tree)
         validator = IterableValidator(data, schema, tree, name='AllItems')
+        sample = sampling.policy(self.sample)
+        if sample is not None:
+            validator.indexes = sampling.indexes(sample, len(data))
         validator.validate()
 
 
@@ -186,14 +290,48 @@ class MultiIterable(object):
         ...
         Invalid: -> foo -> False did not match 'bar'
 
+    When every schema requires a different literal value for the same key,
+    like the ``'type'`` of events, items only go through the schemas that
+    require their value for it instead of trying them all in order::
+
+        MultiIterable(
+            (('id', types.integer), ('type', 'click')),
+            (('text', types.string), ('type', 'message')),
+        )
+
+    That key (the discriminator) is found by looking at the schemas, or
+    can be given with ``discriminator='type'``. ``discriminator=False``
+    always tries the schemas in order. Items without the key are tried
+    against all the schemas.
     """
     __validator_leaf__ = True
 
-    def __init__(self, *schemas):
+    def __init__(self, *schemas, **kwargs):
+        options = pop_options(kwargs, discriminator=None)
         for schema in schemas:
             if not is_schema(schema):
                 raise TypeError("got a non schema argument: %s" % safe_repr(schema))
         self.schemas = schemas
+        self.discriminator = options['discriminator']
+        self._dispatch = None
+
+    def dispatch(self):
+        """
+        The :class:`~notario.validators.Discriminator` for the schemas, built
+        the first time it is needed so that ``delay``-ed schemas are expanded
+        as late as possible. ``False`` if there is not one.
+        """
+        if self._dispatch is None:
+            key = self.discriminator
+            if key is None:
+                key = infer_discriminator(self.schemas)
+            if key is None or key is False:
+                self._dispatch = False
+            else:
+                self._dispatch = Discriminator(
+                    key, [literal_value(schema, key) for schema in self.schemas]
+                )
+        return self._dispatch
 
     def __call__(self, data, tree):
         """
@@ -212,13 +350,36 @@ class MultiIterable(object):
         first_schema = expand_schema(self.schemas[0])
         index = len(data) - 1
         validator = IterableValidator(data, first_schema, tree, index=index, name='MultiIterable')
+        dispatch = self.dispatch()
 
         for item_index in range(len(data)):
+            if dispatch:
+                item = data[item_index]
+                if isinstance(item, dict):
+                    candidates = dispatch.candidates(item.get(dispatch.key, missing))
+                    if candidates and self.dispatched(validator, item_index, candidates):
+                        continue
             try:
                 validator.leaf(item_index)
             except (SchemaError, Invalid):
                 self.itemized_validation(validator, item_index)
 
+    def dispatched(self, validator, item_index, candidates):
+        """
+        Validate the item against the schemas in ``candidates``, returning
+        ``True`` if one passes. When none does, the item goes through all the
+        schemas to fail just like it would without a discriminator.
+        """
+        for position in candidates:
+            try:
+                validator.schema = expand_schema(self.schemas[position])
+                validator.tree = []
+                validator.leaf(item_index)
+                return True
+            except (SchemaError, Invalid):
+                pass
+        return False
+
     def itemized_validation(self, validator, item_index):
         error = None
 
@@ -1,6 +1,10 @@
+from notario import sampling
 from notario.exceptions import Invalid
-from notario.utils import safe_repr, expand_schema, is_schema
+from notario.utils import safe_repr, expand_schema, is_schema, pop_options
 from notario.engine import RecursiveValidator
+from notario.validators import (
+    Discriminator, infer_discriminator, literal, literal_value, missing, schema_pairs
+)
 
 
 class BasicRecursiveValidator(object):
@@ -66,9 +70,9 @@ class AnyObject(BasicRecursiveValidator):
             try:
                 return validator.leaf(item_index)
             except Invalid:
-                if tree:
-                    tree.pop
-                pass
+                # every miss starts over, instead of adding to the path of
+                # the previous ones
+                validator.tree = []
 
         msg = "did not contain any valid objects against callable: %s" % self.__class__.__name__
         raise Invalid(schema, tree, pair='value', msg=msg)
@@ -115,12 +119,20 @@ class AllObjects(BasicRecursiveValidator):
     the failure was created and it goes even further giving the key and value
     of the object it went against.
 
-
+    Like :class:`notario.validators.iterables.AllItems`, ``sample`` can be
+    a :class:`notario.sampling.Sample` to validate only some of the objects.
     """
 
+    def __init__(self, schema, sample=None):
+        self.schema = schema
+        self.sample = sample
+
     def __call__(self, data, tree):
         schema = expand_schema(self.schema)
         validator = RecursiveValidator(data, schema, tree)
+        sample = sampling.policy(self.sample)
+        if sample is not None:
+            validator.indexes = sampling.indexes(sample, len(data))
         validator.validate()
 
 
@@ -166,14 +178,68 @@ class MultiRecursive(object):
         ...
         Invalid: -> foo -> False did not match 'bar'
 
+    Items only go through the schemas for their key when the schemas have
+    literal keys. Otherwise, when every schema requires a different literal
+    value for the same key of the objects they validate (the
+    discriminator), like the ``'type'`` of events, items only go through the
+    schemas that require their value for it::
+
+        MultiRecursive(
+            (types.string, (('id', types.integer), ('type', 'click'))),
+            (types.string, (('text', types.string), ('type', 'message'))),
+        )
+
+    The discriminator can be given with ``discriminator='type'``, and
+    ``discriminator=False`` always tries the schemas in order. Items without
+    it are tried against all the schemas.
     """
     __validator_leaf__ = True
 
-    def __init__(self, *schemas):
+    def __init__(self, *schemas, **kwargs):
+        options = pop_options(kwargs, discriminator=None)
         for schema in schemas:
             if not is_schema(schema):
                 raise TypeError("got a non schema argument: %s" % safe_repr(schema))
         self.schemas = schemas
+        self.discriminator = options['discriminator']
+        self._dispatch = None
+
+    def dispatch(self):
+        """
+        The :class:`~notario.validators.Discriminator` for the schemas, by
+        the key of the items (a discriminator of ``None``) or by
+        a discriminator of their values, built the first time it is needed.
+        ``False`` if there is not one.
+        """
+        if self._dispatch is None:
+            pairs = []
+            for schema in self.schemas:
+                found = schema_pairs(schema)
+                pairs.append(found[0] if len(found) == 1 else None)
+            key = self.discriminator
+            dispatch = False
+            if key is None:
+                keys = [literal(pair[0]) if pair else missing for pair in pairs]
+                if len(set(k for k in keys if k is not missing)) > 1:
+                    dispatch = Discriminator(None, keys)
+                else:
+                    key = infer_discriminator([pair[1] if pair else () for pair in pairs])
+            if not dispatch and key is not None and key is not False:
+                dispatch = Discriminator(
+                    key, [literal_value(pair[1], key) if pair else missing for pair in pairs]
+                )
+            self._dispatch = dispatch
+        return self._dispatch
+
+    def candidates(self, dispatch, item):
+        if dispatch.key is None:
+            return dispatch.candidates(literal(item[0]))
+        value = item[1]
+        if not isinstance(value, dict):
+            return None
+        # the values of the items are normalized views of the original dicts
+        value = getattr(value, '_raw', value)
+        return dispatch.candidates(value.get(dispatch.key, missing))
 
     def __call__(self, data, tree):
         """
@@ -192,12 +258,33 @@ class MultiRecursive(object):
         first_schema = expand_schema(self.schemas[0])
         index = len(data) - 1
         validator = RecursiveValidator(data, first_schema, [], index=index)
+        dispatch = self.dispatch()
         for item_index in range(len(data)):
+            if dispatch:
+                candidates = self.candidates(dispatch, data[item_index])
+                if candidates and self.dispatched(validator, item_index, candidates):
+                    continue
             try:
                 validator.leaf(item_index)
             except Invalid:
                 self.itemized_validation(validator, item_index)
 
+    def dispatched(self, validator, item_index, candidates):
+        """
+        Validate the item against the schemas in ``candidates``, returning
+        ``True`` if one passes. When none does, the item goes through all the
+        schemas to fail just like it would without a discriminator.
+        """
+        for position in candidates:
+            try:
+                validator.schema = expand_schema(self.schemas[position])
+                validator.tree = []
+                validator.leaf(item_index)
+                return True
+            except Invalid:
+                pass
+        return False
+
     def itemized_validation(self, validator, item_index):
         error = None
 
@@ -3,6 +3,7 @@ Basic type validators
 """
 from functools import wraps
 from notario._compat import basestring
+from notario.engine import register_type_check
 from notario.exceptions import Invalid
 from notario.utils import is_callable, forced_leaf_validator, ensure
 
@@ -30,7 +31,7 @@ def string(_object):
         def decorated(value):
             ensure(isinstance(value, basestring), "not of type string")
             return _validator(value)
-        return decorated
+        return register_type_check(decorated, basestring, _validator)
     ensure(isinstance(_object, basestring), "not of type string")
 
 
@@ -58,7 +59,7 @@ def boolean(_object):
         def decorated(value):
             ensure(isinstance(value, bool), "not of type boolean")
             return _validator(value)
-        return decorated
+        return register_type_check(decorated, bool, _validator)
     ensure(isinstance(_object, bool), "not of type boolean")
 
 
@@ -88,7 +89,7 @@ def dictionary(_object, *args):
         def decorated(value):
             ensure(isinstance(value, dict), error_msg)
             return _validator(value)
-        return decorated
+        return register_type_check(decorated, dict, _validator)
     try:
         ensure(isinstance(_object, dict), error_msg)
     except AssertionError:
@@ -122,7 +123,7 @@ def array(_object):
         def decorated(value):
             ensure(isinstance(value, list), "not of type array")
             return _validator(value)
-        return decorated
+        return register_type_check(decorated, list, _validator)
     ensure(isinstance(_object, list), "not of type array")
 
 
@@ -149,5 +150,12 @@ def integer(_object):
         def decorated(value):
             ensure(isinstance(value, int), "not of type int")
             return _validator(value)
-        return decorated
+        return register_type_check(decorated, int, _validator)
     ensure(isinstance(_object, int), "not of type int")
+
+
+register_type_check(string, basestring)
+register_type_check(boolean, bool)
+register_type_check(dictionary, dict)
+register_type_check(array, list)
+register_type_check(integer, int)